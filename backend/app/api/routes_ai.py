@@ -1,32 +1,25 @@
 # app/api/routes_ai.py
-from fastapi import APIRouter
-from app.models.request_models import AIQueryRequest
-from app.services.ai_client import query_model
-
-# router = APIRouter()
-
-# @router.post("/query")
-# async def query_ai_models(data: AIQueryRequest):
-#     results = {}
-#     for model in data.models:
-#         text = await query_model(data.prompt, provider=model)
-#         results[model] = text
-#     return {"responses": results}
-
-
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-router = APIRouter()
+from app.services.ai_client import fan_out
+
+router = APIRouter(prefix="/api/ai", tags=["AI"])
 
 class QueryRequest(BaseModel):
     prompt: str
     models: list[str]
+    use_cache: bool = True
 
 @router.post("/query")
 async def query_ai(req: QueryRequest):
-    # For demo — later replace with actual API calls to models
-    responses = {}
-    for m in req.models:
-        responses[m] = f"Mocked response from {m} for prompt: {req.prompt}"
-    return {"responses": responses}
+    # All models run concurrently; slow or failing ones come back under "errors"
+    results = await fan_out(req.prompt, req.models, use_cache=req.use_cache)
+    responses = {m: r["response"] for m, r in results.items() if r["status"] == "ok"}
+    errors = {m: r["error"] for m, r in results.items() if r["status"] != "ok"}
+    return {
+        "responses": responses,
+        "errors": errors,
+        "partial": bool(errors),
+        "response_times": {m: r["response_time"] for m, r in results.items()},
+    }
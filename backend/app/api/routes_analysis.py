@@ -1,52 +1,116 @@
 # app/api/routes_analysis.py
-from fastapi import APIRouter
-from app.models.request_models import AnalysisRequest
-from app.services.analyzer_service import compute_metrics
-# from app.services.analyzer_service import analyze_data
+from typing import Dict, List, Optional
 
+import anyio.to_thread
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
+from app.core.responses import FastJSONResponse, dumps
+from app.models.response_models import AnalysisMetricsResult, MetricsPerModel
+from app.services.analyzer_service import compute_metrics as text_metrics
+from app.services.batch_service import analyze_responses, iter_batch
+from app.services.store_service import analysis_store
+from app.services.summarizer_service import generate_insights
 
-# router = APIRouter()
+router = APIRouter(prefix="/api/analysis", tags=["Analysis"])
 
-# @router.post("/analysis")
-# def analyze_text(data: dict):
-#     text = data.get("text", "")
-#     result = compute_metrics(text)
-#     return result
+class AnalysisRequest(BaseModel):
+    responses: dict[str, str]
 
+class TextRequest(BaseModel):
+    text: str
 
-from fastapi import APIRouter
-from pydantic import BaseModel
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    responses: Dict[str, str]
+    target_domain: Optional[str] = None
 
-router = APIRouter()
+class BatchAnalysisRequest(BaseModel):
+    items: List[BatchItem]
+    target_domain: Optional[str] = None  # default for items that don't set one
 
-class AnalysisRequest(BaseModel):
-    responses: dict[str, str]
+class RescoreRequest(BaseModel):
+    # one {model: {response_length, domain_count, unique_domains}} dict per stored run
+    runs: List[Dict[str, Dict[str, float]]]
 
-@router.post("/metrics")
+@router.post("/metrics", response_model=AnalysisMetricsResult)
 async def compute_metrics(req: AnalysisRequest):
-    metrics = {}
-    global_domains = {}
-    for model, text in req.responses.items():
-        words = text.split()
-        metrics[model] = {
-            "response_length": len(text),
-            "domain_count": 2,
-            "unique_domains": 1,
-            "visibility_score": 80,
-        }
-        global_domains["example.com"] = 5
-
-    summary = "Mocked summary of model performances."
-    rankings = sorted(
-        [(m, data["visibility_score"]) for m, data in metrics.items()],
-        key=lambda x: x[1],
-        reverse=True,
-    )
-    return {
-        "metrics": metrics,
-        "rankings": rankings,
-        "global_domains": global_domains,
-        "citations": {"example.com": 5},
-        "summary": summary,
-    }
+    result = await analyze_responses(req.responses)
+    # built from our own pipeline output: constructed without re-validation, dumped by pydantic-core
+    return FastJSONResponse(AnalysisMetricsResult.model_construct(
+        metrics={m: MetricsPerModel.model_construct(**values) for m, values in result["metrics"].items()},
+        rankings=result["rankings"],
+        global_domains=result["global_domains"],
+        citations=result["citations"],
+        summary=generate_insights(result["global_domains"], result["per_model_domains"], result["metrics"]),
+    ))
+
+@router.post("/text")
+async def analyze_text(req: TextRequest):
+    """Word/character counts and word frequencies for one text."""
+    return text_metrics(req.text)
+
+@router.post("/batch")
+async def analyze_batch(req: BatchAnalysisRequest):
+    """
+    Parse + score many response sets across the worker process pool.
+    Streams one NDJSON line per set, in completion order.
+    """
+    items = [
+        {"responses": item.responses, "target_domain": item.target_domain or req.target_domain}
+        for item in req.items
+    ]
+    ids = [item.id for item in req.items]
+
+    async def lines():
+        async for outcome in iter_batch(items):
+            yield dumps({"id": ids[outcome["index"]], **outcome}) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.post("/rescore")
+async def rescore_runs(req: RescoreRequest):
+    """Recompute visibility scores and rankings for many stored runs in one vectorized pass."""
+    # imported here: numpy is the slowest import in the app and only this route needs it
+    from app.services.scoring_service import MetricColumns, score_columns
+
+    scored = score_columns(MetricColumns.from_metrics(req.runs))
+    return {"runs": [{"metrics": metrics, "rankings": rankings} for metrics, rankings in scored]}
+
+@router.get("/history")
+async def analysis_history(
+    target_domain: Optional[str] = None,
+    model: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
+    """Stored analyses, newest first. Pass next_cursor as cursor for the next page."""
+    try:
+        return await anyio.to_thread.run_sync(analysis_store.list_analyses, target_domain, model, since, until, limit, cursor)
+    except ValueError as e:  # malformed cursor
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/history/{analysis_id}")
+async def stored_analysis(analysis_id: str):
+    """A past analysis with its full results, read from the store (no LLM calls)."""
+    stored = await anyio.to_thread.run_sync(analysis_store.get_analysis, analysis_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown analysis: {analysis_id}")
+    return FastJSONResponse(stored)
+
+@router.get("/mentions")
+async def domain_mentions(
+    domain: str,
+    model: Optional[str] = None,
+    since: Optional[float] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """Every stored (analysis, model) that cited a domain, newest first."""
+    try:
+        return await anyio.to_thread.run_sync(analysis_store.domain_mentions, domain, model, since, limit, cursor)
+    except ValueError as e:  # malformed cursor
+        raise HTTPException(status_code=400, detail=str(e))
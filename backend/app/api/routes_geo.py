@@ -1,47 +1,152 @@
 # app/api/routes_geo.py
-from fastapi import APIRouter
-from app.models.request_models import GeoScoreRequest
-from app.services.analyzer_service import compute_geo_score
-
-# router = APIRouter()
+import os
+from collections import Counter
+from typing import List, Optional
 
-# @router.post("/score")
-# async def geo_score(data: GeoScoreRequest):
-#     score = compute_geo_score(data.global_counts, data.target_domain, data.total_models)
-#     return {"geo_score": score}
+import anyio.to_thread
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
 
+from app.core.responses import FastJSONResponse
+from app.core.utils import normalize_domain
+from app.models.response_models import GeoScoreResult
+from app.services.aggregate_service import domain_aggregate
+from app.services.analyzer_service import PresenceIndex, compute_geo_score, model_comparison
+from app.services.job_service import jobs
+from app.services.scheduler_service import Sweep, scheduler
+from app.services.store_service import analysis_store
 
+# Upper bound on targets scored by one /score/bulk request
+GEO_BULK_MAX_TARGETS = int(os.getenv("GEO_BULK_MAX_TARGETS", "1000"))
 
-from fastapi import APIRouter
-from pydantic import BaseModel
-
-router = APIRouter()
+router = APIRouter(prefix="/api/geo", tags=["GEO"])
 
 class GeoRequest(BaseModel):
     global_counts: dict[str, int]
     target_domain: str
     total_models: int
+    # {model: {domain: count}}; enables exact per-model presence scoring
+    per_model_counts: Optional[dict[str, dict[str, int]]] = None
 
 @router.post("/score")
 async def compute_geo(req: GeoRequest):
-    # simple fake GEO score
-    mentions = req.global_counts.get(req.target_domain, 0)
-    geo_score = round((mentions / (req.total_models or 1)) * 100, 2)
-    return {"geo_score": geo_score}
+    if req.per_model_counts is None:
+        # aggregated counts only: score is capped at 100 but can't tell repeats from models
+        score = compute_geo_score(Counter(req.global_counts), req.target_domain, req.total_models)
+        return {"geo_score": score}
+    presence = PresenceIndex(req.per_model_counts)
+    return FastJSONResponse(GeoScoreResult.model_construct(
+        target_domain=req.target_domain,
+        geo_score=compute_geo_score(Counter(req.global_counts), req.target_domain, req.total_models, presence),
+        per_model_mentions=model_comparison(req.per_model_counts, req.target_domain, presence),
+        models_mentioning=presence.models_mentioning(req.target_domain),
+    ))
 
-from fastapi import APIRouter
-from pydantic import BaseModel
-from collections import Counter
 
-router = APIRouter()
+class BulkGeoRequest(BaseModel):
+    targets: List[str]
+    # score against a finished (or running) analysis...
+    analysis_id: Optional[str] = None
+    # ...or against counts sent once: {model: {domain: count}}
+    per_model_counts: Optional[dict[str, dict[str, int]]] = None
+    total_models: Optional[int] = None
 
-class GeoRequest(BaseModel):
-    global_counts: dict[str, int]
-    target_domain: str
-    total_models: int
+@router.post("/score/bulk")
+async def compute_geo_bulk(req: BulkGeoRequest):
+    """Score many target domains against one analysis; results are ranked best first."""
+    if len(req.targets) > GEO_BULK_MAX_TARGETS:
+        raise HTTPException(status_code=400, detail=f"at most {GEO_BULK_MAX_TARGETS} targets per request")
+    if req.analysis_id is not None:
+        job = jobs.get(req.analysis_id)
+        if job is not None:
+            # every model, as the stored path returns them (failed models have no counts)
+            models = job.state.models
+            per_model_domains = {m: job.state.per_model_domains.get(m, {}) for m in models}
+        else:
+            # no longer in memory: score against the finished analysis in the store
+            stored = await anyio.to_thread.run_sync(analysis_store.model_domains, req.analysis_id)
+            if stored is None:
+                raise HTTPException(status_code=404, detail=f"Unknown analysis: {req.analysis_id}")
+            models, per_model_domains = stored
+        presence = PresenceIndex(per_model_domains)
+        total_models = req.total_models or len(models)
+    elif req.per_model_counts is not None:
+        presence = PresenceIndex(req.per_model_counts)
+        total_models = req.total_models or presence.total_models
+    else:
+        raise HTTPException(status_code=422, detail="analysis_id or per_model_counts is required")
+    results = presence.score_targets(req.targets, total_models)
+    return {"analysis_id": req.analysis_id, "total_models": total_models, "count": len(results), "results": results}
 
-@router.post("/score")
-async def compute_geo(req: GeoRequest):
-    # Use your analyzer logic
-    score = compute_geo_score(Counter(req.global_counts), req.target_domain, req.total_models)
-    return {"geo_score": score}
\ No newline at end of file
+
+@router.get("/window")
+async def geo_window(domain: str, window: str = "24h"):
+    """GEO score and mentions for a domain over a rolling window (1h/24h/7d/30d)."""
+    try:
+        return domain_aggregate.window(domain, window)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/trend")
+async def geo_trend(domain: str, window: str = "7d"):
+    """One point per time bucket for trend charts."""
+    try:
+        return {"domain": normalize_domain(domain), "window": window, "points": domain_aggregate.trend(domain, window)}
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class SweepRequest(BaseModel):
+    name: str
+    prompts: List[str]
+    models: List[str]
+    target_domains: List[str]
+    # "@every 6h", "@daily", or a cron expression such as "0 */6 * * *" (UTC)
+    schedule: str = "@daily"
+    enabled: bool = True
+    use_cache: bool = False  # monitoring wants fresh answers
+
+def _get_sweep(sweep_id: str) -> Sweep:
+    sweep = scheduler.get(sweep_id)
+    if sweep is None:
+        raise HTTPException(status_code=404, detail=f"Unknown sweep: {sweep_id}")
+    return sweep
+
+@router.post("/sweeps")
+async def create_sweep(req: SweepRequest):
+    """Register a recurring prompts x models sweep that tracks the target domains' visibility."""
+    try:
+        sweep = Sweep(**req.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return (await scheduler.add(sweep)).to_dict()
+
+@router.get("/sweeps")
+async def list_sweeps():
+    return {"sweeps": [sweep.to_dict() for sweep in scheduler.list()], "scheduler": scheduler.stats()}
+
+@router.get("/sweeps/{sweep_id}")
+async def get_sweep(sweep_id: str):
+    return _get_sweep(sweep_id).to_dict()
+
+@router.delete("/sweeps/{sweep_id}")
+async def delete_sweep(sweep_id: str):
+    """Unregister a sweep and drop its time series."""
+    _get_sweep(sweep_id)
+    await scheduler.remove(sweep_id)
+    return {"sweep_id": sweep_id, "deleted": True}
+
+@router.post("/sweeps/{sweep_id}/run")
+async def run_sweep(sweep_id: str):
+    """Queue a run now, outside the schedule; queued is false while the previous run is still going."""
+    _get_sweep(sweep_id)
+    return {"sweep_id": sweep_id, "queued": await scheduler.trigger(sweep_id)}
+
+@router.get("/sweeps/{sweep_id}/trend")
+async def sweep_trend(sweep_id: str, domain: str, model: str = "", since: Optional[float] = None,
+                      until: Optional[float] = None):
+    """One point per sweep run: share of answers (all models, or one) that mentioned the domain."""
+    _get_sweep(sweep_id)
+    points = await anyio.to_thread.run_sync(analysis_store.sweep_series, sweep_id, domain, model, since, until)
+    return {"sweep_id": sweep_id, "domain": normalize_domain(domain), "model": model or None, "points": points}
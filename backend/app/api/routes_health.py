@@ -1,7 +1,53 @@
 from fastapi import APIRouter
 
-router = APIRouter()
+from app.core.utils import normalize_cache_stats
+
+from app.services.ai_client import limits, registry
+from app.services.cache_service import response_cache
+from app.services.coalescing_service import provider_flights, provider_streams
+from app.services.job_service import jobs
+from app.services.scheduler_service import scheduler
+from app.services.semantic_cache_service import SEMANTIC_CACHE_ENABLED, semantic_cache
+from app.services.store_service import analysis_store
+from app.services.summarizer_service import summary_token_stats
+
+router = APIRouter(prefix="/api", tags=["Health"])
 
 @router.get("/health")
 def health_check():
     return {"status": "ok", "message": "Backend is running smoothly 🚀"}
+
+@router.get("/health/providers")
+def provider_pool_stats():
+    """Connection pools, rate limiters (budgets, AIMD concurrency, queue) and request coalescing per provider."""
+    return {"providers": registry.stats(), "rate_limits": limits.stats(), "coalescing": provider_flights.stats(),
+            "stream_coalescing": provider_streams.stats()}
+
+@router.get("/health/cache")
+def response_cache_stats():
+    """Hit/miss/eviction counters of the provider response caches (exact and semantic) and the domain normalizer."""
+    return {
+        "cache": response_cache.stats(),
+        "semantic_cache": {"enabled": SEMANTIC_CACHE_ENABLED, **semantic_cache.stats()},
+        "normalize_domain": normalize_cache_stats(),
+    }
+
+@router.get("/health/jobs")
+def analysis_job_stats():
+    """Background analysis workers, queue depth and jobs per state."""
+    return {"jobs": jobs.stats()}
+
+@router.get("/health/scheduler")
+def sweep_scheduler_stats():
+    """Registered sweeps, runs started/skipped, analyses queued and the next due run."""
+    return {"scheduler": scheduler.stats()}
+
+@router.get("/health/store")
+def analysis_store_stats():
+    """Batched writes of the analysis store: queued, written, pending and failed analyses."""
+    return {"store": analysis_store.stats()}
+
+@router.get("/health/summaries")
+def summary_token_report():
+    """Tokens per synthesis prompt: budget, average prompt size and duplicates removed."""
+    return {"summaries": summary_token_stats()}
@@ -0,0 +1,96 @@
+# app/api/routes_pipeline.py
+import anyio.to_thread
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.responses import FastJSONResponse, dumps
+from app.services.job_service import QueueFullError, jobs
+from app.services.store_service import analysis_store
+
+router = APIRouter(prefix="/api", tags=["Pipeline"])
+
+@router.post("/multi-llm-analysis")
+async def multi_llm_analysis(request: Request):
+    data = await request.json()
+    prompt = data.get("prompt", "")
+    models = data.get("models", [])
+    target_domain = data.get("target_domain")
+    use_cache = data.get("use_cache", True)
+
+    if data.get("background"):
+        # queue it and return immediately; poll /api/analysis-progress/{analysis_id}
+        try:
+            job = await jobs.submit(prompt, models, target_domain, use_cache)
+        except QueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return {"analysis_id": job.id, "status": job.status}
+
+    # Query every model concurrently; failed/slow models are reported, not fatal
+    job = await jobs.run(jobs.create(prompt, models, target_domain, use_cache))
+
+    # full response texts make this payload large: encoded by orjson in one pass
+    return FastJSONResponse({
+        "analysis_id": job.id,
+        "status": job.status,
+        "failed_models": job.state.failed_models,
+        "error": job.error,
+        "results": job.state.results()
+    })
+
+@router.post("/multi-llm-analysis/stream")
+async def multi_llm_analysis_stream(request: Request):
+    """
+    Same analysis as /api/multi-llm-analysis, streamed as server-sent events:
+    each model as it answers, then running domain/citation counts, then the
+    summary and the full results ("done").
+    """
+    data = await request.json()
+    job = jobs.create(
+        data.get("prompt", ""),
+        data.get("models", []),
+        data.get("target_domain"),
+        data.get("use_cache", True),
+    )
+
+    async def sse():
+        async for event, payload in jobs.stream(job):
+            if event == "done":
+                payload = {"analysis_id": job.id, **payload}
+            yield b"event: %s\ndata: %s\n\n" % (event.encode(), dumps(payload))
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/analysis-progress/{analysis_id}", operation_id="get_analysis_progress")
+# POST alias kept for older clients; a distinct operation id keeps the OpenAPI schema unambiguous
+@router.post("/analysis-progress/{analysis_id}", operation_id="post_analysis_progress")
+async def get_analysis_progress(analysis_id: str):
+    job = jobs.get(analysis_id)
+    if job is not None:
+        return FastJSONResponse(job.to_dict())
+    # no longer in memory: reopen the finished analysis from the store
+    stored = await anyio.to_thread.run_sync(analysis_store.get_analysis, analysis_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown analysis: {analysis_id}")
+    models = stored["results"]["modelResults"]
+    return FastJSONResponse({
+        "analysis_id": analysis_id,
+        "status": stored["status"],
+        "progress": {
+            "completed": len(models),
+            "total": len(stored["models"]),
+            "percent": 100.0,
+            "summary": stored["summary"] is not None,
+            "models": {m: r["status"] for m, r in models.items()},
+        },
+        "failed_models": [m for m, r in models.items() if r["status"] != "ok"],
+        "error": stored["error"],
+        "trace_id": None,
+        "created_at": stored["created_at"],
+        "started_at": None,
+        "finished_at": stored["finished_at"],
+        "results": stored["results"],
+    })
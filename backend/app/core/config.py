@@ -1,9 +1,25 @@
 # core/config.py
-from pydantic import BaseSettings, AnyHttpUrl
-from typing import List, Optional
+import os
+from typing import Optional
+
+from pydantic import BaseModel
+
+# pydantic v2 moved BaseSettings into the optional pydantic-settings package;
+# without it, unset fields are read straight from the environment
+try:
+    from pydantic_settings import BaseSettings, SettingsConfigDict
+except ImportError:
+    from pydantic import ConfigDict as SettingsConfigDict
+
+    class BaseSettings(BaseModel):
+        def __init__(self, **values):
+            env = {name: os.environ[name] for name in type(self).model_fields if name in os.environ}
+            super().__init__(**{**env, **values})
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
     # API keys for LLM providers (optional, depending on which providers you use)
     GROQ_API_KEY: Optional[str] = None
     OPENROUTER_API_KEY: Optional[str] = None
@@ -18,9 +34,5 @@ class Settings(BaseSettings):
     DEFAULT_MAX_TOKENS: int = 600
     DEFAULT_TEMPERATURE: float = 0.7
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-
 
 settings = Settings()
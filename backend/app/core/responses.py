@@ -0,0 +1,103 @@
+# core/responses.py
+import json
+import os
+from typing import Any
+
+import anyio.to_thread
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+
+# orjson and brotli are optional: without them responses fall back to the stdlib json encoder and gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+# Favour speed: analysis payloads are mostly response text, which compresses well at low levels
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "4"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+# Larger bodies are compressed in a worker thread instead of on the event loop
+COMPRESS_THREAD_BYTES = 128 * 1024
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes for a response payload; pydantic models are dumped by pydantic-core directly."""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if orjson is None:
+        return json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+    return orjson.dumps(content, default=jsonable_encoder, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    The app's default response class: orjson instead of json.dumps. Routes with
+    large payloads return it directly, which also skips FastAPI's
+    jsonable_encoder pass over the whole payload (orjson handles dicts, lists,
+    tuples, Counters and numpy values natively; anything else goes through
+    jsonable_encoder one object at a time).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = BROTLI_QUALITY):
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= COMPRESS_THREAD_BYTES:
+            return await anyio.to_thread.run_sync(self._compress, body, more_body)
+        return self._compress(body, more_body)
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware:
+    """
+    Brotli (when installed and accepted) or gzip for response bodies of at least
+    `minimum_size` bytes. Built on starlette's GZip responders, so event streams
+    are left alone and other streamed bodies are flushed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES, gzip_level: int = GZIP_LEVEL,
+                 brotli_quality: int = BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = Headers(scope=scope).get("accept-encoding", "")
+        if brotli is not None and "br" in accepted:
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif "gzip" in accepted:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
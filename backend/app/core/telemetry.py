@@ -0,0 +1,229 @@
+# core/telemetry.py
+import functools
+import inspect
+import os
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = tuple(
+    float(b) for b in os.getenv(
+        "LATENCY_BUCKETS", "0.0005,0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60"
+    ).split(",")
+)
+# Request header carrying the caller's trace id; one is generated when absent
+TRACE_HEADER = os.getenv("TRACE_HEADER", "X-Trace-Id")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_TRACE_ID_RE = re.compile(r"^[A-Za-z0-9_.:-]{1,64}$")
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+
+# Per-request context, inherited by tasks started while handling the request
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+_request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with labels, rendered in the Prometheus text
+    exposition format. observe() is thread-safe: sync routes run in a threadpool.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict]:
+        """{labels: {"count", "sum", "buckets": [(le, cumulative count), ...]}}"""
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        result = {}
+        for key, (counts, total, count) in series.items():
+            cumulative, running = [], 0
+            for le, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                cumulative.append((le, running))
+            result[key] = {"count": count, "sum": total, "buckets": cumulative}
+        return result
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.snapshot().items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key))
+            sep = "," if labels else ""
+            for le, n in series["buckets"]:
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{_format_value(le)}"}} {n}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series['sum']!r}")
+            lines.append(f"{self.name}_count{{{labels}}} {series['count']}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+stage_seconds = Histogram(
+    "geo_stage_duration_seconds",
+    "Time spent in one analysis stage (provider call, parsing, scoring, summary).",
+    ("stage", "provider", "route"),
+)
+request_seconds = Histogram(
+    "geo_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status code.",
+    ("route", "method", "status"),
+)
+METRICS = [request_seconds, stage_seconds]
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+def current_route() -> str:
+    """Route template of the request being handled ("" outside a request)."""
+    scope = _request_scope.get()
+    if scope is None:
+        return ""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe_stage(stage: str, seconds: float, provider: str = ""):
+    stage_seconds.observe(seconds, stage=stage, provider=provider, route=current_route())
+
+
+@contextmanager
+def stage_timer(stage: str, provider: str = ""):
+    """Time a block as `stage`; the route label comes from the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started, provider)
+
+
+def timed_stage(stage: str):
+    """Decorator: record every call of a sync or async function as `stage`."""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    observe_stage(stage, time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe_stage(stage, time.perf_counter() - started)
+        return wrapper
+
+    return decorator
+
+
+def _incoming_trace_id(scope: dict) -> Optional[str]:
+    wanted = TRACE_HEADER.lower().encode("latin-1")
+    traceparent = None
+    for name, value in scope.get("headers", ()):
+        if name == wanted:
+            candidate = value.decode("latin-1").strip()
+            if _TRACE_ID_RE.match(candidate):
+                return candidate
+        elif name == b"traceparent":
+            traceparent = value.decode("latin-1").strip()
+    if traceparent:
+        match = _TRACEPARENT_RE.match(traceparent)
+        if match:
+            return match.group(1)
+    return None
+
+
+class TelemetryMiddleware:
+    """
+    Pure ASGI middleware (safe for streaming responses): gives every request a
+    trace id (the caller's TRACE_HEADER or W3C traceparent, else a new one),
+    echoes it in the response headers and records the request latency.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = TRACE_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = _incoming_trace_id(scope) or uuid.uuid4().hex
+        trace_token = _trace_id.set(trace_id)
+        scope_token = _request_scope.set(scope)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_trace(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(self.header, trace_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            request_seconds.observe(
+                time.perf_counter() - started, route=current_route(), method=scope["method"], status=str(status)
+            )
+            _request_scope.reset(scope_token)
+            _trace_id.reset(trace_token)
@@ -1,38 +1,115 @@
 # core/utils.py
+import os
 import re
 from collections import Counter
+from functools import lru_cache
 from typing import Dict, Tuple, List
-from urllib.parse import urlparse
 
 
 DOMAIN_PATTERN = r'\b(?:https?://)?(?:www\.)?([a-zA-Z0-9-]+\.[a-zA-Z]{2,6})\b'
 
 
+# Distinct raw domain strings remembered by normalize_domain
+NORMALIZE_CACHE_SIZE = int(os.getenv("NORMALIZE_CACHE_SIZE", "65536"))
+SUFFIX_LIST_PATH = os.getenv(
+    "PUBLIC_SUFFIX_LIST", os.path.join(os.path.dirname(__file__), "public_suffix_list.dat")
+)
+
+_suffix_rules = None  # (rules, wildcards, exceptions), loaded on first use
+
+
+def _load_suffix_rules(path: str = SUFFIX_LIST_PATH):
+    global _suffix_rules
+    if _suffix_rules is None:
+        rules, wildcards, exceptions = set(), set(), set()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                rule = line.split("//", 1)[0].strip().lower()
+                if not rule:
+                    continue
+                if rule.startswith("!"):
+                    exceptions.add(rule[1:])
+                elif rule.startswith("*."):
+                    wildcards.add(rule[2:])
+                else:
+                    rules.add(rule)
+        _suffix_rules = (frozenset(rules), frozenset(wildcards), frozenset(exceptions))
+    return _suffix_rules
+
+
+def public_suffix(host: str) -> str:
+    """Longest public suffix of a (normalized) host per the bundled suffix list, e.g. "co.uk"."""
+    rules, wildcards, exceptions = _load_suffix_rules()
+    labels = host.split(".")
+    for i in range(len(labels)):
+        candidate = ".".join(labels[i:])
+        if candidate in exceptions:
+            return ".".join(labels[i + 1:])
+        if i > 0 and candidate in wildcards:
+            return ".".join(labels[i - 1:])
+        if candidate in rules:
+            return candidate
+    return labels[-1]  # implicit "*" rule: unknown TLDs are suffixes too
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def registrable_domain(host: str) -> str:
+    """
+    The registrable domain (public suffix plus one label) of a host:
+    "blog.hubspot.com" -> "hubspot.com", "news.bbc.co.uk" -> "bbc.co.uk".
+    Returns "" when the host is itself a public suffix. Memoized like normalize_domain.
+    """
+    host = normalize_domain(host)
+    if not host:
+        return ""
+    suffix = public_suffix(host)
+    if len(host) <= len(suffix):
+        return ""
+    label = host[:-len(suffix) - 1].rsplit(".", 1)[-1]
+    return f"{label}.{suffix}"
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_domain(raw: str) -> str:
     """
-    Normalize a domain-like string:
-    - strip protocol
-    - remove www.
+    Normalize a domain-like string to its host:
+    - strip protocol, path/query/fragment, credentials and port
     - lowercase
-    - strip trailing slashes
+    - remove a leading "www." label (only when what's left is still a registrable domain)
+    Memoized: the same few hundred domains recur across every response.
     """
     if not raw:
         return ""
-    raw = raw.strip().lower()
-    # quick parse
-    if raw.startswith("http://") or raw.startswith("https://"):
-        try:
-            parsed = urlparse(raw)
-            host = parsed.netloc or parsed.path
-        except Exception:
-            host = raw
-    else:
-        host = raw
-    host = host.replace("www.", "")
-    host = host.strip().strip("/")
+    host = raw.strip().lower()
+    scheme = host.find("://")
+    if scheme != -1:
+        host = host[scheme + 3:]
+    for sep in "/?#":
+        cut = host.find(sep)
+        if cut != -1:
+            host = host[:cut]
+    if "@" in host:
+        host = host.rsplit("@", 1)[1]
+    if ":" in host and not host.startswith("["):
+        host = host.split(":", 1)[0]
+    host = host.strip().strip(".")
+    if host.startswith("www.") and host.count(".") > 1 and public_suffix(host[4:]) != host[4:]:
+        host = host[4:]
     return host
 
 
+def normalize_cache_stats() -> Dict:
+    info = normalize_domain.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+    }
+
+
 def counter_to_dict(c: Counter) -> Dict[str, int]:
     """Convert a Counter object to a regular dict (JSON serializable)."""
     return {k: int(v) for k, v in c.items()}
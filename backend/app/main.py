@@ -1,162 +1,73 @@
-# app/main.p
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-# from app.api import routes_ai, routes_analysis, routes_geo, routes_health
-
-# app = FastAPI(title="GEO Analyzer Backend", version="1.0")
-
-# app.add_middleware(
-#     CORSMiddleware,
-#     allow_origins=["*"],  # or specific frontend domain
-#     allow_credentials=True,
-#     allow_methods=["*"],
-#     allow_headers=["*"],
-# )
-
-# app.include_router(routes_health.router, prefix="/api", tags=["Health"])
-# app.include_router(routes_ai.router, prefix="/api/ai", tags=["AI"])
-# app.include_router(routes_analysis.router, prefix="/api/analysis", tags=["Analysis"])
-# app.include_router(routes_geo.router, prefix="/api/geo", tags=["GEO"])
-
-
-# from fastapi import FastAPI, Request
-# from fastapi.middleware.cors import CORSMiddleware
-# import json
-
-# app = FastAPI()
+# app/main.py
+from contextlib import asynccontextmanager
 
-# # ✅ Enable CORS for frontend connection
-# app.add_middleware(
-#     CORSMiddleware,
-#     allow_origins=["*"],  # or specify ["http://localhost:3000"]
-#     allow_credentials=True,
-#     allow_methods=["*"],
-#     allow_headers=["*"],
-# )
-# app.include_router(routes_health.router, prefix="/api", tags=["Health"])
-# app.include_router(routes_ai.router, prefix="/api/ai", tags=["AI"])
-# app.include_router(routes_analysis.router, prefix="/api/analysis", tags=["Analysis"])
-# app.include_router(routes_geo.router, prefix="/api/geo", tags=["GEO"])
-
-
-# @app.post("/api/metrics")
-# async def compute_metrics(request: Request):
-#     data = await request.json()
-#     try:
-#         prompt = data.get("prompt")
-#         target_domain = data.get("target_domain")
-#         # your logic for metrics...
-#         result = {"status": "ok", "metrics": {"score": 98}}
-#         return result
-#     except Exception as e:
-#         return {"error": str(e)}
-    
-
-
-
-
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from app.api import routes_ai, routes_analysis, routes_geo, routes_health, routes_pipeline
+from app.core import telemetry
+from app.core.responses import CompressionMiddleware, FastJSONResponse
+from app.services.ai_client import registry
+from app.services.batch_service import shutdown_pool
+from app.services.cache_service import response_cache
+from app.services.job_service import jobs
+from app.services.prompt_service import load_tokenizer_in_background
+from app.services.scheduler_service import scheduler
+from app.services.store_service import analysis_store
+
+# Each module's router carries its own prefix and tags, so every route is defined
+# once and its path (the telemetry route label) is the full template
+ROUTERS = (routes_health, routes_ai, routes_analysis, routes_geo, routes_pipeline)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # open one pooled HTTP client per provider, close them on shutdown
+    await registry.startup()
+    load_tokenizer_in_background()
+    await jobs.start()
+    await scheduler.start()
+    yield
+    await scheduler.stop()
+    await jobs.stop()
+    await registry.shutdown()
+    response_cache.close()
+    analysis_store.close()
+    shutdown_pool()
 
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # or ["http://localhost:3000"]
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-@app.get("/")
 async def root():
     return {"message": "Backend running"}
 
-@app.get("/api/health")
-async def health():
-    return {"status": "ok"}
 
-# Routes commented out to avoid import issues
+def prometheus_metrics():
+    """Per-stage and per-route latency histograms in the Prometheus text format."""
+    return PlainTextResponse(telemetry.render_metrics(), media_type=telemetry.CONTENT_TYPE)
 
 
-@app.post("/api/multi-llm-analysis")
-async def multi_llm_analysis(request: Request):
-    data = await request.json()
-    prompt = data.get("prompt", "")
-    models = data.get("models", [])
-    target_domain = data.get("target_domain")
+def create_app() -> FastAPI:
+    app = FastAPI(title="GEO Analyzer Backend", version="1.0", lifespan=lifespan,
+                  default_response_class=FastJSONResponse)
 
-    # Mock responses for each model
-    model_results = {}
-    for model in models:
-        model_results[model] = {
-            "response": f"Mocked response from {model} for prompt: {prompt}",
-            "response_time": 1500 + len(models) * 100,  # Mock response time
-            "accuracy": 0.85,
-            "confidence": 0.78
-        }
+    # gzip/brotli for bodies above COMPRESS_MIN_BYTES (SSE streams are left alone)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # or ["http://localhost:3000"]
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[telemetry.TRACE_HEADER],
+    )
+    # outermost: trace id + latency for every request, CORS preflights included
+    app.add_middleware(telemetry.TelemetryMiddleware)
 
-    # Mock analysis results
-    results = {
-        "modelResults": model_results,
-        "summary": f"Analysis completed for {len(models)} models with prompt: {prompt}",
-        "topPerformer": models[0] if models else "N/A",
-        "uniqueDomains": 3,
-        "totalCitations": 15,
-        "avgResponse": 1200,
-        "domains": {
-            "example.com": 5,
-            "research.org": 3,
-            "academic.edu": 2
-        },
-        "metrics": {
-            "total_responses": len(models),
-            "avg_confidence": 0.78,
-            "processing_time": 2500
-        }
-    }
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/metrics", prometheus_metrics, methods=["GET"], include_in_schema=False)
+    for module in ROUTERS:
+        app.include_router(module.router)
+    return app
 
-    return {
-        "analysis_id": f"analysis_{len(prompt)}_{len(models)}",
-        "status": "completed",
-        "results": results
-    }
 
-@app.post("/api/analysis-progress/{analysis_id}")
-async def get_analysis_progress(analysis_id: str):
-    # Mock progress endpoint
-    return {
-        "status": "completed",
-        "results": {
-            "modelResults": {
-                "gpt4": {
-                    "response": "Mocked GPT-4 response with detailed analysis",
-                    "response_time": 1200,
-                    "accuracy": 0.92,
-                    "confidence": 0.85
-                },
-                "claude": {
-                    "response": "Mocked Claude response with comprehensive insights",
-                    "response_time": 1100,
-                    "accuracy": 0.88,
-                    "confidence": 0.82
-                }
-            },
-            "summary": "Multi-LLM analysis completed successfully",
-            "topPerformer": "gpt4",
-            "uniqueDomains": 4,
-            "totalCitations": 18,
-            "avgResponse": 1150,
-            "domains": {
-                "example.com": 6,
-                "research.org": 4,
-                "academic.edu": 3,
-                "science.gov": 2
-            },
-            "metrics": {
-                "total_responses": 2,
-                "avg_confidence": 0.835,
-                "processing_time": 2300
-            }
-        }
-    }
+app = create_app()
@@ -1,6 +1,6 @@
 # models/response_models.py
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 
 class LLMResponses(BaseModel):
@@ -30,10 +30,19 @@ class MetricsResult(BaseModel):
     metrics: Dict[str, MetricsPerModel]
 
 
+class AnalysisMetricsResult(MetricsResult):
+    """/api/analysis/metrics: per-model metrics plus rankings, counts and insights."""
+    rankings: List[Tuple[str, float]]
+    global_domains: Dict[str, int]
+    citations: Dict[str, int]
+    summary: str
+
+
 class GeoScoreResult(BaseModel):
     target_domain: str
     geo_score: float
     per_model_mentions: Dict[str, int]
+    models_mentioning: List[str] = []
 
 
 class SummaryResult(BaseModel):
@@ -0,0 +1,176 @@
+# services/aggregate_service.py
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from app.core.utils import counter_to_dict, normalize_domain, registrable_domain
+
+# Width of one time bucket, and the rolling windows kept as running totals
+AGGREGATE_BUCKET_SECONDS = int(os.getenv("AGGREGATE_BUCKET_SECONDS", "3600"))
+WINDOWS = {"1h": 3600, "24h": 24 * 3600, "7d": 7 * 24 * 3600, "30d": 30 * 24 * 3600}
+
+
+class _Bucket:
+    __slots__ = ("mentions", "presence", "site_mentions", "site_presence", "responses")
+
+    def __init__(self):
+        self.mentions: Dict[str, Counter] = defaultdict(Counter)  # domain -> {model: mentions}
+        self.presence: Counter = Counter()  # domain -> responses mentioning it
+        # the same rolled up to registrable domains (hubspot.com covers blog.hubspot.com)
+        self.site_mentions: Dict[str, Counter] = defaultdict(Counter)
+        self.site_presence: Counter = Counter()
+        self.responses: Counter = Counter()  # model -> responses ingested
+
+    def tables(self, domain: str):
+        """(mentions, presence) to look a target up in: site-level for a registrable domain."""
+        if domain and registrable_domain(domain) == domain:
+            return self.site_mentions, self.site_presence
+        return self.mentions, self.presence
+
+
+class _WindowTotals(_Bucket):
+    __slots__ = ("seconds", "start")
+
+    def __init__(self, seconds: int, start: int):
+        super().__init__()
+        self.seconds = seconds
+        self.start = start  # oldest bucket still counted
+
+    def apply(self, bucket: _Bucket, sign: int):
+        for mentions, delta in ((self.mentions, bucket.mentions), (self.site_mentions, bucket.site_mentions)):
+            for domain, per_model in delta.items():
+                totals = mentions[domain]
+                for model, count in per_model.items():
+                    totals[model] += sign * count
+                    if not totals[model]:
+                        del totals[model]
+                if not totals:
+                    del mentions[domain]
+        for counter, delta in ((self.presence, bucket.presence), (self.site_presence, bucket.site_presence),
+                               (self.responses, bucket.responses)):
+            for key, count in delta.items():
+                counter[key] += sign * count
+                if not counter[key]:
+                    del counter[key]
+
+
+class DomainAggregate:
+    """
+    Running domain-mention counts per (domain, model, time bucket).
+
+    Analyses are merged in as they finish instead of recounting raw history.
+    Each rolling window in WINDOWS keeps its own totals: a bucket is added once
+    on ingest and subtracted once when it slides out, so window queries are
+    plain dict lookups regardless of how much history exists.
+    """
+
+    def __init__(self, bucket_seconds: int = AGGREGATE_BUCKET_SECONDS, windows: Dict[str, int] = WINDOWS):
+        self.bucket_seconds = bucket_seconds
+        self._buckets: Dict[int, _Bucket] = {}
+        self._current: Optional[int] = None
+        self._windows = {name: _WindowTotals(seconds, 0) for name, seconds in windows.items()}
+        self._retention = max(self._span(seconds) for seconds in windows.values())
+
+    def _span(self, seconds: int) -> int:
+        return max(1, math.ceil(seconds / self.bucket_seconds))  # buckets per window
+
+    def _bucket_of(self, ts: float) -> int:
+        return int(ts // self.bucket_seconds)
+
+    def _advance(self, now: float):
+        """Slide every window forward to the bucket containing `now`."""
+        current = self._bucket_of(now)
+        if self._current is not None and current <= self._current:
+            return
+        self._current = current
+        for window in self._windows.values():
+            new_start = current - self._span(window.seconds) + 1
+            for b in range(window.start, min(new_start, window.start + self._retention + 1)):
+                if b in self._buckets:
+                    window.apply(self._buckets[b], -1)
+            window.start = max(window.start, new_start)
+        for b in [b for b in self._buckets if b <= current - self._retention]:
+            del self._buckets[b]
+
+    def ingest(self, per_model_domains: Dict[str, Counter], ts: Optional[float] = None):
+        """Merge one analysis ({model: Counter(domain)}) into the aggregate."""
+        now = time.time()
+        self._advance(now)
+        bucket_id = self._bucket_of(now if ts is None else ts)
+        if bucket_id <= self._current - self._retention or bucket_id > self._current:
+            return  # outside retention (or in the future)
+
+        delta = _Bucket()
+        for model, counter in per_model_domains.items():
+            delta.responses[model] += 1
+            sites = set()
+            for domain, count in counter.items():
+                if count:
+                    site = registrable_domain(domain) or domain
+                    delta.mentions[domain][model] += int(count)
+                    delta.presence[domain] += 1
+                    delta.site_mentions[site][model] += int(count)
+                    sites.add(site)
+            delta.site_presence.update(sites)
+
+        bucket = self._buckets.setdefault(bucket_id, _Bucket())
+        for mentions, per_domain in ((bucket.mentions, delta.mentions), (bucket.site_mentions, delta.site_mentions)):
+            for domain, per_model in per_domain.items():
+                mentions[domain].update(per_model)
+        bucket.presence.update(delta.presence)
+        bucket.site_presence.update(delta.site_presence)
+        bucket.responses.update(delta.responses)
+        for window in self._windows.values():
+            if bucket_id >= window.start:
+                window.apply(delta, +1)
+
+    def window(self, domain: str, window: str = "24h") -> Dict:
+        """Mentions and GEO score (share of responses mentioning the domain) over a rolling window."""
+        if window not in self._windows:
+            raise KeyError(f"unknown window {window!r}; expected one of {sorted(self._windows)}")
+        self._advance(time.time())
+        totals = self._windows[window]
+        target = normalize_domain(domain)
+        mentions, presence = totals.tables(target)
+        per_model = mentions.get(target, Counter())
+        responses = sum(totals.responses.values())
+        presence = presence.get(target, 0)
+        return {
+            "domain": target,
+            "window": window,
+            "mentions": int(sum(per_model.values())),
+            "per_model_mentions": counter_to_dict(per_model),
+            "responses": responses,
+            "responses_mentioning": presence,
+            "geo_score": round(presence / responses * 100, 2) if responses else 0.0,
+        }
+
+    def trend(self, domain: str, window: str = "7d") -> List[Dict]:
+        """Per-bucket mentions and GEO score for a trend chart (one point per bucket)."""
+        if window not in self._windows:
+            raise KeyError(f"unknown window {window!r}; expected one of {sorted(self._windows)}")
+        self._advance(time.time())
+        target = normalize_domain(domain)
+        points = []
+        for b in range(self._windows[window].start, self._current + 1):
+            bucket = self._buckets.get(b) or _Bucket()
+            mentions, presence = bucket.tables(target)
+            responses = sum(bucket.responses.values())
+            presence = presence.get(target, 0)
+            points.append({
+                "bucket_start": b * self.bucket_seconds,
+                "mentions": int(sum(mentions.get(target, {}).values())),
+                "responses": responses,
+                "geo_score": round(presence / responses * 100, 2) if responses else 0.0,
+            })
+        return points
+
+    def top_domains(self, window: str = "24h", n: int = 20) -> List[tuple]:
+        self._advance(time.time())
+        totals = self._windows[window]
+        return Counter({d: sum(c.values()) for d, c in totals.mentions.items()}).most_common(n)
+
+
+domain_aggregate = DomainAggregate()
@@ -1,6 +1,20 @@
 #services/ai_client.py
-import httpx
+import asyncio
+import importlib.util
+import json
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional
+
+import httpx
+
+from app.core.telemetry import stage_timer
+from app.services.cache_service import cache_key, response_cache
+from app.services.coalescing_service import provider_flights, provider_streams
+from app.services.prompt_service import count_tokens
+from app.services.ratelimit_service import ProviderLimits, parse_retry_after
+from app.services.semantic_cache_service import SEMANTIC_CACHE_ENABLED, semantic_cache
 
 API_KEYS = {
     "groq": os.getenv("GROQ_API_KEY"),
@@ -10,6 +24,525 @@ API_KEYS = {
     "huggingface": os.getenv("HUGGINGFACE_API_KEY"),
 }
 
-async def query_model(prompt: str, provider: str, max_tokens: int = 600):
-    # For now return mock data
-    return f"Simulated response from {provider} for: {prompt}"
+# Time budgets (seconds) for fan_out: one per provider call, one for the whole request.
+# The request deadline stays under the frontend's 30 s axios timeout.
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "20"))
+FANOUT_DEADLINE = float(os.getenv("FANOUT_DEADLINE", "25"))
+
+# Endpoint, default model, connection-pool settings and rate limits per provider.
+# Model names can be overridden with <PROVIDER>_MODEL env vars (e.g. GROQ_MODEL).
+# rpm/tpm are requests and tokens per minute (conservative free/entry-tier values;
+# None = unlimited), overridable with <PROVIDER>_RPM / <PROVIDER>_TPM (0 = unlimited).
+PROVIDERS = {
+    "groq": {
+        "base_url": "https://api.groq.com/openai/v1",
+        "model": "llama-3.1-8b-instant",
+        "max_connections": 20,
+        "max_keepalive": 10,
+        "keepalive_expiry": 30.0,
+        "http2": True,
+        "rpm": 30,
+        "tpm": 6000,
+    },
+    "claude": {
+        "base_url": "https://api.anthropic.com/v1",
+        "model": "claude-3-5-sonnet-latest",
+        "max_connections": 10,
+        "max_keepalive": 5,
+        "keepalive_expiry": 30.0,
+        "http2": True,
+        "rpm": 50,
+        "tpm": 40000,
+    },
+    "gemini": {
+        "base_url": "https://generativelanguage.googleapis.com/v1beta",
+        "model": "gemini-1.5-flash",
+        "max_connections": 10,
+        "max_keepalive": 5,
+        "keepalive_expiry": 30.0,
+        "http2": True,
+        "rpm": 15,
+        "tpm": 1000000,
+    },
+    "openrouter": {
+        "base_url": "https://openrouter.ai/api/v1",
+        "model": "openai/gpt-4o",
+        "max_connections": 10,
+        "max_keepalive": 5,
+        "keepalive_expiry": 30.0,
+        "http2": True,
+        "rpm": 60,
+        "tpm": None,
+    },
+    "huggingface": {
+        "base_url": "https://api-inference.huggingface.co",
+        "model": "mistralai/Mistral-7B-Instruct-v0.3",
+        "max_connections": 5,
+        "max_keepalive": 2,
+        "keepalive_expiry": 15.0,
+        "http2": False,
+        "rpm": 30,
+        "tpm": None,
+    },
+}
+
+for _name, _cfg in PROVIDERS.items():
+    for _limit in ("rpm", "tpm"):
+        _override = os.getenv(f"{_name.upper()}_{_limit.upper()}")
+        if _override is not None:
+            _cfg[_limit] = float(_override) or None
+
+# Calls sent back to the rate limiter's queue after a 429 before the error is returned
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "2"))
+
+# Load testing: send every provider to tools/mock_provider_server.py at <url>/<provider>
+# (plain HTTP/1.1, placeholder key where none is set) instead of the real APIs
+MOCK_PROVIDER_URL = os.getenv("MOCK_PROVIDER_URL")
+if MOCK_PROVIDER_URL:
+    for _name, _cfg in PROVIDERS.items():
+        _cfg["base_url"] = f"{MOCK_PROVIDER_URL.rstrip('/')}/{_name}"
+        _cfg["http2"] = False
+        API_KEYS[_name] = API_KEYS[_name] or "mock"
+
+# UI model ids that are served through another provider
+PROVIDER_ALIASES = {"gpt4": "openrouter"}
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ProviderError(Exception):
+    """A provider call failed (transport error or non-2xx response)."""
+
+    def __init__(self, provider: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status_code = status_code
+
+
+class ProviderRegistry:
+    """
+    One long-lived httpx.AsyncClient per provider, so connections and TLS sessions
+    are reused across calls. Opened on app startup and closed on shutdown; a client
+    is also created lazily if a provider is used before startup (scripts, tests).
+    """
+
+    def __init__(self, providers: Dict[str, Dict] = PROVIDERS, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.providers = providers
+        self.transport = transport  # override for tests; None uses httpx's pooled transport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats = {name: {"requests": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0} for name in providers}
+
+    def _build_client(self, name: str) -> httpx.AsyncClient:
+        cfg = self.providers[name]
+        return httpx.AsyncClient(
+            base_url=cfg["base_url"],
+            http2=cfg["http2"] and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=cfg["max_connections"],
+                max_keepalive_connections=cfg["max_keepalive"],
+                keepalive_expiry=cfg["keepalive_expiry"],
+            ),
+            timeout=httpx.Timeout(PROVIDER_TIMEOUT, connect=5.0),
+            transport=self.transport,
+        )
+
+    async def startup(self):
+        for name in self.providers:
+            self.client(name)
+
+    async def shutdown(self):
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(c.aclose() for c in clients.values()), return_exceptions=True)
+
+    def client(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._build_client(name)
+        return client
+
+    @asynccontextmanager
+    async def track(self, name: str):
+        stats = self._stats[name]
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            yield self.client(name)
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+
+    def stats(self) -> Dict[str, Dict]:
+        out = {}
+        for name, cfg in self.providers.items():
+            client = self._clients.get(name)
+            # httpx does not expose its pool publicly; httpcore's pool lists its connections
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            out[name] = {
+                **self._stats[name],
+                "open": client is not None and not client.is_closed,
+                "http2": cfg["http2"] and HTTP2_AVAILABLE,
+                "max_connections": cfg["max_connections"],
+                "max_keepalive": cfg["max_keepalive"],
+                "connections": len(connections),
+                "idle_connections": sum(1 for c in connections if c.is_idle()),
+            }
+        return out
+
+
+registry = ProviderRegistry()
+limits = ProviderLimits(PROVIDERS)
+
+
+def _provider_model(provider: str) -> str:
+    return os.getenv(f"{provider.upper()}_MODEL", PROVIDERS[provider]["model"])
+
+
+def _build_request(provider: str, prompt: str, max_tokens: int, temperature: float) -> Dict:
+    """Return the httpx request kwargs (url, headers, json) for one provider call."""
+    key = API_KEYS[provider]
+    model = _provider_model(provider)
+    messages = [{"role": "user", "content": prompt}]
+    if provider in ("groq", "openrouter"):
+        return {
+            "url": "/chat/completions",
+            "headers": {"Authorization": f"Bearer {key}"},
+            "json": {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature},
+        }
+    if provider == "claude":
+        return {
+            "url": "/messages",
+            "headers": {"x-api-key": key, "anthropic-version": "2023-06-01"},
+            "json": {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature},
+        }
+    if provider == "gemini":
+        return {
+            "url": f"/models/{model}:generateContent",
+            "headers": {"x-goog-api-key": key},
+            "json": {
+                "contents": [{"parts": [{"text": prompt}]}],
+                "generationConfig": {"maxOutputTokens": max_tokens, "temperature": temperature},
+            },
+        }
+    # huggingface inference API
+    return {
+        "url": f"/models/{model}",
+        "headers": {"Authorization": f"Bearer {key}"},
+        "json": {
+            "inputs": prompt,
+            "parameters": {"max_new_tokens": max_tokens, "temperature": temperature, "return_full_text": False},
+        },
+    }
+
+
+def _extract_text(provider: str, data) -> str:
+    if provider in ("groq", "openrouter"):
+        return data["choices"][0]["message"]["content"] or ""
+    if provider == "claude":
+        return "".join(block.get("text", "") for block in data["content"] if block.get("type") == "text")
+    if provider == "gemini":
+        parts = data["candidates"][0]["content"]["parts"]
+        return "".join(part.get("text", "") for part in parts)
+    return data[0]["generated_text"]
+
+
+def _build_stream_request(provider: str, prompt: str, max_tokens: int, temperature: float) -> Dict:
+    """_build_request, asking the provider to stream the answer as server-sent events."""
+    request = _build_request(provider, prompt, max_tokens, temperature)
+    if provider == "gemini":
+        request["url"] = request["url"].replace(":generateContent", ":streamGenerateContent")
+        request["params"] = {"alt": "sse"}
+    else:
+        request["json"]["stream"] = True
+    return request
+
+
+def _extract_delta(provider: str, event: Dict) -> str:
+    """Text carried by one streamed event ("" for bookkeeping events)."""
+    if provider in ("groq", "openrouter"):
+        choices = event.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ""
+    if provider == "claude":
+        if event.get("type") == "error":
+            raise ProviderError(provider, f"stream error: {event.get('error', {}).get('message', event)}")
+        return event["delta"].get("text", "") if event.get("type") == "content_block_delta" else ""
+    if provider == "gemini":
+        content = (event.get("candidates") or [{}])[0].get("content") or {}
+        return "".join(part.get("text", "") for part in content.get("parts") or [])
+    # huggingface text-generation-inference
+    token = event.get("token") or {}
+    return "" if token.get("special") else token.get("text", "")
+
+
+async def _stream_provider(provider: str, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of _call_provider (same limiter and 429 handling).
+    A provider that answers with plain JSON instead of an event stream is
+    yielded as one chunk.
+    """
+    request = _build_stream_request(provider, prompt, max_tokens, temperature)
+    prompt_tokens = count_tokens(prompt)
+    limiter = limits.get(provider)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        async with limiter.acquire(prompt_tokens + max_tokens) as permit, registry.track(provider) as client:
+            try:
+                async with client.stream("POST", **request) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        if response.status_code == 429:
+                            permit.throttled(parse_retry_after(response.headers.get("retry-after")))
+                            if attempt < RATE_LIMIT_RETRIES:
+                                continue
+                        elif response.status_code in (503, 529):
+                            permit.overloaded()
+                        raise ProviderError(provider, f"HTTP {response.status_code}: {response.text[:200]}", response.status_code)
+
+                    used_tokens = prompt_tokens
+                    if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                        try:
+                            text = _extract_text(provider, json.loads(await response.aread()))
+                        except (ValueError, KeyError, IndexError, TypeError) as e:
+                            raise ProviderError(provider, f"unexpected response shape ({e})", response.status_code) from e
+                        used_tokens += count_tokens(text)
+                        yield text
+                    else:
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue  # "event:" names, comments, keep-alives
+                            payload = line[5:].strip()
+                            if payload == "[DONE]":
+                                break
+                            try:
+                                delta = _extract_delta(provider, json.loads(payload))
+                            except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                                raise ProviderError(provider, f"unexpected stream event ({e})", response.status_code) from e
+                            if delta:
+                                used_tokens += count_tokens(delta)
+                                yield delta
+                    permit.succeeded(used_tokens)
+                    return
+            except httpx.HTTPError as e:
+                raise ProviderError(provider, str(e) or type(e).__name__) from e
+
+
+async def _call_provider(provider: str, prompt: str, max_tokens: int, temperature: float) -> str:
+    """
+    One upstream call, shaped by the provider's limiter: it waits (by priority)
+    for request/token budget and a concurrency slot, and a 429 sends it back to
+    the queue until Retry-After has passed, up to RATE_LIMIT_RETRIES times.
+    """
+    request = _build_request(provider, prompt, max_tokens, temperature)
+    prompt_tokens = count_tokens(prompt)
+    limiter = limits.get(provider)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        async with limiter.acquire(prompt_tokens + max_tokens) as permit, registry.track(provider) as client:
+            try:
+                response = await client.post(**request)
+            except httpx.HTTPError as e:
+                raise ProviderError(provider, str(e) or type(e).__name__) from e
+            if response.status_code == 429:
+                permit.throttled(parse_retry_after(response.headers.get("retry-after")))
+                if attempt < RATE_LIMIT_RETRIES:
+                    continue
+            elif response.status_code in (503, 529):
+                permit.overloaded()
+            if response.status_code >= 400:
+                raise ProviderError(provider, f"HTTP {response.status_code}: {response.text[:200]}", response.status_code)
+            try:
+                text = _extract_text(provider, response.json())
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise ProviderError(provider, f"unexpected response shape ({e})", response.status_code) from e
+            permit.succeeded(prompt_tokens + count_tokens(text))
+            return text
+
+
+async def query_model(prompt: str, provider: str, max_tokens: int = 600, temperature: float = 0.7, use_cache: bool = True):
+    """
+    Query one provider over its pooled client. Providers without an API key
+    (or unknown ids) return simulated text so the app runs without credentials.
+    Answers are cached by (provider, prompt, max_tokens, temperature);
+    use_cache=False skips the lookup but still stores the fresh answer.
+    With SEMANTIC_CACHE_ENABLED, an exact miss may be answered from a cached
+    paraphrase of the prompt. Identical calls already in flight share one
+    upstream request.
+    """
+    name = PROVIDER_ALIASES.get(provider, provider)
+    if name not in PROVIDERS or not API_KEYS.get(name):
+        return f"Simulated response from {provider} for: {prompt}"
+
+    key = cache_key(name, prompt, max_tokens, temperature)
+    with stage_timer("query_model", provider):
+        if use_cache:
+            cached = _cached_answer(key, name, prompt, max_tokens, temperature)
+            if cached is not None:
+                return cached
+
+        async def fetch():
+            started = time.perf_counter()
+            text = await _call_provider(name, prompt, max_tokens, temperature)
+            if text:
+                _store_answer(key, name, prompt, max_tokens, temperature, text, time.perf_counter() - started)
+            return text
+
+        return await provider_flights.do(key, fetch)
+
+
+async def query_model_stream(
+    prompt: str, provider: str, max_tokens: int = 600, temperature: float = 0.7, use_cache: bool = True
+) -> AsyncIterator[str]:
+    """
+    Like query_model, but yields the answer chunk by chunk as the provider
+    generates it. Cache hits and simulated answers arrive as a single chunk;
+    a completely streamed answer is cached like query_model's. Identical
+    streams in flight share one upstream stream (late joiners get the chunks
+    they missed first), and a stream whose answer is already being fetched by
+    query_model waits for that call instead of starting another.
+    """
+    name = PROVIDER_ALIASES.get(provider, provider)
+    if name not in PROVIDERS or not API_KEYS.get(name):
+        # nothing to stream from
+        yield await query_model(prompt, provider, max_tokens, temperature, use_cache=use_cache)
+        return
+
+    key = cache_key(name, prompt, max_tokens, temperature)
+    with stage_timer("query_model", provider):
+        if use_cache:
+            cached = _cached_answer(key, name, prompt, max_tokens, temperature)
+            if cached is not None:
+                yield cached
+                return
+        if key in provider_flights:
+            # join the blocking call already in flight (it caches the answer itself)
+            yield await provider_flights.do(key, lambda: _call_provider(name, prompt, max_tokens, temperature))
+            return
+
+        async def fetch():
+            started = time.perf_counter()
+            parts = []
+            async for chunk in _stream_provider(name, prompt, max_tokens, temperature):
+                parts.append(chunk)
+                yield chunk
+            text = "".join(parts)
+            if text:
+                _store_answer(key, name, prompt, max_tokens, temperature, text, time.perf_counter() - started)
+
+        async for chunk in provider_streams.stream(key, fetch):
+            yield chunk
+
+
+def _cached_answer(key: str, name: str, prompt: str, max_tokens: int, temperature: float) -> Optional[str]:
+    cached = response_cache.get(key)
+    if cached is None and SEMANTIC_CACHE_ENABLED:
+        cached = semantic_cache.get(name, prompt, max_tokens, temperature)
+    return cached
+
+
+def _store_answer(key: str, name: str, prompt: str, max_tokens: int, temperature: float, text: str, elapsed: float):
+    response_cache.set(key, text)
+    if SEMANTIC_CACHE_ENABLED:
+        semantic_cache.set(name, prompt, max_tokens, temperature, text, elapsed)
+
+
+def _provider_result(provider: str, status: str, started: float, response: str = None, error: str = None) -> Dict:
+    return {
+        "provider": provider,
+        "status": status,  # "ok" | "timeout" | "error"
+        "response": response,
+        "error": error,
+        "response_time": int((time.perf_counter() - started) * 1000),  # ms
+    }
+
+
+async def _collect_stream(prompt: str, provider: str, max_tokens: int, use_cache: bool,
+                          on_chunk: Callable[[str, str], None]) -> str:
+    parts = []
+    async for chunk in query_model_stream(prompt, provider, max_tokens, use_cache=use_cache):
+        parts.append(chunk)
+        on_chunk(provider, chunk)
+    return "".join(parts)
+
+
+async def _timed_query(prompt: str, provider: str, max_tokens: int, timeout: float, use_cache: bool,
+                       on_chunk: Optional[Callable[[str, str], None]] = None) -> Dict:
+    started = time.perf_counter()
+    if on_chunk is None:
+        query = query_model(prompt, provider, max_tokens, use_cache=use_cache)
+    else:
+        query = _collect_stream(prompt, provider, max_tokens, use_cache, on_chunk)
+    try:
+        text = await asyncio.wait_for(query, timeout)
+    except asyncio.TimeoutError:
+        return _provider_result(provider, "timeout", started, error=f"no response within {timeout:g}s")
+    except Exception as e:
+        return _provider_result(provider, "error", started, error=str(e) or type(e).__name__)
+    return _provider_result(provider, "ok", started, response=text)
+
+
+async def fan_out_iter(
+    prompt: str,
+    providers: Iterable[str],
+    max_tokens: int = 600,
+    timeout: float = PROVIDER_TIMEOUT,
+    deadline: float = FANOUT_DEADLINE,
+    use_cache: bool = True,
+    on_chunk: Optional[Callable[[str, str], None]] = None,
+) -> AsyncIterator[Dict]:
+    """
+    Query every provider concurrently and yield each result as soon as it lands.
+    Providers that are still running when the request deadline passes are cancelled
+    and yielded as "timeout", so callers always get exactly one result per provider.
+    With on_chunk, answers are streamed and on_chunk(provider, text) is called
+    for every chunk as it arrives; the results still carry the full text.
+    """
+    providers = list(dict.fromkeys(providers))  # dedupe, keep request order
+    if not providers:
+        return
+
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    pending = {
+        asyncio.create_task(_timed_query(prompt, p, max_tokens, min(timeout, deadline), use_cache, on_chunk)): p
+        for p in providers
+    }
+    try:
+        while pending:
+            remaining = end - loop.time()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            # keep request order among results that finished together
+            for task in sorted(done, key=lambda t: providers.index(pending[t])):
+                del pending[task]
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    for provider in pending.values():
+        yield _provider_result(provider, "timeout", started, error=f"request deadline of {deadline:g}s exceeded")
+
+
+async def fan_out(
+    prompt: str,
+    providers: Iterable[str],
+    max_tokens: int = 600,
+    timeout: float = PROVIDER_TIMEOUT,
+    deadline: float = FANOUT_DEADLINE,
+    use_cache: bool = True,
+) -> Dict[str, Dict]:
+    """
+    Run fan_out_iter to completion and return {provider: result} in request order.
+    Total latency is bounded by the slowest provider (or the deadline), not their sum.
+    """
+    providers = list(dict.fromkeys(providers))
+    results = {}
+    async for result in fan_out_iter(prompt, providers, max_tokens, timeout, deadline, use_cache):
+        results[result["provider"]] = result
+    return {p: results[p] for p in providers}
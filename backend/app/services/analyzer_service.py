@@ -1,7 +1,8 @@
 # services/analyzer_service.py
 from collections import Counter
-from typing import Dict, Tuple, List
-from app.core.utils import normalize_domain, counter_to_dict
+from typing import Dict, Tuple, List, Optional
+from app.core.telemetry import timed_stage
+from app.core.utils import normalize_domain, counter_to_dict, registrable_domain
 
 from app.core.utils import counter_to_dict
 from collections import Counter
@@ -9,7 +10,112 @@ from collections import Counter
 import math
 
 
-def compute_geo_score(global_counts: Counter, target_domain: str, total_models: int) -> float:
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+class PresenceIndex:
+    """
+    Compact per-model presence index for one analysis: one bitset (int) per
+    domain with bit i set when models[i] mentioned it at least once, plus the
+    per-model mention counts. Built once per analysis; presence, share of
+    models and top-k are then bit operations, so scoring many target domains
+    costs about the same as scoring one.
+
+    Hosts are also rolled up to their registrable domain: a registrable target
+    ("hubspot.com") matches every host under it ("blog.hubspot.com"), while a
+    subdomain target matches only that host.
+    """
+
+    def __init__(self, per_model_counts: Dict[str, Dict[str, int]]):
+        self.models = list(per_model_counts)
+        self.bits: Dict[str, int] = {}
+        self._mentions: Dict[str, Dict[str, int]] = {}
+        self._site_bits: Dict[str, int] = {}
+        self._site_mentions: Dict[str, Dict[str, int]] = {}
+        for i, (model, counter) in enumerate(per_model_counts.items()):
+            bit = 1 << i
+            for domain, count in counter.items():
+                if count <= 0:
+                    continue
+                domain = normalize_domain(domain)
+                site = registrable_domain(domain) or domain
+                for bits, by_domain, key in ((self.bits, self._mentions, domain),
+                                             (self._site_bits, self._site_mentions, site)):
+                    bits[key] = bits.get(key, 0) | bit
+                    mentions = by_domain.setdefault(key, {})
+                    mentions[model] = mentions.get(model, 0) + int(count)
+
+    def _lookup(self, domain: str) -> Tuple[str, int, Dict[str, int]]:
+        """(normalized target, presence bits, mentions per model) for a target domain."""
+        target = normalize_domain(domain)
+        if target and registrable_domain(target) == target:
+            return target, self._site_bits.get(target, 0), self._site_mentions.get(target, {})
+        return target, self.bits.get(target, 0), self._mentions.get(target, {})
+
+    def models_mentioning(self, domain: str) -> List[str]:
+        _, bits, _ = self._lookup(domain)
+        return [m for i, m in enumerate(self.models) if bits >> i & 1]
+
+    def presence_count(self, domain: str) -> int:
+        return _popcount(self._lookup(domain)[1])
+
+    def geo_score(self, domain: str, total_models: Optional[int] = None) -> float:
+        """Share of models (0-100) that mention the domain at least once."""
+        total = self.total_models if total_models is None else total_models
+        if total <= 0 or not domain:
+            return 0.0
+        return round(min(self.presence_count(domain) / total, 1.0) * 100, 2)
+
+    def mentions(self, domain: str) -> Dict[str, int]:
+        """Mention count per model (0 for models that never mention it)."""
+        found = self._lookup(domain)[2]
+        return {m: found.get(m, 0) for m in self.models}
+
+    def top_domains(self, k: int = 20) -> List[Tuple[str, int]]:
+        """Domains mentioned by the most models, ties broken by total mentions."""
+        ranked = sorted(
+            self.bits,
+            key=lambda d: (_popcount(self.bits[d]), sum(self._mentions[d].values())),
+            reverse=True,
+        )
+        return [(d, _popcount(self.bits[d])) for d in ranked[:k]]
+
+    def score_targets(self, targets: List[str], total_models: Optional[int] = None) -> List[Dict]:
+        """
+        Score many target domains against this analysis in one pass.
+        Targets are normalized and deduplicated once; each result carries its
+        GEO score, per-model mentions and a competition rank (1 = best; ties
+        on score and total mentions share a rank), in descending rank order.
+        """
+        total = self.total_models if total_models is None else total_models
+        rows = []
+        for domain in dict.fromkeys(normalize_domain(t) for t in targets if t):
+            _, bits, found = self._lookup(domain)
+            present = _popcount(bits)
+            rows.append({
+                "domain": domain,
+                "geo_score": round(min(present / total, 1.0) * 100, 2) if total > 0 else 0.0,
+                "models_mentioning": present,
+                "mentions": sum(found.values()),
+                "per_model_mentions": {m: found.get(m, 0) for m in self.models},
+            })
+        rows.sort(key=lambda r: (r["geo_score"], r["mentions"]), reverse=True)
+        previous = None
+        for position, row in enumerate(rows, 1):
+            key = (row["geo_score"], row["mentions"])
+            if key != previous:
+                rank, previous = position, key
+            row["rank"] = rank
+        return rows
+
+    @property
+    def total_models(self) -> int:
+        return len(self.models)
+
+
+def compute_geo_score(global_counts: Counter, target_domain: str, total_models: int,
+                      presence: Optional[PresenceIndex] = None) -> float:
     """
     GEO score: proportion of models that mention the domain, expressed 0-100.
     If a domain is mentioned multiple times by a model it's still counted once per model in this metric.
@@ -19,36 +125,36 @@ def compute_geo_score(global_counts: Counter, target_domain: str, total_models:
     if not target_domain:
         return 0.0
 
-    target = normalize_domain(target_domain)
-    # Count models that mentioned the domain at least once
-    mentions = global_counts.get(target, 0)
+    if presence is not None:
+        return presence.geo_score(target_domain, total_models)
 
-    # This compute assumes global_counts is aggregated counts (across models).
-    # To avoid counting multiple mentions from the same model multiple times we'd
-    # prefer per-model counters; caller can pass the appropriate aggregated count.
-    # We'll treat mentions / total_models as the fraction.
+    # Only aggregated counts available: a model repeating the domain would count
+    # several times, so the best we can do is cap the score at 100.
+    mentions = min(_count_matches(global_counts, target_domain), total_models)
     score = (mentions / total_models) * 100
     return round(score, 2)
 
 
-def model_comparison(per_model_counts: Dict[str, Dict[str, int]], target_domain: str) -> Dict[str, int]:
+def model_comparison(per_model_counts: Dict[str, Dict[str, int]], target_domain: str,
+                     presence: Optional[PresenceIndex] = None) -> Dict[str, int]:
     """
     Return how many times each model mentioned the given domain (int).
     Accepts either Counter objects or plain dicts in per_model_counts values.
     """
-    tgt = normalize_domain(target_domain)
-    result = {}
-    for model, counter in per_model_counts.items():
-        # support either Counter or dict
-        count = 0
-        if hasattr(counter, "get"):
-            count = int(counter.get(tgt, 0))
-        else:
-            count = int(counter.get(tgt, 0))
-        result[model] = count
-    return result
+    if presence is not None:
+        return presence.mentions(target_domain)
+    return {model: _count_matches(counter, target_domain) for model, counter in per_model_counts.items()}
+
+
+def _count_matches(counts: Dict[str, int], target_domain: str) -> int:
+    """Mentions of the target in {domain: count}, subdomains included when the target is registrable."""
+    target = normalize_domain(target_domain)
+    if not target or registrable_domain(target) != target:
+        return int(counts.get(target, 0))
+    return int(sum(count for domain, count in counts.items() if registrable_domain(domain) == target))
 
 
+@timed_stage("calculate_visibility_metrics")
 def calculate_visibility_metrics(responses: Dict[str, str], per_model_domains: Dict[str, Counter]) -> Dict[str, Dict]:
     """
     Create visibility metrics per model similar to the Streamlit frontend:
@@ -0,0 +1,118 @@
+# services/batch_service.py
+import asyncio
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.core.telemetry import stage_timer
+from app.core.utils import counter_to_dict
+from app.services.analyzer_service import (
+    PresenceIndex, calculate_visibility_metrics, compute_geo_score, model_comparison, rank_models
+)
+from app.services.parser_service import parse_responses
+
+# Worker processes for CPU-bound parse+score work (0 = one per CPU core)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "0")) or os.cpu_count() or 1
+# Response sets sent to a worker per task; amortizes pickling/IPC for small sets
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "16"))
+# A single set with fewer characters than this is analyzed in-process (a few ms at most),
+# cheaper than pickling it to a worker and back
+POOL_MIN_CHARS = int(os.getenv("POOL_MIN_CHARS", "32768"))
+# Workers are never forked from the server: a fork would copy its threads' locks and
+# open sockets mid-use. forkserver where the platform has it, spawn otherwise.
+BATCH_START_METHOD = os.getenv("BATCH_START_METHOD") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def analyze_response_set(responses: Dict[str, str], target_domain: Optional[str] = None, top_n: int = 20) -> Dict:
+    """
+    Full parse + score pipeline for one {model: text} set.
+    Plain module-level function returning JSON-ready data, so it can run in a worker process.
+    """
+    global_domains, per_model_domains, topics, citations = parse_responses(responses, top_n)
+    metrics = calculate_visibility_metrics(responses, per_model_domains)
+    result = {
+        "metrics": metrics,
+        "rankings": rank_models(metrics),
+        "global_domains": counter_to_dict(global_domains),
+        "per_model_domains": {m: counter_to_dict(c) for m, c in per_model_domains.items()},
+        "topics": topics,
+        "citations": citations,
+    }
+    if target_domain:
+        result["target_domain"] = target_domain
+        presence = PresenceIndex(per_model_domains)
+        result["geo_score"] = compute_geo_score(global_domains, target_domain, len(responses), presence)
+        result["per_model_mentions"] = model_comparison(per_model_domains, target_domain, presence)
+    return result
+
+
+def _analyze_chunk(items: List[Dict]) -> List[Dict]:
+    results = []
+    for item in items:
+        try:
+            results.append({"result": analyze_response_set(item["responses"], item.get("target_domain"))})
+        except Exception as e:  # one bad set must not sink the chunk
+            results.append({"error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS,
+                                    mp_context=multiprocessing.get_context(BATCH_START_METHOD))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def analyze_in_pool(responses: Dict[str, str], target_domain: Optional[str] = None) -> Dict:
+    """Run analyze_response_set in the worker pool so the event loop stays free."""
+    loop = asyncio.get_running_loop()
+    # timed here, round trip included: stage timers inside the workers stay in those processes
+    with stage_timer("analyze_in_pool"):
+        return await loop.run_in_executor(get_pool(), analyze_response_set, responses, target_domain)
+
+
+async def analyze_responses(responses: Dict[str, str], target_domain: Optional[str] = None) -> Dict:
+    """analyze_response_set for one request: inline when small, in the worker pool otherwise."""
+    if sum(len(text or "") for text in responses.values()) < POOL_MIN_CHARS:
+        return analyze_response_set(responses, target_domain)
+    return await analyze_in_pool(responses, target_domain)
+
+
+async def iter_batch(items: List[Dict], chunk_size: int = BATCH_CHUNK_SIZE) -> AsyncIterator[Dict]:
+    """
+    Spread items ({"responses": ..., "target_domain": ...}) over the worker pool
+    in chunks and yield {"index": i, "result"|"error": ...} as each chunk finishes.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    # smaller chunks for small batches so every worker gets something to do
+    chunk_size = max(1, min(chunk_size, math.ceil(len(items) / BATCH_WORKERS)))
+
+    async def run_chunk(start: int):
+        with stage_timer("analyze_chunk_in_pool"):
+            results = await loop.run_in_executor(pool, _analyze_chunk, items[start:start + chunk_size])
+        return start, results
+
+    tasks = [asyncio.ensure_future(run_chunk(start)) for start in range(0, len(items), chunk_size)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            start, results = await next_done
+            for offset, outcome in enumerate(results):
+                yield {"index": start + offset, **outcome}
+    finally:
+        for task in tasks:
+            task.cancel()
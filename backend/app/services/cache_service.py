@@ -0,0 +1,123 @@
+# services/cache_service.py
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# In-memory tier budget, entry lifetime, and optional on-disk tier that survives restarts
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+CACHE_DB_PATH = os.getenv("LLM_CACHE_DB")  # e.g. ./llm_cache.sqlite3; unset = memory only
+
+
+def cache_key(provider: str, prompt: str, max_tokens: int, temperature: float) -> str:
+    """Content address of one provider call."""
+    payload = json.dumps([provider, prompt, max_tokens, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier TTL cache for provider responses:
+      - memory: LRU bounded by the total UTF-8 size of cached texts
+      - disk (optional): SQLite table consulted on memory misses; hits are promoted
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, ttl: float = CACHE_TTL, db_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()  # key -> (text, expires_at, size)
+        self._bytes = 0
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0}
+        self._db = self._open_db(db_path) if db_path else None
+
+    @staticmethod
+    def _open_db(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        return db
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry[0]
+            self._drop(key)
+            self._counters["expirations"] += 1
+
+        if self._db is not None:
+            row = self._db.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now:
+                self._remember(key, row[0], row[1])
+                self._counters["hits"] += 1
+                self._counters["disk_hits"] += 1
+                return row[0]
+            if row:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._counters["expirations"] += 1
+
+        self._counters["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._remember(key, value, expires_at)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at)
+            )
+        self._counters["stores"] += 1
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        size = len(value.encode("utf-8"))
+        if key in self._entries:
+            self._drop(key)
+        if size > self.max_bytes:
+            return  # larger than the whole budget: disk tier only
+        while self._bytes + size > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._counters["evictions"] += 1
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+
+    def _drop(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        if self._db is not None:
+            self._db.execute("DELETE FROM llm_cache")
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "disk": self._db is not None,
+        }
+
+
+response_cache = ResponseCache(db_path=CACHE_DB_PATH)
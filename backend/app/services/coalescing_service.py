@@ -0,0 +1,133 @@
+# services/coalescing_service.py
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _Flights:
+    """Bookkeeping shared by SingleFlight and StreamFlights: in-flight calls by key."""
+
+    def __init__(self):
+        self._flights: Dict[str, object] = {}
+        self._counters = {"leaders": 0, "followers": 0, "abandoned": 0}
+
+    def _forget(self, key: str, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    def stats(self) -> Dict:
+        return {**self._counters, "in_flight": len(self._flights)}
+
+
+class SingleFlight(_Flights):
+    """
+    Coalesce concurrent calls that share a key onto one in-flight task.
+
+    Every caller awaits the shared task through asyncio.shield, so a caller
+    that is cancelled (client disconnect, fan-out deadline) only detaches
+    itself. The upstream call is cancelled only when its last waiter leaves.
+    """
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(factory()))
+            flight.task.add_done_callback(lambda _, key=key, flight=flight: self._forget(key, flight))
+            self._counters["leaders"] += 1
+        else:
+            self._counters["followers"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._counters["abandoned"] += 1
+                # forget it now: the done-callback runs later, and a caller arriving
+                # in between must start a new flight, not join the cancelled one
+                self._forget(key, flight)
+
+
+class _StreamFlight:
+    __slots__ = ("task", "chunks", "finished", "error", "changed", "waiters")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.chunks: List = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.waiters = 0
+
+    def wake(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class StreamFlights(_Flights):
+    """
+    SingleFlight for async iterators: concurrent streams that share a key are
+    served by one upstream stream, pumped by a background task. Every
+    subscriber gets every chunk, including those that arrived before it
+    joined; an upstream error is raised to all of them. As with SingleFlight,
+    the upstream stream is cancelled only when its last subscriber leaves.
+    """
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _StreamFlight()
+            flight.task = asyncio.ensure_future(self._pump(flight, factory()))
+            flight.task.add_done_callback(lambda _, key=key, flight=flight: self._forget(key, flight))
+            self._counters["leaders"] += 1
+        else:
+            self._counters["followers"] += 1
+
+        flight.waiters += 1
+        try:
+            sent = 0
+            while True:
+                while sent < len(flight.chunks):
+                    yield flight.chunks[sent]
+                    sent += 1
+                if flight.finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed.wait()
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._counters["abandoned"] += 1
+                self._forget(key, flight)
+
+    @staticmethod
+    async def _pump(flight: _StreamFlight, upstream: AsyncIterator):
+        try:
+            async for chunk in upstream:
+                flight.chunks.append(chunk)
+                flight.wake()
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.finished = True
+            flight.wake()
+
+
+provider_flights = SingleFlight()
+provider_streams = StreamFlights()
@@ -0,0 +1,213 @@
+# services/job_service.py
+import asyncio
+import contextvars
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.telemetry import current_trace_id
+from app.services.pipeline_service import AnalysisState, iter_analysis
+from app.services.ratelimit_service import PRIORITY_BACKGROUND, request_priority
+from app.services.store_service import analysis_store
+
+# Background analyses run by this many concurrent workers
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "4"))
+# Jobs waiting beyond this are rejected instead of queued
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "1000"))
+# Finished jobs (and their results) are dropped this many seconds after finishing
+JOB_TTL = float(os.getenv("JOB_TTL", "3600"))
+# At most this many finished jobs are kept; the oldest go first, TTL or not
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "10000"))
+
+# queued -> running -> completed (every model answered)
+#                   -> partial   (finished, some models failed or timed out)
+#                   -> failed    (every model failed, or the pipeline raised)
+JOB_STATES = ("queued", "running", "partial", "completed", "failed")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, prompt: str, models: List[str], target_domain: Optional[str] = None, use_cache: bool = True):
+        self.id = f"analysis_{uuid.uuid4().hex}"
+        self.state = AnalysisState(prompt, models, target_domain)
+        self.use_cache = use_cache
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+        # the submitting request's trace id and route, carried into background workers
+        self.trace_id = current_trace_id()
+        self.context = contextvars.copy_context()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("partial", "completed", "failed")
+
+    def progress(self) -> Dict:
+        models = {m: "pending" for m in self.state.models}
+        models.update({m: r["status"] for m, r in self.state.model_results.items()})
+        completed = sum(1 for s in models.values() if s != "pending")
+        return {
+            "completed": completed,
+            "total": len(models),
+            "percent": round(100 * completed / len(models), 1) if models else 100.0,
+            "summary": self.state.summary is not None,
+            "models": models,
+            # live counts of answers still streaming in
+            "streaming": {
+                m: {"chars": s.chars, "domains": sum(s.domains.values()), "citations": s.citations}
+                for m, s in self.state.streams.items()
+            },
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "analysis_id": self.id,
+            "status": self.status,
+            "progress": self.progress(),
+            "failed_models": self.state.failed_models,
+            "error": self.error,
+            "trace_id": self.trace_id,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "results": self.state.results() if self.status != "queued" else None,
+        }
+
+
+class JobManager:
+    """
+    In-memory analysis jobs: a bounded queue drained by ANALYSIS_WORKERS asyncio
+    workers, with finished jobs kept for JOB_TTL seconds (and at most
+    JOB_MAX_FINISHED of them) so progress/results can be polled via
+    /api/analysis-progress/{analysis_id}.
+    """
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS, max_queue: int = JOB_QUEUE_SIZE, ttl: float = JOB_TTL,
+                 max_finished: int = JOB_MAX_FINISHED):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        # finished job ids in finish order, so expiry only looks at the oldest
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        tasks = self._tasks
+        while tasks:
+            # cancel again if a worker survived: on 3.11 asyncio.wait_for can swallow a
+            # cancellation that races with its result, leaving the worker looping
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks, timeout=1.0)
+            tasks = [task for task in tasks if not task.done()]
+        self._tasks = []
+        self._queue = None
+
+    def create(self, prompt: str, models: List[str], target_domain: Optional[str] = None, use_cache: bool = True) -> Job:
+        self._expire()
+        job = Job(prompt, models, target_domain, use_cache)
+        self._jobs[job.id] = job
+        return job
+
+    async def submit(self, prompt: str, models: List[str], target_domain: Optional[str] = None, use_cache: bool = True) -> Job:
+        """Queue an analysis for the background workers; raises QueueFullError when saturated."""
+        await self.start()
+        job = self.create(prompt, models, target_domain, use_cache)
+        # queued analyses yield provider capacity to interactive requests
+        job.context.run(request_priority.set, PRIORITY_BACKGROUND)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            del self._jobs[job.id]
+            raise QueueFullError(f"analysis queue is full ({self.max_queue} jobs)")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def run(self, job: Job) -> Job:
+        """Run a job's analysis in the current task, updating its state as models answer."""
+        async for _ in self.stream(job):
+            pass
+        return job
+
+    async def stream(self, job: Job) -> AsyncIterator[Tuple[str, Dict]]:
+        """Like run(), but also yields the pipeline's (event, payload) pairs as they happen."""
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            async for event in iter_analysis(
+                job.state.prompt, job.state.models, job.state.target_domain, job.use_cache, job.state
+            ):
+                yield event
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+        else:
+            failed = job.state.failed_models
+            if not failed:
+                job.status = "completed"
+            elif len(failed) < len(job.state.models):
+                job.status = "partial"
+            else:
+                job.status = "failed"
+                job.error = "every model failed"
+        finally:
+            if not job.finished:  # consumer went away mid-analysis
+                job.status = "failed"
+                job.error = "cancelled"
+            job.finished_at = time.time()
+            self._finished[job.id] = job.finished_at
+            self._expire()
+            # queued for the batched writer; reopening it later is an indexed read
+            analysis_store.save(job.id, job.state, job.status, job.error, job.created_at, job.finished_at)
+            job.done.set()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await asyncio.create_task(self.run(job), context=job.context)
+            finally:
+                self._queue.task_done()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        while self._finished:
+            jid, finished_at = next(iter(self._finished.items()))
+            if finished_at >= cutoff and len(self._finished) <= self.max_finished:
+                break
+            del self._finished[jid]
+            self._jobs.pop(jid, None)
+
+    def stats(self) -> Dict:
+        counts = {state: 0 for state in JOB_STATES}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "jobs": counts,
+        }
+
+
+jobs = JobManager()
@@ -1,15 +1,191 @@
 # services/parser_service.py
+import os
 import re
 from collections import Counter
 from typing import Dict, Tuple, List
 
 from app.core.utils import normalize_domain, counter_to_dict
+from app.core.telemetry import timed_stage
 
 
 # reuse same regex (kept intentionally simple)
 DOMAIN_PATTERN = r'\b(?:https?://)?(?:www\.)?([a-zA-Z0-9-]+\.[a-zA-Z]{2,6})\b'
+TOPIC_PATTERN = r'\b\w{4,}\b'
 
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'this', 'that', 'these', 'those', 'is',
+    'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might',
+    'can', 'your', 'you', 'it', 'its', 'their', 'them', 'they', 'also',
+    'more', 'most', 'some', 'such', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'between', 'under', 'again', 'further',
+    'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all',
+    'both', 'each', 'few', 'other', 'than', 'too', 'very', 'just', 'about',
+    'only', 'which', 'what', 'who', 'whom', 'whose', 'while', 'because',
+    'if', 'so', 'as', 'until', 'since', 'like', 'make', 'made', 'many',
+    'much', 'well', 'back', 'even', 'still', 'way', 'take'
+})
 
+CITATION_PATTERNS = [
+    r'\[\d+\]',      # [1], [2]
+    r'\(\d{4}\)',    # (2024)
+    r'according to',
+    r'source:',
+    r'reference:',
+    r'cited in',
+    r'study by',
+    r'research shows',
+    r'report by',
+    r'published in'
+]
+
+_DOMAIN_RE = re.compile(DOMAIN_PATTERN)
+_TOPIC_RE = re.compile(TOPIC_PATTERN)
+_CITATION_RES = [re.compile(p, re.IGNORECASE) for p in CITATION_PATTERNS]
+
+# On lowercased ASCII text the plain-phrase citation patterns are substring
+# counts, which skip the regex engine entirely. Only [n] and (yyyy) need re.
+_CITATION_PHRASES = [p for p in CITATION_PATTERNS if not any(c in p for c in '\\[]()')]
+_CITATION_REGEXES = [re.compile(p) for p in CITATION_PATTERNS if p not in _CITATION_PHRASES]
+
+# Streams: phrases are the only patterns that can contain whitespace, so a stream
+# carries the last (longest phrase - 1) characters to catch one split across a cut
+_PHRASE_RES = [(re.compile(re.escape(p), re.IGNORECASE), len(p)) for p in _CITATION_PHRASES]
+_PHRASE_TAIL = max(len(p) for p in _CITATION_PHRASES) - 1
+# Streamed text is scanned in batches of at least this many characters (token-sized
+# scans would cost far more than one pass over the full text)
+STREAM_SCAN_CHARS = int(os.getenv("STREAM_SCAN_CHARS", "256"))
+# Characters a stream buffers while waiting for whitespace to cut at; a longer
+# unbroken run is scanned as is (a match spanning that cut may be missed)
+STREAM_MAX_PENDING = int(os.getenv("STREAM_MAX_PENDING", "4096"))
+
+
+def _count_citations(text: str) -> int:
+    return sum(len(r.findall(text)) for r in _CITATION_RES)
+
+
+@timed_stage("scan_response")
+def scan_response(text: str) -> Tuple[List[str], List[str], int]:
+    """
+    Extract everything the analysis needs from one response in a single call:
+      - normalized domains, in order of appearance
+      - topic tokens (lowercased, stop words removed), in order of appearance
+      - number of citation-like hits
+    ASCII text (the common case) is lowercased once for the topic and citation
+    passes. Domains are matched on the original text: DOMAIN_PATTERN's optional
+    "www." and "http(s)://" prefixes are case-sensitive, so "WWW.abc.io" must
+    still yield "www.abc" as parse_domains does.
+    """
+    text = text or ""
+    if not text.isascii():
+        # lowercasing/IGNORECASE can change matches outside ASCII, keep the original passes
+        domains = [normalize_domain(d) for d in _DOMAIN_RE.findall(text) if d]
+        tokens = [t for t in _TOPIC_RE.findall(text.lower()) if t not in STOP_WORDS]
+        return domains, tokens, _count_citations(text)
+
+    domains = [normalize_domain(d) for d in _DOMAIN_RE.findall(text)]
+    text = text.lower()
+    tokens = [t for t in _TOPIC_RE.findall(text) if t not in STOP_WORDS]
+    citations = sum(text.count(p) for p in _CITATION_PHRASES)
+    citations += sum(len(r.findall(text)) for r in _CITATION_REGEXES)
+    return domains, tokens, citations
+
+
+class StreamScanner:
+    """
+    Incremental scan_response for a response that arrives in chunks. Once
+    STREAM_SCAN_CHARS have arrived, text is scanned up to the last whitespace,
+    which no domain, topic, [n] or (yyyy) match can contain, so the counts
+    equal scan_response on the full text; citation phrases split across a cut
+    are found through a short carried tail. Memory is the counters plus the
+    unscanned remainder, so finish() has almost nothing left to do.
+    """
+
+    def __init__(self):
+        self.domains = Counter()
+        self.topics = Counter()
+        self.citations = 0
+        self.chars = 0
+        self._pending = ""
+        self._tail = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk; returns the normalized domains it completed, in order."""
+        if not chunk:
+            return []
+        self.chars += len(chunk)
+        pending = self._pending + chunk
+        if len(pending) < STREAM_SCAN_CHARS:
+            self._pending = pending
+            return []
+        cut = max(pending.rfind(" "), pending.rfind("\n"), pending.rfind("\t"), pending.rfind("\r")) + 1
+        if cut == 0:
+            if len(pending) <= STREAM_MAX_PENDING:
+                self._pending = pending
+                return []
+            cut = len(pending)
+        self._pending = pending[cut:]
+        return self._scan(pending[:cut])
+
+    @timed_stage("stream_finish")
+    def finish(self) -> Tuple[Counter, Counter, int]:
+        """Scan whatever is left; returns (domain counts, topic counts, citation hits)."""
+        if self._pending:
+            self._scan(self._pending)
+            self._pending = ""
+        return self.domains, self.topics, self.citations
+
+    def _scan(self, segment: str) -> List[str]:
+        if segment.isascii():
+            lowered = segment.lower()
+            domains = [normalize_domain(d) for d in _DOMAIN_RE.findall(segment)]
+            tokens = [t for t in _TOPIC_RE.findall(lowered) if t not in STOP_WORDS]
+            hits = sum(len(r.findall(lowered)) for r in _CITATION_REGEXES)
+        else:
+            domains = [normalize_domain(d) for d in _DOMAIN_RE.findall(segment) if d]
+            tokens = [t for t in _TOPIC_RE.findall(segment.lower()) if t not in STOP_WORDS]
+            hits = sum(len(r.findall(segment)) for r in _CITATION_REGEXES)
+
+        # phrases have no self-overlap, so counting only those ending past the
+        # tail never counts one twice
+        window = self._tail + segment
+        start = len(self._tail)
+        if window.isascii():
+            lowered = window.lower()
+            hits += sum(lowered.count(p, max(0, start - len(p) + 1)) for p in _CITATION_PHRASES)
+        else:
+            hits += sum(len(r.findall(window, max(0, start - length + 1))) for r, length in _PHRASE_RES)
+        self._tail = window[-_PHRASE_TAIL:]
+
+        self.domains.update(domains)
+        self.topics.update(tokens)
+        self.citations += hits
+        return domains
+
+
+def parse_responses(responses: Dict[str, str], top_n: int = 20) -> Tuple[Counter, Dict[str, Counter], List[tuple], Dict[str, int]]:
+    """
+    Single-pass equivalent of parse_domains + parse_topics + extract_citations:
+    returns (global domains, per-model domains, top topics, per-model citation counts).
+    """
+    global_domains = Counter()
+    per_model_domains = {}
+    topics = Counter()
+    citations = {}
+
+    for model_label, text in responses.items():
+        domains, tokens, hits = scan_response(text)
+        counter = Counter(domains)
+        per_model_domains[model_label] = counter
+        global_domains.update(counter)
+        topics.update(tokens)
+        citations[model_label] = int(hits)
+
+    return global_domains, per_model_domains, topics.most_common(top_n), citations
+
+
+@timed_stage("parse_domains")
 def parse_domains(responses: Dict[str, str]) -> Tuple[Counter, Dict[str, Counter]]:
     """
     Extract domains from each model response and return:
@@ -21,7 +197,7 @@ def parse_domains(responses: Dict[str, str]) -> Tuple[Counter, Dict[str, Counter
 
     for model_label, text in responses.items():
         text = text or ""
-        found = re.findall(DOMAIN_PATTERN, text)
+        found = _DOMAIN_RE.findall(text)
         # normalize
         cleaned = [normalize_domain(d) for d in found if d]
         per_model_domains[model_label] = Counter(cleaned)
@@ -30,58 +206,30 @@ def parse_domains(responses: Dict[str, str]) -> Tuple[Counter, Dict[str, Counter
     return Counter(global_domains), per_model_domains
 
 
+@timed_stage("parse_topics")
 def parse_topics(responses: Dict[str, str], top_n: int = 20) -> List[tuple]:
     """
     Extract simple keyword frequency (words >=4 chars, filtered by stop words)
     Returns list of (word, count)
     """
     words = []
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-        'of', 'with', 'by', 'from', 'this', 'that', 'these', 'those', 'is',
-        'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-        'do', 'does', 'did', 'will', 'would', 'should', 'could', 'may', 'might',
-        'can', 'your', 'you', 'it', 'its', 'their', 'them', 'they', 'also',
-        'more', 'most', 'some', 'such', 'into', 'through', 'during', 'before',
-        'after', 'above', 'below', 'between', 'under', 'again', 'further',
-        'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all',
-        'both', 'each', 'few', 'other', 'than', 'too', 'very', 'just', 'about',
-        'only', 'which', 'what', 'who', 'whom', 'whose', 'while', 'because',
-        'if', 'so', 'as', 'until', 'since', 'like', 'make', 'made', 'many',
-        'much', 'well', 'back', 'even', 'still', 'way', 'take'
-    }
-
     for text in responses.values():
         text = text or ""
-        tokens = re.findall(r'\b\w{4,}\b', text.lower())
-        filtered = [t for t in tokens if t not in stop_words]
+        tokens = _TOPIC_RE.findall(text.lower())
+        filtered = [t for t in tokens if t not in STOP_WORDS]
         words.extend(filtered)
 
     c = Counter(words)
     return c.most_common(top_n)
 
 
+@timed_stage("extract_citations")
 def extract_citations(responses: Dict[str, str]) -> Dict[str, int]:
     """
     Count citation-like patterns per model
     """
-    citation_patterns = [
-        r'\[\d+\]',      # [1], [2]
-        r'\(\d{4}\)',    # (2024)
-        r'according to',
-        r'source:',
-        r'reference:',
-        r'cited in',
-        r'study by',
-        r'research shows',
-        r'report by',
-        r'published in'
-    ]
     counts = {}
     for model, text in responses.items():
         text = text or ""
-        total = 0
-        for p in citation_patterns:
-            total += len(re.findall(p, text, flags=re.IGNORECASE))
-        counts[model] = int(total)
+        counts[model] = _count_citations(text)
     return counts
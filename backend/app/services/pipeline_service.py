@@ -0,0 +1,154 @@
+# services/pipeline_service.py
+import os
+import time
+from collections import Counter
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.utils import counter_to_dict
+from app.services.aggregate_service import domain_aggregate
+from app.services.ai_client import fan_out_iter
+from app.services.analyzer_service import (
+    PresenceIndex, calculate_visibility_metrics, compute_geo_score, model_comparison, rank_models
+)
+from app.services.parser_service import StreamScanner, scan_response
+from app.services.summarizer_service import synthesize_summary
+
+# Stream provider answers and parse them while they arrive (0 = parse each finished answer)
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "1") not in ("0", "false", "no")
+
+
+class AnalysisState:
+    """
+    Running state of one multi-LLM analysis. Streamed responses are parsed
+    chunk by chunk while they arrive (live per-model counts in `streams`);
+    each finished response is merged into the global counters, so partial
+    results are always available and nothing is rescanned at the end.
+    """
+
+    def __init__(self, prompt: str, models: List[str], target_domain: Optional[str] = None):
+        self.prompt = prompt
+        self.models = list(dict.fromkeys(models))
+        self.target_domain = target_domain
+        self.started = time.perf_counter()
+        self.model_results: Dict[str, Dict] = {}
+        self.responses: Dict[str, str] = {}
+        self.per_model_domains: Dict[str, Counter] = {}
+        self.global_domains = Counter()
+        self.topics = Counter()
+        self.citations: Dict[str, int] = {}
+        self.metrics: Dict[str, Dict] = {}
+        self.summary: Optional[str] = None
+        self.streams: Dict[str, StreamScanner] = {}
+
+    @property
+    def failed_models(self) -> List[str]:
+        return [m for m, r in self.model_results.items() if r["status"] != "ok"]
+
+    def add_chunk(self, model: str, chunk: str):
+        """Parse one streamed chunk of a model's response as it arrives."""
+        scanner = self.streams.get(model)
+        if scanner is None:
+            scanner = self.streams[model] = StreamScanner()
+        scanner.feed(chunk)
+
+    def add_provider_result(self, result: Dict) -> Optional[Dict]:
+        """Record one fan-out result; returns the incremental domain/citation update for ok results."""
+        model = result["provider"]
+        scanner = self.streams.pop(model, None)
+        self.model_results[model] = {
+            "response": result["response"] if result["status"] == "ok" else f"⚠️ {result['error']}",
+            "response_time": result["response_time"],
+            "status": result["status"],
+            "accuracy": 0.85,
+            "confidence": 0.78
+        }
+        if result["status"] != "ok":
+            return None
+
+        text = result["response"] or ""
+        if scanner is not None:
+            # streamed: only the last partial word is left to scan
+            counter, tokens, citations = scanner.finish()
+        else:
+            domains, tokens, citations = scan_response(text)
+            counter = Counter(domains)
+        self.responses[model] = text
+        self.per_model_domains[model] = counter
+        self.global_domains.update(counter)
+        self.topics.update(tokens)
+        self.citations[model] = citations
+        self.metrics.update(calculate_visibility_metrics({model: text}, {model: counter}))
+        return {
+            "model": model,
+            "domains": counter_to_dict(counter),
+            "citations": citations,
+            "metrics": self.metrics[model],
+            "global_domains": counter_to_dict(self.global_domains),
+            "total_citations": sum(self.citations.values()),
+        }
+
+    def results(self) -> Dict:
+        """The /api/multi-llm-analysis "results" payload for everything received so far."""
+        rankings = rank_models(self.metrics)
+        times = [r["response_time"] for r in self.model_results.values()]
+        results = {
+            "modelResults": self.model_results,
+            "summary": self.summary,
+            "topPerformer": rankings[0][0] if rankings else "N/A",
+            "rankings": rankings,
+            "uniqueDomains": len(self.global_domains),
+            "totalCitations": sum(self.citations.values()),
+            "avgResponse": int(sum(times) / len(times)) if times else 0,
+            "domains": counter_to_dict(self.global_domains),
+            "citations": self.citations,
+            "topics": self.topics.most_common(20),
+            "modelMetrics": self.metrics,
+            "metrics": {
+                "total_responses": len(self.responses),
+                "avg_confidence": 0.78,
+                "processing_time": int((time.perf_counter() - self.started) * 1000),
+            }
+        }
+        if self.target_domain:
+            presence = PresenceIndex(self.per_model_domains)
+            results["geo_score"] = compute_geo_score(self.global_domains, self.target_domain, len(self.models), presence)
+            results["per_model_mentions"] = model_comparison(self.per_model_domains, self.target_domain, presence)
+        return results
+
+
+async def iter_analysis(
+    prompt: str,
+    models: List[str],
+    target_domain: Optional[str] = None,
+    use_cache: bool = True,
+    state: Optional[AnalysisState] = None,
+) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Run a multi-LLM analysis and yield (event, payload) pairs as work completes:
+      "model"   - one model's response (or failure), in arrival order
+      "domains" - incremental domain/citation/metric update after that response
+      "summary" - the synthesized summary, once every model is in
+      "done"    - the full results payload
+    """
+    state = state or AnalysisState(prompt, models, target_domain)
+    on_chunk = state.add_chunk if STREAM_RESPONSES else None
+    async for result in fan_out_iter(prompt, state.models, use_cache=use_cache, on_chunk=on_chunk):
+        update = state.add_provider_result(result)
+        yield "model", {"model": result["provider"], **state.model_results[result["provider"]], "error": result["error"]}
+        if update is not None:
+            yield "domains", update
+
+    # merge into the rolling per-domain/model/time aggregate behind the trend endpoints
+    domain_aggregate.ingest(state.per_model_domains)
+
+    state.summary = await synthesize_summary(state.responses)
+    yield "summary", {"summary": state.summary}
+    yield "done", state.results()
+
+
+async def run_analysis(prompt: str, models: List[str], target_domain: Optional[str] = None, use_cache: bool = True) -> AnalysisState:
+    """Run iter_analysis to completion and return the final state."""
+    state = AnalysisState(prompt, models, target_domain)
+    async for _ in iter_analysis(prompt, models, target_domain, use_cache, state):
+        pass
+    return state
@@ -0,0 +1,214 @@
+# services/prompt_service.py
+import math
+import os
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Tokens of model output allowed into one synthesis prompt, shared by all models
+SUMMARY_CONTEXT_TOKENS = int(os.getenv("SUMMARY_CONTEXT_TOKENS", "1000"))
+# Passages at least this similar (word-shingle Jaccard) to one already kept are dropped
+DEDUPE_THRESHOLD = float(os.getenv("SUMMARY_DEDUPE_THRESHOLD", "0.5"))
+# Each response is read for at most this many budgets' worth of tokens
+SCAN_FACTOR = int(os.getenv("SUMMARY_SCAN_FACTOR", "4"))
+SHINGLE_SIZE = 3
+# Kept sentences indexed per shingle; a shingle repeated more often than this is boilerplate
+_MAX_POSTINGS = 32
+_CHARS_PER_TOKEN = 4
+
+# tiktoken is loaded on first use: get_encoding reads (or downloads) the BPE
+# ranks, which would otherwise be paid by every worker at import time. The app
+# loads it in a background thread at startup (load_tokenizer_in_background);
+# until that finishes, token counts use the regex estimate below.
+_encoding = None
+TOKENIZER = None
+_loader: Optional[threading.Thread] = None
+
+
+def _load_tokenizer():
+    global _encoding, TOKENIZER
+    try:
+        import tiktoken
+
+        encoding, name = tiktoken.get_encoding("cl100k_base"), "tiktoken/cl100k_base"
+    except Exception:  # not installed, or the encoding file can't be fetched offline
+        encoding, name = None, "regex"
+    _encoding = encoding
+    TOKENIZER = name
+
+
+def load_tokenizer_in_background():
+    """Start loading the tokenizer in a thread, so no request waits for it."""
+    global _loader
+    if TOKENIZER is None and _loader is None:
+        _loader = threading.Thread(target=_load_tokenizer, name="tokenizer-load", daemon=True)
+        _loader.start()
+
+
+def _tokenizer():
+    """tiktoken's encoding, or None for the regex fallback (also while the background load runs)."""
+    if TOKENIZER is None and _loader is None:
+        _load_tokenizer()  # scripts and tests: no app startup, load it in place
+    return _encoding
+
+
+def tokenizer_name() -> str:
+    _tokenizer()
+    return TOKENIZER or "regex"
+
+
+# Fallback: words in chunks of up to 4 characters plus punctuation, which tracks
+# BPE token counts for English prose closely enough for budgeting
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+[\"')\]]*|\n|$)")
+_WORD_RE = re.compile(r"\w+")
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _tokenizer()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(_TOKEN_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, limit: int) -> str:
+    """Longest word-boundary prefix of text within `limit` tokens."""
+    if count_tokens(text) <= limit:
+        return text
+    words = text.split()
+    lo, hi = 0, len(words)
+    while lo < hi:  # binary search on the number of words kept
+        mid = (lo + hi + 1) // 2
+        if count_tokens(" ".join(words[:mid]) + "…") <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+    return " ".join(words[:lo]) + "…" if lo else ""
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.findall(text) if s.strip()]
+
+
+def _shingles(sentence: str) -> frozenset:
+    words = _WORD_RE.findall(sentence.lower())
+    if len(words) < SHINGLE_SIZE:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+
+
+def fair_shares(demands: Dict[str, int], budget: int) -> Dict[str, int]:
+    """
+    Max-min fair split of `budget` tokens: every model gets an equal share,
+    and whatever a short response doesn't need is redistributed to the others.
+    """
+    shares = {model: 0 for model in demands}
+    pending = {model: need for model, need in demands.items() if need > 0}
+    remaining = budget
+    while pending and remaining > 0:
+        share = remaining // len(pending)
+        if share == 0:
+            break
+        satisfied = {m: need for m, need in pending.items() if need <= share}
+        if not satisfied:
+            for m in pending:
+                shares[m] = share
+            break
+        for m, need in satisfied.items():
+            shares[m] = need
+            remaining -= need
+            del pending[m]
+    return shares
+
+
+def _sentences(text: str, max_chars: int) -> Iterator[str]:
+    """split_sentences, lazily; a sentence longer than max_chars is cut (it could never fit whole)."""
+    for match in _SENTENCE_RE.finditer(text):
+        sentence = match.group().strip()
+        if sentence:
+            yield sentence[:max_chars]
+
+
+def assemble_responses(responses: Dict[str, str], budget: int = SUMMARY_CONTEXT_TOKENS,
+                       threshold: float = DEDUPE_THRESHOLD) -> Tuple[str, Dict]:
+    """
+    Build the "**model:** text" block of a synthesis prompt within a token budget:
+      1. walk every response sentence by sentence, round-robin across models,
+      2. drop sentences that near-duplicate one already kept (so each model's
+         leading sentences win ties over later ones),
+      3. split the budget fairly across models by what was kept,
+      4. keep each model's sentences in order up to its share, cutting at a
+         sentence boundary (a single oversized sentence is cut at a word).
+    Only the start of each response is read: a model stops once its kept
+    sentences cover the whole budget (no share can be larger) or after
+    SUMMARY_SCAN_FACTOR budgets of text, so the cost doesn't grow with the
+    response length. Returns the block and stats (tokens before/after,
+    duplicates dropped); text left unread is estimated at 4 characters a token.
+    """
+    texts = {m: t.strip() for m, t in responses.items() if t and not t.startswith("⚠️")}
+    max_chars = budget * _CHARS_PER_TOKEN * 2
+    readers = {m: _sentences(t, max_chars) for m, t in texts.items()}
+    read_chars = dict.fromkeys(texts, 0)
+    kept: Dict[str, List[Tuple[str, int]]] = {m: [] for m in texts}
+    kept_tokens = dict.fromkeys(texts, 0)
+    read_tokens = dict.fromkeys(texts, 0)
+    seen: List[frozenset] = []
+    by_shingle: Dict[str, List[int]] = {}
+    duplicates = 0
+    while readers:
+        for model, reader in list(readers.items()):
+            sentence = next(reader, None)
+            if sentence is None:
+                del readers[model]
+                continue
+            cost = count_tokens(sentence)
+            read_tokens[model] += cost
+            read_chars[model] += len(sentence)
+            shingles = _shingles(sentence)
+            candidates = {i for sh in shingles for i in by_shingle.get(sh, ())}
+            if any(len(shingles & seen[i]) / len(shingles | seen[i]) >= threshold for i in candidates):
+                duplicates += 1
+            else:
+                for sh in shingles:
+                    postings = by_shingle.setdefault(sh, [])
+                    if len(postings) < _MAX_POSTINGS:  # boilerplate shingles would match everything
+                        postings.append(len(seen))
+                seen.append(shingles)
+                kept[model].append((sentence, cost))
+                kept_tokens[model] += cost + (1 if len(kept[model]) > 1 else 0)
+            if kept_tokens[model] >= budget or read_tokens[model] >= budget * SCAN_FACTOR:
+                del readers[model]
+
+    # demand includes the spaces that join a model's sentences
+    shares = fair_shares(kept_tokens, budget)
+
+    blocks, used = [], {}
+    for model, items in kept.items():
+        share, parts, spent = shares.get(model, 0), [], 0
+        for sentence, cost in items:
+            cost += 1 if parts else 0  # joining space
+            if spent + cost > share:
+                if not parts:  # nothing fits whole: keep what we can of the first sentence
+                    cut = truncate_to_tokens(sentence, share)
+                    if cut:
+                        parts.append(cut)
+                        spent += count_tokens(cut)
+                break
+            parts.append(sentence)
+            spent += cost
+        if parts:
+            blocks.append(f"**{model}:** {' '.join(parts)}")
+            used[model] = spent
+
+    unread = sum(max(0, len(t) - read_chars[m]) for m, t in texts.items())
+    stats = {
+        "tokenizer": tokenizer_name(),
+        "budget": budget,
+        "tokens_in": sum(read_tokens.values()) + math.ceil(unread / _CHARS_PER_TOKEN),
+        "tokens_out": sum(used.values()),
+        "duplicates_dropped": duplicates,
+        "per_model": used,
+    }
+    return "\n\n".join(blocks), stats
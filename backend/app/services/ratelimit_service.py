@@ -0,0 +1,303 @@
+# services/ratelimit_service.py
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+# Lower runs first: interactive requests overtake queued background analyses
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+# Calls allowed to wait on one provider's limiter; beyond that they are rejected
+RATE_LIMIT_MAX_QUEUE = int(os.getenv("RATE_LIMIT_MAX_QUEUE", "1000"))
+# Halve the concurrency limit when recent latency exceeds its long-run average by this factor
+LATENCY_TOLERANCE = float(os.getenv("RATE_LIMIT_LATENCY_TOLERANCE", "2.0"))
+# Pause after a 429 that carries no usable Retry-After, and the longest pause honoured
+DEFAULT_RETRY_AFTER = float(os.getenv("RATE_LIMIT_DEFAULT_RETRY_AFTER", "5"))
+MAX_RETRY_AFTER = float(os.getenv("RATE_LIMIT_MAX_RETRY_AFTER", "60"))
+
+
+class RateLimitQueueFull(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Continuously refilled budget of `per_minute` units, holding at most `capacity`
+    (default: one minute's worth). The level may go negative when a call turns
+    out to cost more than was reserved; the debt delays later calls.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` (capped at capacity) can be taken; 0 if it can be now."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def available(self) -> float:
+        self._refill()
+        return self.level
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Give back (positive) or charge (negative) the difference to the reservation."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit. Every success
+    adds about one slot per window of `limit` calls; overload (429/503/529) or
+    latency well above its long-run average halves it, at most once per cooldown
+    so one burst of failures counts as one signal.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, backoff: float = 0.5,
+                 tolerance: float = LATENCY_TOLERANCE, clock: Callable[[], float] = time.monotonic):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.clock = clock
+        self.limit = float(maximum)
+        self.fast_latency: Optional[float] = None  # EWMA, alpha 0.3
+        self.slow_latency: Optional[float] = None  # EWMA, alpha 0.02
+        self.samples = 0
+        self.decreases = 0
+        self._last_decrease = -math.inf
+
+    @property
+    def allowed(self) -> int:
+        return max(self.minimum, int(self.limit))
+
+    def on_success(self, latency: float):
+        self.samples += 1
+        if self.fast_latency is None:
+            self.fast_latency = self.slow_latency = latency
+        else:
+            self.fast_latency += 0.3 * (latency - self.fast_latency)
+            self.slow_latency += 0.02 * (latency - self.slow_latency)
+        if self.samples >= 10 and self.fast_latency > self.slow_latency * self.tolerance:
+            self._decrease()
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_overload(self):
+        self._decrease()
+
+    def _decrease(self):
+        now = self.clock()
+        if now - self._last_decrease < max(1.0, self.slow_latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.backoff)
+        self.decreases += 1
+
+
+class Permit:
+    """One admitted call; report its outcome so the limiter can adapt."""
+
+    __slots__ = ("limiter", "reserved_tokens", "admitted_at")
+
+    def __init__(self, limiter: "ProviderLimiter", reserved_tokens: int):
+        self.limiter = limiter
+        self.reserved_tokens = reserved_tokens
+        self.admitted_at = limiter.clock()
+
+    def succeeded(self, used_tokens: Optional[int] = None):
+        limiter = self.limiter
+        limiter.concurrency.on_success(limiter.clock() - self.admitted_at)
+        if used_tokens is not None and limiter.tokens is not None:
+            limiter.tokens.adjust(self.reserved_tokens - used_tokens)
+
+    def throttled(self, retry_after: Optional[float] = None):
+        """The provider answered 429: back off and hold the queue for Retry-After."""
+        limiter = self.limiter
+        limiter.counters["throttled"] += 1
+        limiter.concurrency.on_overload()
+        pause = DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+        limiter.paused_until = max(limiter.paused_until, limiter.clock() + min(max(pause, 0.0), MAX_RETRY_AFTER))
+
+    def overloaded(self):
+        """The provider answered 503/529: back off without pausing."""
+        self.limiter.counters["overloaded"] += 1
+        self.limiter.concurrency.on_overload()
+
+
+class ProviderLimiter:
+    """
+    Traffic shaping for one provider: request and token buckets for its RPM/TPM
+    limits, an AIMD concurrency limit, and a priority queue. Calls that cannot
+    start yet wait in the queue (lower priority value first, FIFO within a
+    priority) instead of failing; the caller's own timeout bounds the wait.
+    """
+
+    def __init__(self, name: str, rpm: Optional[float] = None, tpm: Optional[float] = None, max_concurrency: int = 10,
+                 max_queue: int = RATE_LIMIT_MAX_QUEUE, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock=clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock=clock) if tpm else None
+        self.concurrency = AIMDController(max_concurrency, clock=clock)
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.counters = {"admitted": 0, "queued": 0, "rejected": 0, "throttled": 0, "overloaded": 0}
+        self._waiters: List[list] = []  # heap of [priority, seq, future, tokens]
+        self._waiting = 0
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = math.inf
+        self._timer_loop = None
+
+    def _delay(self, tokens: int) -> float:
+        """0 if a call reserving `tokens` may start now, else seconds to wait (inf: until a slot frees)."""
+        now = self.clock()
+        if self.paused_until > now:
+            return self.paused_until - now
+        if self.in_flight >= self.concurrency.allowed:
+            return math.inf
+        return max(
+            self.requests.wait_time(1) if self.requests else 0.0,
+            self.tokens.wait_time(tokens) if self.tokens else 0.0,
+        )
+
+    def _admit(self, tokens: int):
+        self.in_flight += 1
+        self.counters["admitted"] += 1
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens:
+            self.tokens.take(tokens)
+
+    def _pump(self):
+        """Admit queued calls in priority order while budgets allow; otherwise wake up when they will."""
+        while self._waiters:
+            _, _, future, tokens = self._waiters[0]
+            if future.done():  # caller gave up; already uncounted
+                heapq.heappop(self._waiters)
+                continue
+            if future.get_loop().is_closed():  # left behind by a finished event loop
+                heapq.heappop(self._waiters)
+                self._waiting -= 1
+                continue
+            delay = self._delay(tokens)
+            if delay > 0:
+                if delay != math.inf:
+                    self._wake_in(delay)
+                return
+            heapq.heappop(self._waiters)
+            self._waiting -= 1
+            self._admit(tokens)
+            future.set_result(None)
+
+    def _wake_in(self, delay: float):
+        loop = asyncio.get_running_loop()
+        at = self.clock() + delay
+        if self._timer is not None and self._timer_loop is loop and self._timer_at <= at:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_at, self._timer_loop = at, loop
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer, self._timer_at = None, math.inf
+        self._pump()
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0, priority: Optional[int] = None):
+        """Wait for a slot and budget, then yield a Permit; the slot is freed on exit."""
+        priority = request_priority.get() if priority is None else priority
+        if not self._waiting and self._delay(tokens) == 0:
+            self._admit(tokens)
+        else:
+            if self._waiting >= self.max_queue:
+                self.counters["rejected"] += 1
+                raise RateLimitQueueFull(f"{self._waiting} calls already waiting for the {self.name} rate limiter")
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, [priority, next(self._seq), future, tokens])
+            self._waiting += 1
+            self.counters["queued"] += 1
+            self._pump()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()  # admitted just as the caller gave up
+                else:
+                    self._waiting -= 1
+                    future.cancel()
+                    self._pump()  # it may have been holding up the head of the queue
+                raise
+
+        try:
+            yield Permit(self, tokens)
+        finally:
+            self._release()
+
+    def _release(self):
+        self.in_flight -= 1
+        self._pump()
+
+    def stats(self) -> Dict:
+        now = self.clock()
+        bucket = lambda b: None if b is None else {"per_minute": round(b.rate * 60, 1), "available": round(b.available(), 1)}
+        return {
+            **self.counters,
+            "in_flight": self.in_flight,
+            "waiting": self._waiting,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "max_concurrency": self.concurrency.maximum,
+            "limit_decreases": self.concurrency.decreases,
+            "latency_ewma_s": None if self.concurrency.fast_latency is None else round(self.concurrency.fast_latency, 3),
+            "paused_for_s": round(max(0.0, self.paused_until - now), 2),
+            "requests": bucket(self.requests),
+            "tokens": bucket(self.tokens),
+        }
+
+
+class ProviderLimits:
+    """One ProviderLimiter per provider, built from rpm/tpm/max_connections settings."""
+
+    def __init__(self, providers: Dict[str, Dict]):
+        self.limiters = {
+            name: ProviderLimiter(name, cfg.get("rpm"), cfg.get("tpm"), cfg.get("max_connections", 10))
+            for name, cfg in providers.items()
+        }
+
+    def get(self, name: str) -> ProviderLimiter:
+        return self.limiters[name]
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds form only)."""
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
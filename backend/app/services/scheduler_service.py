@@ -0,0 +1,392 @@
+# services/scheduler_service.py
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set
+
+from app.core.utils import normalize_domain
+from app.services.analyzer_service import PresenceIndex
+from app.services.job_service import jobs
+from app.services.ratelimit_service import PRIORITY_BACKGROUND, request_priority
+from app.services.store_service import analysis_store
+
+logger = logging.getLogger(__name__)
+
+# Concurrent sweep analyses (one prompt x every model of the sweep each)
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "2"))
+# Sweeps on the same schedule start up to this fraction of their period apart (capped at MAX_SPREAD seconds)
+SCHEDULER_SPREAD = float(os.getenv("SCHEDULER_SPREAD", "0.1"))
+SCHEDULER_MAX_SPREAD = float(os.getenv("SCHEDULER_MAX_SPREAD", "300"))
+# Shortest allowed interval between two runs of one sweep
+SCHEDULER_MIN_INTERVAL = float(os.getenv("SCHEDULER_MIN_INTERVAL", "60"))
+
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+_EVERY_RE = re.compile(r"^@every\s+((?:\d+[smhd])+)$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+# minute, hour, day of month, month, day of week (0 or 7 = Sunday)
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class ScheduleError(ValueError):
+    pass
+
+
+def _parse_field(text: str, lo: int, hi: int) -> Set[int]:
+    values = set()
+    for part in text.split(","):
+        span, _, step = part.partition("/")
+        try:
+            step = int(step) if step else 1
+            if span == "*":
+                start, end = lo, hi
+            elif "-" in span:
+                start, end = (int(v) for v in span.split("-", 1))
+            else:
+                start = int(span)
+                end = hi if "/" in part else start
+        except ValueError:
+            raise ScheduleError(f"bad cron field: {text!r}")
+        if step < 1 or not lo <= start <= end <= hi:
+            raise ScheduleError(f"cron field out of range {lo}-{hi}: {text!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Schedule:
+    """
+    When a sweep runs, in UTC: "@every 6h" (also s/m/d and combinations such as
+    "1h30m", aligned to the epoch), "@hourly"/"@daily"/"@weekly"/"@monthly", or
+    a five-field cron expression ("0 */6 * * *", "30 9 * * 1-5"). As in cron,
+    when both day fields are restricted a day matching either one fires.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        expression = _ALIASES.get(self.expression, self.expression)
+        self.every: Optional[float] = None
+        every = _EVERY_RE.match(expression)
+        if every:
+            self.every = float(sum(int(n) * _UNITS[u] for n, u in re.findall(r"(\d+)([smhd])", every.group(1))))
+            if self.every <= 0:
+                raise ScheduleError("@every needs a positive interval")
+        else:
+            fields = expression.split()
+            if len(fields) != 5:
+                raise ScheduleError(f"expected '@every <interval>', an @alias or 5 cron fields: {self.expression!r}")
+            minutes, hours, days, months, weekdays = (
+                _parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, _CRON_FIELDS)
+            )
+            self.minutes, self.hours, self.days, self.months = minutes, hours, days, months
+            self.weekdays = {d % 7 for d in weekdays}
+            self._any_day, self._any_weekday = fields[2] == "*", fields[4] == "*"
+        self.period = self.every if self.every is not None else self._cron_period()
+        if self.period < SCHEDULER_MIN_INTERVAL:
+            raise ScheduleError(f"runs more often than every {SCHEDULER_MIN_INTERVAL:g}s: {self.expression!r}")
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day, weekday = dt.day in self.days, (dt.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, ts: float) -> float:
+        """First run time strictly after `ts`."""
+        if self.every is not None:
+            return (ts // self.every + 1) * self.every
+        dt = datetime.fromtimestamp(ts, timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt.year + 8  # covers leap days; anything later never fires
+        while dt.year <= limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt.timestamp()
+        raise ScheduleError(f"never runs: {self.expression!r}")
+
+    def _cron_period(self) -> float:
+        """Typical interval between runs: the first gap after a fixed reference time."""
+        first = self.next_after(0.0)
+        return self.next_after(first) - first
+
+
+class Sweep:
+    """A registered monitoring sweep: every prompt x every model, scored for every target domain."""
+
+    def __init__(self, name: str, prompts: List[str], models: List[str], target_domains: List[str],
+                 schedule: str = "@daily", enabled: bool = True, use_cache: bool = False,
+                 id: Optional[str] = None, created_at: Optional[float] = None):
+        self.id = id or f"sweep_{uuid.uuid4().hex[:16]}"
+        self.name = name
+        self.prompts = [p for p in dict.fromkeys(prompts) if p.strip()]
+        self.models = list(dict.fromkeys(models))
+        self.target_domains = [d for d in dict.fromkeys(normalize_domain(t) for t in target_domains) if d]
+        if not self.prompts or not self.models or not self.target_domains:
+            raise ValueError("a sweep needs at least one prompt, model and target domain")
+        self.schedule = Schedule(schedule)
+        self.enabled = enabled
+        self.use_cache = use_cache
+        self.created_at = time.time() if created_at is None else created_at
+        self.next_run: Optional[float] = None
+        self.last_run: Optional[float] = None
+        self.last_status: Optional[str] = None
+        self.runs = 0
+        self.running = False
+
+    @property
+    def offset(self) -> float:
+        """Stable per-sweep phase shift, so sweeps sharing a schedule do not all start at once."""
+        spread = min(self.schedule.period * SCHEDULER_SPREAD, SCHEDULER_MAX_SPREAD)
+        return zlib.crc32(self.id.encode("utf-8")) / 2 ** 32 * spread
+
+    def plan(self, now: float):
+        offset = self.offset
+        self.next_run = self.schedule.next_after(now - offset) + offset if self.enabled else None
+
+    def definition(self) -> Dict:
+        """The persisted part of the sweep."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "prompts": self.prompts,
+            "models": self.models,
+            "target_domains": self.target_domains,
+            "schedule": self.schedule.expression,
+            "enabled": self.enabled,
+            "use_cache": self.use_cache,
+            "created_at": self.created_at,
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.definition(),
+            "next_run": self.next_run,
+            "last_run": self.last_run,
+            "last_status": self.last_status,
+            "runs": self.runs,
+            "running": self.running,
+        }
+
+
+class _SweepRun:
+    """Answers of one sweep run, folded into one time-series point per (target domain, model)."""
+
+    def __init__(self, sweep: Sweep, ts: float):
+        self.sweep = sweep
+        self.ts = ts
+        self.pending = len(sweep.prompts)
+        self.failed = 0
+        # (domain, model) -> [answers, answers mentioning the domain, mentions]; model "" = every model
+        self.points: Dict[tuple, List[int]] = {}
+
+    def add(self, per_model_domains: Dict, failed_models: int):
+        self.failed += failed_models
+        index = PresenceIndex(per_model_domains)
+        for domain in self.sweep.target_domains:
+            mentions = index.mentions(domain)
+            for model in per_model_domains:
+                count = mentions.get(model, 0)
+                for key in ((domain, model), (domain, "")):
+                    point = self.points.setdefault(key, [0, 0, 0])
+                    point[0] += 1
+                    point[1] += count > 0
+                    point[2] += count
+
+    def rows(self) -> List[tuple]:
+        return [(self.sweep.id, domain, model, self.ts, *point) for (domain, model), point in self.points.items()]
+
+    @property
+    def status(self) -> str:
+        total = len(self.sweep.prompts) * len(self.sweep.models)
+        if not self.failed:
+            return "completed"
+        return "partial" if self.failed < total else "failed"
+
+
+class Scheduler:
+    """
+    In-process runner for registered sweeps. One loop task sleeps until the
+    next sweep is due, then queues one analysis per prompt; SCHEDULER_WORKERS
+    workers run them through the job manager at background priority (so
+    interactive requests keep precedence at the provider rate limiters). When
+    a run's last analysis finishes, its per-domain counts are written to the
+    store's sweep_points series. A sweep still running when it is due again
+    skips that run. Sweep definitions are persisted in the analysis store.
+    """
+
+    def __init__(self, workers: int = SCHEDULER_WORKERS, store=analysis_store, clock: Callable[[], float] = time.time):
+        self.workers = workers
+        self.store = store
+        self.clock = clock
+        self._sweeps: Dict[str, Sweep] = {}
+        self._loaded = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._counters = {"runs": 0, "skipped": 0, "analyses": 0, "failed_analyses": 0, "invalid_sweeps": 0}
+
+    async def start(self):
+        if self._tasks:
+            return
+        if not self._loaded:
+            for definition in await asyncio.to_thread(self.store.load_sweeps):
+                if definition.get("id") in self._sweeps:
+                    continue
+                try:
+                    sweep = Sweep(**definition)
+                except (ValueError, TypeError) as e:  # ScheduleError, or a definition from an older version
+                    # one bad sweep must not keep the app from starting: skip it, keep it stored
+                    logger.warning("skipping stored sweep %s: %s", definition.get("id"), e)
+                    self._counters["invalid_sweeps"] += 1
+                    continue
+                self._sweeps[sweep.id] = sweep
+            self._loaded = True
+        now = self.clock()
+        for sweep in self._sweeps.values():
+            sweep.plan(now)
+        self._queue = asyncio.Queue()
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._loop())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        tasks = self._tasks
+        while tasks:
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks, timeout=1.0)
+            tasks = [task for task in tasks if not task.done()]
+        self._tasks = []
+        self._queue = None
+        for sweep in self._sweeps.values():
+            sweep.running = False  # unfinished runs are abandoned
+
+    async def add(self, sweep: Sweep) -> Sweep:
+        # store writes run in a thread: they take the store lock and wait on disk
+        await asyncio.to_thread(self.store.save_sweep, sweep.id, sweep.definition(), sweep.created_at)
+        self._sweeps[sweep.id] = sweep
+        sweep.plan(self.clock())
+        self._notify()
+        return sweep
+
+    async def remove(self, sweep_id: str) -> bool:
+        sweep = self._sweeps.pop(sweep_id, None)
+        if sweep is None:
+            return False
+        await asyncio.to_thread(self.store.delete_sweep, sweep_id)
+        return True
+
+    def get(self, sweep_id: str) -> Optional[Sweep]:
+        return self._sweeps.get(sweep_id)
+
+    def list(self) -> List[Sweep]:
+        return list(self._sweeps.values())
+
+    async def trigger(self, sweep_id: str) -> bool:
+        """Run a sweep now, outside its schedule; False if it is already running."""
+        await self.start()
+        return self._enqueue(self._sweeps[sweep_id])
+
+    def _notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def _enqueue(self, sweep: Sweep) -> bool:
+        if sweep.running:
+            self._counters["skipped"] += 1
+            return False
+        sweep.running = True
+        run = _SweepRun(sweep, self.clock())
+        for prompt in sweep.prompts:
+            self._queue.put_nowait((run, prompt))
+        self._counters["runs"] += 1
+        return True
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = self.clock()
+            for sweep in list(self._sweeps.values()):
+                if sweep.next_run is not None and sweep.next_run <= now:
+                    self._enqueue(sweep)
+                    sweep.plan(now)
+            upcoming = [s.next_run for s in self._sweeps.values() if s.next_run is not None]
+            # re-check at least every minute so wall-clock jumps are noticed
+            delay = min([60.0] + [max(0.0, at - now) for at in upcoming])
+            handle = loop.call_later(delay, self._wake.set)
+            try:
+                await self._wake.wait()
+            finally:
+                handle.cancel()
+            self._wake.clear()
+
+    async def _worker(self):
+        # this worker's own context: its analyses yield provider capacity to interactive requests
+        request_priority.set(PRIORITY_BACKGROUND)
+        while True:
+            run, prompt = await self._queue.get()
+            sweep = run.sweep
+            try:
+                job = jobs.create(prompt, sweep.models, sweep.target_domains[0], sweep.use_cache)
+                await jobs.run(job)
+                run.add(job.state.per_model_domains, len(sweep.models) - len(job.state.per_model_domains))
+                self._counters["analyses"] += 1
+            except Exception:
+                run.failed += len(sweep.models)
+                self._counters["failed_analyses"] += 1
+            finally:
+                run.pending -= 1
+                try:
+                    if run.pending == 0:
+                        await self._finish(run)
+                finally:
+                    self._queue.task_done()
+
+    async def _finish(self, run: _SweepRun):
+        sweep = run.sweep
+        status = run.status
+        try:
+            if run.points and sweep.id in self._sweeps:
+                await asyncio.to_thread(self.store.save_sweep_points, run.rows())
+        except sqlite3.Error:
+            status = "failed"  # the run's points are lost; the sweep keeps its schedule
+        finally:
+            sweep.running = False
+            sweep.last_run = run.ts
+            sweep.last_status = status
+            sweep.runs += 1
+
+    async def wait_idle(self):
+        """Wait until every queued sweep analysis has finished."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stats(self) -> Dict:
+        upcoming = [s.next_run for s in self._sweeps.values() if s.next_run is not None]
+        return {
+            **self._counters,
+            "workers": self.workers,
+            "sweeps": len(self._sweeps),
+            "running": sum(1 for s in self._sweeps.values() if s.running),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "next_run": min(upcoming) if upcoming else None,
+        }
+
+
+scheduler = Scheduler()
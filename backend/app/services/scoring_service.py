@@ -0,0 +1,116 @@
+# services/scoring_service.py
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Same heuristics as analyzer_service.calculate_visibility_metrics:
+# (value at which the component saturates, max points)
+LENGTH_WEIGHT = (1000, 40)
+DOMAIN_WEIGHT = (10, 30)
+DIVERSITY_WEIGHT = (5, 30)
+
+
+class MetricColumns:
+    """
+    Visibility inputs for many (run, model) rows held as NumPy columns.
+    Rows of one run are contiguous; `run` holds each row's run index.
+    """
+
+    def __init__(self, runs: int, models: List[str], run: np.ndarray, response_length: np.ndarray,
+                 domain_count: np.ndarray, unique_domains: np.ndarray):
+        self.runs = runs
+        self.models = models
+        self.run = run
+        self.response_length = response_length
+        self.domain_count = domain_count
+        self.unique_domains = unique_domains
+
+    @classmethod
+    def from_responses(cls, runs: Sequence[Tuple[Dict[str, str], Dict[str, Counter]]]) -> "MetricColumns":
+        """Columns from (responses, per_model_domains) pairs, one pair per run."""
+        models, run, length, count, unique = [], [], [], [], []
+        for i, (responses, per_model_domains) in enumerate(runs):
+            for model, text in responses.items():
+                domains = per_model_domains.get(model, Counter())
+                models.append(model)
+                run.append(i)
+                length.append(len(text or ""))
+                count.append(sum(domains.values()))
+                unique.append(len(domains))
+        return cls._build(len(runs), models, run, length, count, unique)
+
+    @classmethod
+    def from_metrics(cls, runs: Sequence[Dict[str, Dict]]) -> "MetricColumns":
+        """Columns from stored metrics dicts ({model: {response_length, domain_count, unique_domains}})."""
+        models, run, length, count, unique = [], [], [], [], []
+        for i, metrics in enumerate(runs):
+            for model, m in metrics.items():
+                models.append(model)
+                run.append(i)
+                length.append(m.get("response_length", 0))
+                count.append(m.get("domain_count", 0))
+                unique.append(m.get("unique_domains", 0))
+        return cls._build(len(runs), models, run, length, count, unique)
+
+    @classmethod
+    def _build(cls, runs, models, run, length, count, unique) -> "MetricColumns":
+        as_int = lambda values: np.asarray(values, dtype=np.int64)
+        return cls(runs, models, as_int(run), as_int(length), as_int(count), as_int(unique))
+
+
+def _points(column: np.ndarray, weight: Tuple[int, int]) -> np.ndarray:
+    saturation, points = weight
+    return np.minimum(column / saturation, 1.0) * points
+
+
+def visibility_scores(columns: MetricColumns) -> np.ndarray:
+    """Unrounded visibility score per row (float64, same operation order as the scalar code)."""
+    return (
+        _points(columns.response_length, LENGTH_WEIGHT)
+        + _points(columns.domain_count, DOMAIN_WEIGHT)
+        + _points(columns.unique_domains, DIVERSITY_WEIGHT)
+    )
+
+
+def round_like_python(values: np.ndarray, digits: int = 2) -> np.ndarray:
+    """
+    np.round, corrected to match Python's round() exactly. np.round scales by
+    10**digits and rounds, so the two can only disagree on values sitting
+    (within float error) on a halfway point; those few are re-rounded in Python.
+    """
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    halfway = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in halfway.tolist():
+        rounded[i] = round(float(values[i]), digits)
+    return rounded
+
+
+def score_columns(columns: MetricColumns) -> List[Tuple[Dict[str, Dict], List[Tuple[str, float]]]]:
+    """
+    Score and rank every run in one vectorized pass. Returns (metrics, rankings)
+    per run, identical to calculate_visibility_metrics + rank_models.
+    """
+    rounded = round_like_python(visibility_scores(columns))
+    # rank_models is a stable descending sort: order by run, then -score, then original position
+    order = np.lexsort((-rounded, columns.run)).tolist()
+
+    # JSON shape is only built here, one contiguous slice of rows per run
+    bounds = np.searchsorted(columns.run, np.arange(columns.runs + 1)).tolist()
+    rows = list(zip(
+        columns.models,
+        columns.response_length.tolist(),
+        columns.domain_count.tolist(),
+        columns.unique_domains.tolist(),
+        rounded.tolist(),
+    ))
+    results = []
+    for start, end in zip(bounds, bounds[1:]):
+        metrics = {
+            model: {"response_length": length, "domain_count": count, "unique_domains": unique, "visibility_score": score}
+            for model, length, count, unique, score in rows[start:end]
+        }
+        rankings = [(rows[i][0], rows[i][4]) for i in order[start:end]]
+        results.append((metrics, rankings))
+    return results
@@ -0,0 +1,276 @@
+# services/semantic_cache_service.py
+import math
+import os
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Off by default: a hit answers a prompt with the answer to a *similar* one
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "0") not in ("0", "false", "no")
+# Cosine similarity a cached prompt needs to answer a new one; per provider with <PROVIDER>_SEMANTIC_THRESHOLD
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", os.getenv("LLM_CACHE_TTL", str(24 * 3600))))
+
+EMBED_DIM = 1024
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an the of for to in on at by with and or is are was were be what which who whom how do does can could "
+    "should would will i me my we our you your it its this that these those there some any please tell give list "
+    "recommend recommendations recommended".split()
+)
+# Interchangeable words in monitoring prompts ("best CRM tools" / "top CRM software")
+_SYNONYMS = {
+    "top": "best", "leading": "best", "greatest": "best", "finest": "best", "good": "best", "great": "best",
+    "software": "tool", "platform": "tool", "app": "tool", "application": "tool", "solution": "tool",
+    "service": "tool", "product": "tool", "program": "tool", "system": "tool",
+    "option": "alternative", "choice": "alternative", "business": "company", "firm": "company",
+    "affordable": "cheap", "inexpensive": "cheap", "budget": "cheap", "smb": "small",
+}
+
+
+def _stem(word: str) -> str:
+    """Crude plural folding: tools -> tool, companies -> company, businesses -> business."""
+    if len(word) > 4 and word.endswith("sses"):
+        return word[:-2]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def prompt_terms(prompt: str) -> List[str]:
+    """Content words of a prompt: lowercased, stopwords dropped, plurals and synonyms folded."""
+    terms = []
+    for word in _WORD_RE.findall(prompt.lower()):
+        if word in _STOPWORDS:
+            continue
+        word = _stem(word)
+        terms.append(_SYNONYMS.get(word, word))
+    return terms
+
+
+def _feature(name: str) -> Tuple[int, float]:
+    h = zlib.crc32(name.encode("utf-8"))
+    return h % EMBED_DIM, 1.0 if h & 0x80000000 else -1.0
+
+
+def embed(prompt: str) -> Dict[int, float]:
+    """
+    Hashed n-gram vector of a prompt (sparse, L2-normalised): content words,
+    adjacent word pairs, and character trigrams so typos and word forms
+    still overlap. Deterministic across processes; no model to load.
+    """
+    terms = prompt_terms(prompt)
+    vector: Dict[int, float] = {}
+
+    def add(name: str, weight: float):
+        index, sign = _feature(name)
+        vector[index] = vector.get(index, 0.0) + sign * weight
+
+    for term in terms:
+        add("w:" + term, 1.0)
+        if not term.isdigit():
+            padded = f"#{term}#"
+            for i in range(len(padded) - 2):
+                add("c:" + padded[i:i + 3], 0.25)
+    for first, second in zip(terms, terms[1:]):
+        add(f"b:{first} {second}", 0.25)
+
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {i: w / norm for i, w in vector.items() if w} if norm else {}
+
+
+def _numbers(prompt: str) -> FrozenSet[str]:
+    return frozenset(re.findall(r"\d+", prompt))
+
+
+# Words folded by _SYNONYMS are generic ("best", "tool"); only the order of the other terms matters
+_GENERIC_TERMS = frozenset(_SYNONYMS) | frozenset(_SYNONYMS.values())
+
+
+def _entity_order(prompt: str) -> Tuple[str, ...]:
+    """Non-generic content terms of a prompt in order of first appearance ("hubspot", "salesforce", ...)."""
+    return tuple(dict.fromkeys(t for t in prompt_terms(prompt) if t not in _GENERIC_TERMS))
+
+
+def _same_order(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    """
+    Whether the terms two prompts share appear in the same order: "is hubspot better
+    than salesforce" embeds almost like the reversed question but must not answer it.
+    """
+    shared = set(a) & set(b)
+    return [t for t in a if t in shared] == [t for t in b if t in shared]
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(i, 0.0) for i, w in a.items())
+
+
+class _Entry:
+    __slots__ = ("key", "scope", "vector", "numbers", "entities", "value", "expires_at", "saved", "signature")
+
+    def __init__(self, key, scope, vector, numbers, entities, value, expires_at, saved, signature):
+        self.key = key
+        self.scope = scope
+        self.vector = vector
+        self.numbers = numbers
+        self.entities = entities
+        self.value = value
+        self.expires_at = expires_at
+        self.saved = saved
+        self.signature = signature
+
+
+class SemanticCache:
+    """
+    Near-duplicate prompt cache: answers a prompt with a cached answer to a
+    paraphrase of it. Prompts are embedded with embed() and indexed with
+    random-hyperplane LSH (`tables` hash tables of `bits` bits); the candidates
+    sharing a bucket are compared exactly and the most similar one hits if its
+    cosine reaches the provider's threshold, it names the same numbers
+    (years, versions) and the terms both prompts share come in the same order
+    (A vs B is not B vs A). Entries live `ttl` seconds; beyond `max_entries` the
+    least recently used is evicted.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, thresholds: Optional[Dict[str, float]] = None,
+                 max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES, ttl: float = SEMANTIC_CACHE_TTL,
+                 tables: int = 12, bits: int = 8, seed: int = 0):
+        self.threshold = threshold
+        self.thresholds = dict(thresholds or {})
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bits = bits
+        self.seed = seed
+        # dim -> one hyperplane coefficient per (table, bit); rows are drawn on first use
+        self._planes: Dict[int, List[float]] = {}
+        self._tables: List[Dict[tuple, set]] = [{} for _ in range(tables)]
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "candidates": 0}
+        self._saved_seconds = 0.0
+        self._similarity_sum = 0.0
+
+    def threshold_for(self, provider: str) -> float:
+        if provider not in self.thresholds:
+            override = os.getenv(f"{provider.upper()}_SEMANTIC_THRESHOLD")
+            self.thresholds[provider] = float(override) if override else self.threshold
+        return self.thresholds[provider]
+
+    def _plane_row(self, dim: int) -> List[float]:
+        row = self._planes.get(dim)
+        if row is None:
+            rng = random.Random(self.seed * EMBED_DIM + dim)
+            row = self._planes[dim] = [rng.gauss(0.0, 1.0) for _ in range(len(self._tables) * self.bits)]
+        return row
+
+    def _signature(self, vector: Dict[int, float]) -> Tuple[int, ...]:
+        sums = [0.0] * (len(self._tables) * self.bits)
+        for dim, weight in vector.items():
+            for i, coefficient in enumerate(self._plane_row(dim)):
+                sums[i] += weight * coefficient
+        signature = []
+        for t in range(len(self._tables)):
+            code = 0
+            for s in sums[t * self.bits:(t + 1) * self.bits]:
+                code = code << 1 | (s > 0)
+            signature.append(code)
+        return tuple(signature)
+
+    def get(self, provider: str, prompt: str, max_tokens: int, temperature: float) -> Optional[str]:
+        """Cached answer to the closest paraphrase of `prompt` for the same call settings, if close enough."""
+        scope = (provider, max_tokens, temperature)
+        vector = embed(prompt)
+        if not vector:
+            self._counters["misses"] += 1
+            return None
+        signature = self._signature(vector)
+        numbers = _numbers(prompt)
+        entities = _entity_order(prompt)
+        now = time.time()
+
+        candidates = set()
+        for table, code in zip(self._tables, signature):
+            candidates |= table.get((scope, code), set())
+        self._counters["candidates"] += len(candidates)
+
+        best, best_similarity = None, self.threshold_for(provider)
+        for key in candidates:
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                self._drop(key)
+                self._counters["expirations"] += 1
+                continue
+            if entry.numbers != numbers or not _same_order(entities, entry.entities):
+                continue
+            similarity = cosine(vector, entry.vector)
+            if similarity >= best_similarity:
+                best, best_similarity = entry, similarity
+
+        if best is None:
+            self._counters["misses"] += 1
+            return None
+        self._entries.move_to_end(best.key)
+        self._counters["hits"] += 1
+        self._saved_seconds += best.saved
+        self._similarity_sum += best_similarity
+        return best.value
+
+    def set(self, provider: str, prompt: str, max_tokens: int, temperature: float, value: str, elapsed: float = 0.0):
+        """Remember an answer; `elapsed` is what the provider call took, counted as saved on every hit."""
+        vector = embed(prompt)
+        if not vector:
+            return
+        scope = (provider, max_tokens, temperature)
+        key = repr((scope, sorted(vector.items())))
+        if key in self._entries:
+            self._drop(key)
+        signature = self._signature(vector)
+        self._entries[key] = _Entry(
+            key, scope, vector, _numbers(prompt), _entity_order(prompt), value, time.time() + self.ttl, elapsed, signature
+        )
+        for table, code in zip(self._tables, signature):
+            table.setdefault((scope, code), set()).add(key)
+        self._counters["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self._counters["evictions"] += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        for table, code in zip(self._tables, entry.signature):
+            bucket = table.get((entry.scope, code))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[(entry.scope, code)]
+
+    def clear(self):
+        self._entries.clear()
+        for table in self._tables:
+            table.clear()
+
+    def stats(self) -> Dict:
+        hits, lookups = self._counters["hits"], self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "avg_candidates": round(self._counters["candidates"] / lookups, 1) if lookups else 0.0,
+            "avg_hit_similarity": round(self._similarity_sum / hits, 4) if hits else None,
+            "saved_seconds": round(self._saved_seconds, 3),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "thresholds": dict(self.thresholds),
+            "ttl": self.ttl,
+        }
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,425 @@
+# services/store_service.py
+import contextlib
+import json
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.utils import normalize_domain
+
+# Directory for the backend's data files; defaults to the backend directory
+DATA_DIR = pathlib.Path(os.getenv("DATA_DIR") or pathlib.Path(__file__).resolve().parents[2]).resolve()
+# SQLite file holding every finished analysis (":memory:" keeps it per-process); a
+# relative path is under DATA_DIR, so it doesn't depend on the working directory
+ANALYSIS_DB_PATH = os.getenv("ANALYSIS_DB", "analyses.sqlite3")
+if ANALYSIS_DB_PATH != ":memory:":
+    ANALYSIS_DB_PATH = str(DATA_DIR / ANALYSIS_DB_PATH)
+# Writes are grouped into one transaction of up to this many analyses...
+STORE_BATCH_SIZE = int(os.getenv("STORE_BATCH_SIZE", "64"))
+# ...or whatever arrived within this many seconds of the first one
+STORE_FLUSH_INTERVAL = float(os.getenv("STORE_FLUSH_INTERVAL", "0.05"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    target_domain TEXT,
+    models TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    geo_score REAL,
+    summary TEXT,
+    results TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created_at, id);
+CREATE INDEX IF NOT EXISTS analyses_target ON analyses (target_domain, created_at);
+
+CREATE TABLE IF NOT EXISTS responses (
+    analysis_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    response TEXT,
+    response_time INTEGER,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (analysis_id, model)
+);
+CREATE INDEX IF NOT EXISTS responses_model ON responses (model, created_at);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    analysis_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response_length INTEGER,
+    domain_count INTEGER,
+    unique_domains INTEGER,
+    visibility_score REAL,
+    PRIMARY KEY (analysis_id, model)
+);
+
+CREATE TABLE IF NOT EXISTS domain_mentions (
+    analysis_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    mentions INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (analysis_id, model, domain)
+);
+CREATE INDEX IF NOT EXISTS mentions_domain ON domain_mentions (domain, created_at);
+CREATE INDEX IF NOT EXISTS mentions_model ON domain_mentions (model, created_at);
+
+CREATE TABLE IF NOT EXISTS sweeps (
+    id TEXT PRIMARY KEY,
+    definition TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+-- one row per (sweep run, target domain, model); model '' totals every model of the run
+CREATE TABLE IF NOT EXISTS sweep_points (
+    sweep_id TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    model TEXT NOT NULL,
+    ts REAL NOT NULL,
+    answers INTEGER NOT NULL,
+    mentioned INTEGER NOT NULL,
+    mentions INTEGER NOT NULL,
+    PRIMARY KEY (sweep_id, domain, model, ts)
+) WITHOUT ROWID;
+"""
+
+
+def _encode_cursor(created_at: float, *keys: str) -> str:
+    return "|".join((repr(created_at),) + keys)
+
+
+def _decode_cursor(cursor: str, keys: int) -> Tuple:
+    """(created_at, *keys) from a client-supplied cursor; ValueError if it isn't one of ours."""
+    created_at, *rest = cursor.split("|")
+    if len(rest) != keys:
+        raise ValueError(f"invalid cursor: {cursor!r}")
+    try:
+        return (float(created_at), *rest)
+    except ValueError:
+        raise ValueError(f"invalid cursor: {cursor!r}") from None
+
+
+def _encode_analysis(analysis: Tuple) -> Tuple:
+    """An analyses row as queued by save(), with its models and results columns as JSON."""
+    row = list(analysis)
+    row[3], row[8] = json.dumps(row[3]), json.dumps(row[8])
+    return tuple(row)
+
+
+class AnalysisStore:
+    """
+    Embedded SQLite (WAL) store for finished analyses: prompt, raw responses,
+    per-model domain mentions, metrics and the full results payload, indexed
+    by time, target domain and model.
+
+    save() only queues the analysis; a writer thread commits queued analyses
+    in batches (one transaction per STORE_BATCH_SIZE / STORE_FLUSH_INTERVAL)
+    so finishing an analysis never waits on disk. Reads are indexed lookups
+    with keyset pagination (cursor = last row's created_at|id) on a read-only
+    connection per thread, so they never wait for the writer either; async
+    callers run them in a worker thread (anyio.to_thread.run_sync).
+    """
+
+    def __init__(self, path: str = ANALYSIS_DB_PATH, batch_size: int = STORE_BATCH_SIZE,
+                 flush_interval: float = STORE_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._readers: Dict[int, sqlite3.Connection] = {}  # thread id -> read-only connection
+        self._readers_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._counters = {"queued": 0, "written": 0, "batches": 0, "errors": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    # --- writes -------------------------------------------------------------
+
+    def save(self, analysis_id: str, state, status: str, error: Optional[str] = None,
+             created_at: Optional[float] = None, finished_at: Optional[float] = None):
+        """
+        Queue one finished analysis (an AnalysisState) for the next batch. The
+        JSON columns are encoded by the writer thread, off the event loop.
+        """
+        created_at = time.time() if created_at is None else created_at
+        results = state.results()
+        analysis = (
+            analysis_id, state.prompt, normalize_domain(state.target_domain) or None, list(state.models), status, error,
+            results.get("geo_score"), state.summary, results, created_at, finished_at,
+        )
+        responses = [
+            (analysis_id, model, r["status"], r["response"], r["response_time"], created_at)
+            for model, r in state.model_results.items()
+        ]
+        metrics = [
+            (analysis_id, model, m["response_length"], m["domain_count"], m["unique_domains"], m["visibility_score"])
+            for model, m in state.metrics.items()
+        ]
+        mentions = [
+            (analysis_id, model, domain, int(count), created_at)
+            for model, counter in state.per_model_domains.items()
+            for domain, count in counter.items() if count
+        ]
+        self._start_writer()
+        self._queue.put((analysis, responses, metrics, mentions))
+        self._counters["queued"] += 1
+
+    def _start_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="analysis-store", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write_batch(batch)
+            except sqlite3.Error:
+                self._counters["errors"] += len(batch)
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Tuple]):
+        analyses = [_encode_analysis(analysis) for analysis, _, _, _ in batch]
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN")
+            try:
+                db.executemany("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", analyses)
+                db.executemany("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                               [row for _, rows, _, _ in batch for row in rows])
+                db.executemany("INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?)",
+                               [row for _, _, rows, _ in batch for row in rows])
+                db.executemany("INSERT OR REPLACE INTO domain_mentions VALUES (?, ?, ?, ?, ?)",
+                               [row for _, _, _, rows in batch for row in rows])
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                db.execute("ROLLBACK")
+                raise
+        self._counters["written"] += len(batch)
+        self._counters["batches"] += 1
+
+    def save_sweep(self, sweep_id: str, definition: Dict, created_at: float):
+        with self._lock:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO sweeps VALUES (?, ?, ?)", (sweep_id, json.dumps(definition), created_at)
+            )
+
+    def delete_sweep(self, sweep_id: str):
+        """Forget a sweep and its time series."""
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN")
+            try:
+                db.execute("DELETE FROM sweeps WHERE id = ?", (sweep_id,))
+                db.execute("DELETE FROM sweep_points WHERE sweep_id = ?", (sweep_id,))
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                db.execute("ROLLBACK")
+                raise
+
+    def save_sweep_points(self, rows: List[Tuple]):
+        """Write one sweep run: (sweep_id, domain, model, ts, answers, mentioned, mentions) rows."""
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN")
+            try:
+                db.executemany("INSERT OR REPLACE INTO sweep_points VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                db.execute("ROLLBACK")
+                raise
+
+    def flush(self):
+        """Block until every queued analysis has been committed."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+        with self._readers_lock:
+            readers, self._readers = self._readers, {}
+        for reader in readers.values():
+            reader.close()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # --- reads --------------------------------------------------------------
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read-only connection; under WAL, readers never block on the writer."""
+        thread_id = threading.get_ident()
+        db = self._readers.get(thread_id)
+        if db is None:
+            if self._db is None:
+                with self._lock:
+                    self._conn()  # the file and schema must exist before a read-only open
+            uri = pathlib.Path(self.path).absolute().as_uri() + "?mode=ro"
+            with self._readers_lock:
+                # drop the connections of threads that have exited (worker threads come and go)
+                alive = {t.ident for t in threading.enumerate()}
+                for stale in [t for t in self._readers if t not in alive]:
+                    self._readers.pop(stale).close()
+                db = self._readers[thread_id] = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return db
+
+    def _query(self, sql: str, params: Tuple) -> List[Dict]:
+        # a second connection to ":memory:" would open a different, empty database: share the writer's
+        shared = self.path == ":memory:"
+        with self._lock if shared else contextlib.nullcontext():
+            cursor = (self._conn() if shared else self._reader()).execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def list_analyses(self, target_domain: Optional[str] = None, model: Optional[str] = None,
+                      since: Optional[float] = None, until: Optional[float] = None,
+                      limit: int = 20, cursor: Optional[str] = None) -> Dict:
+        """Newest-first page of analysis summaries; pass next_cursor back for the following page."""
+        where, params = [], []
+        if target_domain:
+            where.append("a.target_domain = ?")
+            params.append(normalize_domain(target_domain))
+        if model:
+            where.append("EXISTS (SELECT 1 FROM responses r WHERE r.analysis_id = a.id AND r.model = ?)")
+            params.append(model)
+        if since is not None:
+            where.append("a.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("a.created_at < ?")
+            params.append(until)
+        if cursor:
+            where.append("(a.created_at, a.id) < (?, ?)")
+            params += _decode_cursor(cursor, 1)
+        sql = (
+            "SELECT a.id, a.prompt, a.target_domain, a.models, a.status, a.geo_score, a.created_at, a.finished_at"
+            " FROM analyses a" + (" WHERE " + " AND ".join(where) if where else "")
+            + " ORDER BY a.created_at DESC, a.id DESC LIMIT ?"
+        )
+        rows = self._query(sql, tuple(params) + (limit + 1,))
+        page = rows[:limit]
+        for row in page:
+            row["models"] = json.loads(row["models"])
+        next_cursor = _encode_cursor(page[-1]["created_at"], page[-1]["id"]) if len(rows) > limit else None
+        return {"items": page, "next_cursor": next_cursor}
+
+    def get_analysis(self, analysis_id: str) -> Optional[Dict]:
+        """The stored analysis with its full results payload, or None."""
+        rows = self._query("SELECT * FROM analyses WHERE id = ?", (analysis_id,))
+        if not rows:
+            return None
+        row = rows[0]
+        row["models"] = json.loads(row["models"])
+        row["results"] = json.loads(row["results"])
+        return row
+
+    def model_domains(self, analysis_id: str) -> Optional[Tuple[List[str], Dict[str, Dict[str, int]]]]:
+        """
+        (models, {model: {domain: mentions}}) of a stored analysis, or None.
+        Every model of the analysis is included; one that mentioned nothing (or failed) maps to {}.
+        """
+        rows = self._query("SELECT models FROM analyses WHERE id = ?", (analysis_id,))
+        if not rows:
+            return None
+        models = json.loads(rows[0]["models"])
+        per_model: Dict[str, Dict[str, int]] = {model: {} for model in models}
+        for row in self._query("SELECT model, domain, mentions FROM domain_mentions WHERE analysis_id = ?", (analysis_id,)):
+            per_model.setdefault(row["model"], {})[row["domain"]] = row["mentions"]
+        return models, per_model
+
+    def domain_mentions(self, domain: str, model: Optional[str] = None, since: Optional[float] = None,
+                        limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """Newest-first mentions of one domain: one row per (analysis, model) that cited it."""
+        domain = normalize_domain(domain)
+        where, params = ["domain = ?"], [domain]
+        if model:
+            where.append("model = ?")
+            params.append(model)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        if cursor:
+            where.append("(created_at, analysis_id, model) < (?, ?, ?)")
+            params += _decode_cursor(cursor, 2)
+        sql = (
+            "SELECT analysis_id, model, mentions, created_at FROM domain_mentions WHERE " + " AND ".join(where)
+            + " ORDER BY created_at DESC, analysis_id DESC, model DESC LIMIT ?"
+        )
+        rows = self._query(sql, tuple(params) + (limit + 1,))
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = _encode_cursor(last["created_at"], last["analysis_id"], last["model"])
+        return {"domain": domain, "items": page, "next_cursor": next_cursor}
+
+    def load_sweeps(self) -> List[Dict]:
+        """Every registered sweep definition, oldest first."""
+        rows = self._query("SELECT definition FROM sweeps ORDER BY created_at, id", ())
+        return [json.loads(row["definition"]) for row in rows]
+
+    def sweep_series(self, sweep_id: str, domain: str, model: str = "", since: Optional[float] = None,
+                     until: Optional[float] = None) -> List[Dict]:
+        """
+        Oldest-first visibility of one domain across a sweep's runs, for all models
+        (model="") or one. visibility = share (0-100) of answers that mentioned it.
+        """
+        where, params = ["sweep_id = ?", "domain = ?", "model = ?"], [sweep_id, normalize_domain(domain), model]
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            params.append(until)
+        rows = self._query(
+            "SELECT ts, answers, mentioned, mentions FROM sweep_points WHERE " + " AND ".join(where) + " ORDER BY ts",
+            tuple(params),
+        )
+        for row in rows:
+            row["visibility"] = round(100 * row["mentioned"] / row["answers"], 2) if row["answers"] else 0.0
+        return rows
+
+    def stats(self) -> Dict:
+        return {**self._counters, "pending": self._queue.qsize(), "path": self.path}
+
+
+analysis_store = AnalysisStore()
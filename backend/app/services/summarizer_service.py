@@ -1,30 +1,89 @@
 # services/summarizer_service.py
 import asyncio
-from typing import Dict
+import os
+import random
+from typing import Dict, Iterable
 from app.core.utils import normalize_domain, counter_to_dict
+from app.core.telemetry import timed_stage
 
-from app.services.ai_client import query_model as query_llm  # or query_llm if you rename it later
-# your existing ai_client module
+from app.services import ai_client
+from app.services.ai_client import ProviderError
+from app.services.prompt_service import SUMMARY_CONTEXT_TOKENS, assemble_responses, count_tokens
 
 DEFAULT_SUMMARY_PROVIDER = "claude"  # prefer Claude if available
-
-
+SUMMARY_FALLBACK_PROVIDERS = ("claude", "groq")
+
+# Retry policy per provider before falling back to the next one
+SUMMARY_ATTEMPTS = int(os.getenv("SUMMARY_ATTEMPTS", "2"))
+SUMMARY_ATTEMPT_TIMEOUT = float(os.getenv("SUMMARY_ATTEMPT_TIMEOUT", "15"))
+SUMMARY_BACKOFF = float(os.getenv("SUMMARY_BACKOFF", "0.5"))
+# Total time the summary step may take across every provider and attempt
+SUMMARY_DEADLINE = float(os.getenv("SUMMARY_DEADLINE", "20"))
+
+# Running tokens-per-summary report (see summary_token_stats)
+_token_counters = {"summaries": 0, "prompt_tokens": 0, "response_tokens_in": 0, "duplicates_dropped": 0}
+
+
+async def query_with_fallback(
+    prompt: str,
+    providers: Iterable[str],
+    max_tokens: int = 300,
+    temperature: float = 0.5,
+    attempts: int = SUMMARY_ATTEMPTS,
+    timeout: float = SUMMARY_ATTEMPT_TIMEOUT,
+    backoff: float = SUMMARY_BACKOFF,
+    deadline: float = SUMMARY_DEADLINE,
+) -> str:
+    """
+    Try each provider in order, retrying with jittered exponential backoff.
+    Every attempt is bounded by `timeout`, and all of them together by
+    `deadline`: no attempt starts (or backs off) past it. Client errors other
+    than 429 skip straight to the next provider. Returns a "⚠️ ..." string if
+    all fail.
+    """
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    last_error = "no summary provider configured"
+    for provider in providers:
+        for attempt in range(attempts):
+            remaining = end - loop.time()
+            if remaining <= 0:
+                return f"⚠️ Summary generation failed: {last_error} (summary deadline of {deadline:g}s reached)"
+            try:
+                text = await asyncio.wait_for(
+                    ai_client.query_model(prompt, provider, max_tokens, temperature), min(timeout, remaining)
+                )
+                if text and not text.startswith("⚠️"):
+                    return text
+                last_error = f"{provider} returned an empty response"
+            except asyncio.TimeoutError:
+                last_error = f"{provider} timed out after {min(timeout, remaining):g}s"
+            except ProviderError as e:
+                last_error = str(e)
+                if e.status_code and 400 <= e.status_code < 500 and e.status_code != 429:
+                    break
+            except Exception as e:
+                last_error = f"{provider}: {e}"
+            if attempt + 1 < attempts:
+                await asyncio.sleep(min(backoff * (2 ** attempt) * random.uniform(0.5, 1.0),
+                                        max(0.0, end - loop.time())))
+    return f"⚠️ Summary generation failed: {last_error}"
+
+
+@timed_stage("synthesize_summary")
 async def synthesize_summary(responses: Dict[str, str], prefer_provider: str = DEFAULT_SUMMARY_PROVIDER) -> str:
     """
     Combine responses and ask an LLM to create a short professional summary.
-    This function runs the blocking query_llm in a thread to avoid blocking the event loop.
+    The preferred provider is tried first, then the remaining
+    SUMMARY_FALLBACK_PROVIDERS; only the prompt assembly leaves the event loop.
     """
     if not responses:
         return "No responses to summarize."
 
-    combined = []
-    for model, text in responses.items():
-        # skip error tokens
-        if text and not text.startswith("⚠️"):
-            snippet = text.strip()
-            combined.append(f"**{model}:** {snippet[:800]}")
-
-    combined_text = "\n\n".join(combined).strip()
+    # fit the responses into the token budget: fair share per model, cut at
+    # sentence boundaries, near-duplicate passages across models dropped (in a
+    # thread: tokenizing and deduplicating is CPU work)
+    combined_text, stats = await asyncio.to_thread(assemble_responses, responses, SUMMARY_CONTEXT_TOKENS)
     if not combined_text:
         return "⚠️ All models returned errors or empty responses."
 
@@ -41,23 +100,23 @@ Model Responses:
 Provide your analysis:
 """
 
-    # call query_llm in a thread (query_llm is synchronous in ai_client.py)
-    try:
-        # try preferred provider first
-        summary = await asyncio.to_thread(
-            query_llm,
-            synthesis_prompt,
-            prefer_provider,
-            None,
-            300,
-            0.5
-        )
-        if isinstance(summary, str) and summary.startswith("⚠️"):
-            # fallback to groq
-            summary = await asyncio.to_thread(query_llm, synthesis_prompt, "groq", None, 300, 0.5)
-        return summary
-    except Exception as e:
-        return f"⚠️ Summary generation failed: {str(e)}"
+    _token_counters["summaries"] += 1
+    _token_counters["prompt_tokens"] += count_tokens(synthesis_prompt)
+    _token_counters["response_tokens_in"] += stats["tokens_in"]
+    _token_counters["duplicates_dropped"] += stats["duplicates_dropped"]
+
+    providers = [prefer_provider] + [p for p in SUMMARY_FALLBACK_PROVIDERS if p != prefer_provider]
+    return await query_with_fallback(synthesis_prompt, providers, max_tokens=300, temperature=0.5)
+
+
+def summary_token_stats() -> Dict:
+    """Prompt tokens spent per synthesized summary since startup."""
+    summaries = _token_counters["summaries"]
+    return {
+        **_token_counters,
+        "avg_prompt_tokens": round(_token_counters["prompt_tokens"] / summaries, 1) if summaries else 0.0,
+        "context_budget": SUMMARY_CONTEXT_TOKENS,
+    }
 
 
 def generate_insights(global_domains, per_model_domains, metrics) -> str:
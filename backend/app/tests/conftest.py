@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+# keep test analyses out of the on-disk store
+os.environ.setdefault("ANALYSIS_DB", ":memory:")
+
+# tests never call the real provider APIs, whatever keys the shell exports
+for var in ("GROQ_API_KEY", "ANTHROPIC_API_KEY", "GEMINI_API_KEY", "OPENROUTER_API_KEY", "HUGGINGFACE_API_KEY",
+            "MOCK_PROVIDER_URL"):
+    os.environ.pop(var, None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limits(monkeypatch):
+    """Each test starts with full provider budgets and no 429 back-off left over."""
+    from app.services import ai_client
+    from app.services.ratelimit_service import ProviderLimits
+
+    monkeypatch.setattr(ai_client, "limits", ProviderLimits(ai_client.PROVIDERS))
@@ -0,0 +1,74 @@
+from collections import Counter
+
+from app.services import aggregate_service
+from app.services.aggregate_service import DomainAggregate
+
+HOUR = 3600
+
+
+def make_clock(monkeypatch, start=1_700_000_000.0):
+    now = [start]
+    monkeypatch.setattr(aggregate_service.time, "time", lambda: now[0])
+    return now
+
+
+def test_window_totals_are_merged_incrementally(monkeypatch):
+    make_clock(monkeypatch)
+    agg = DomainAggregate()
+    agg.ingest({"groq": Counter({"hubspot.com": 3, "zoho.com": 1}), "claude": Counter({"zoho.com": 1})})
+    agg.ingest({"groq": Counter({"hubspot.com": 1}), "gemini": Counter()})
+
+    window = agg.window("https://www.HubSpot.com", "24h")
+    assert window["domain"] == "hubspot.com"
+    assert window["mentions"] == 4
+    assert window["per_model_mentions"] == {"groq": 4}
+    assert window["responses"] == 4
+    # 2 of 4 responses mention it; repeats within a response don't inflate the score
+    assert window["geo_score"] == 50.0
+    assert agg.top_domains("24h") == [("hubspot.com", 4), ("zoho.com", 2)]
+
+
+def test_buckets_slide_out_of_windows(monkeypatch):
+    now = make_clock(monkeypatch)
+    agg = DomainAggregate()
+    agg.ingest({"groq": Counter({"hubspot.com": 1})})
+    now[0] += 2 * HOUR
+    agg.ingest({"groq": Counter({"zoho.com": 1})})
+
+    assert agg.window("hubspot.com", "1h")["mentions"] == 0
+    assert agg.window("hubspot.com", "24h")["mentions"] == 1
+    now[0] += 23 * HOUR
+    assert agg.window("hubspot.com", "24h")["mentions"] == 0
+    assert agg.window("zoho.com", "24h")["mentions"] == 1
+    assert agg.window("hubspot.com", "7d")["mentions"] == 1
+
+    now[0] += 31 * 24 * HOUR
+    assert agg.window("zoho.com", "30d") == {
+        "domain": "zoho.com", "window": "30d", "mentions": 0, "per_model_mentions": {},
+        "responses": 0, "responses_mentioning": 0, "geo_score": 0.0,
+    }
+    assert agg._buckets == {}
+
+
+def test_trend_has_one_point_per_bucket(monkeypatch):
+    now = make_clock(monkeypatch, start=1_700_000_000.0 - 1_700_000_000.0 % HOUR)
+    agg = DomainAggregate()
+    agg.ingest({"groq": Counter({"hubspot.com": 2}), "claude": Counter()})
+    now[0] += HOUR
+    agg.ingest({"groq": Counter({"hubspot.com": 1})})
+
+    points = agg.trend("hubspot.com", "24h")
+    assert len(points) == 24
+    assert [(p["mentions"], p["geo_score"]) for p in points[-2:]] == [(2, 50.0), (1, 100.0)]
+
+
+def test_registrable_target_covers_its_subdomains(monkeypatch):
+    make_clock(monkeypatch)
+    agg = DomainAggregate()
+    agg.ingest({"groq": Counter({"blog.hubspot.com": 2, "hubspot.com": 1}), "claude": Counter({"zoho.com": 1})})
+
+    window = agg.window("hubspot.com", "24h")
+    assert (window["mentions"], window["responses_mentioning"], window["geo_score"]) == (3, 1, 50.0)
+    assert agg.window("blog.hubspot.com", "24h")["mentions"] == 2
+    assert agg.trend("hubspot.com", "24h")[-1]["mentions"] == 3
+    assert agg.top_domains("24h") == [("blog.hubspot.com", 2), ("hubspot.com", 1), ("zoho.com", 1)]
@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import ai_client
+from app.services.cache_service import ResponseCache
+
+
+def mock_provider(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/chat/completions"):
+        return httpx.Response(200, json={"choices": [{"message": {"content": "groq says hi"}}]})
+    if request.url.path.endswith("/messages"):
+        assert request.headers["x-api-key"] == "test-key"
+        return httpx.Response(200, json={"content": [{"type": "text", "text": "claude says hi"}]})
+    return httpx.Response(429, text="slow down")
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ai_client.ProviderRegistry(transport=httpx.MockTransport(mock_provider))
+    monkeypatch.setattr(ai_client, "registry", registry)
+    monkeypatch.setitem(ai_client.API_KEYS, "groq", "test-key")
+    monkeypatch.setitem(ai_client.API_KEYS, "claude", "test-key")
+    monkeypatch.setitem(ai_client.API_KEYS, "gemini", "test-key")
+    return registry
+
+
+def test_query_model_reuses_pooled_client(registry):
+    async def run():
+        await registry.startup()
+        client = registry.client("groq")
+        first = await ai_client.query_model("hi", "groq")
+        second = await ai_client.query_model("hi", "claude")
+        assert registry.client("groq") is client
+        await registry.shutdown()
+        return first, second
+
+    assert asyncio.run(run()) == ("groq says hi", "claude says hi")
+    assert registry.stats()["groq"]["requests"] == 1
+    assert registry.stats()["groq"]["open"] is False
+
+
+def test_provider_errors_carry_status(registry, monkeypatch):
+    monkeypatch.setattr(ai_client, "RATE_LIMIT_RETRIES", 0)
+    with pytest.raises(ai_client.ProviderError) as exc:
+        asyncio.run(ai_client.query_model("hi", "gemini"))
+    assert exc.value.status_code == 429
+    assert registry.stats()["gemini"]["errors"] == 1
+
+
+def test_provider_without_key_is_simulated():
+    assert asyncio.run(ai_client.query_model("hi", "huggingface")).startswith("Simulated response")
+
+
+def test_provider_stats_endpoint():
+    with TestClient(app) as client:
+        body = client.get("/api/health/providers").json()
+    data, limits = body["providers"], body["rate_limits"]
+    assert set(data) == set(ai_client.PROVIDERS) == set(limits)
+    assert data["groq"]["max_connections"] == ai_client.PROVIDERS["groq"]["max_connections"]
+    assert limits["groq"]["max_concurrency"] == ai_client.PROVIDERS["groq"]["max_connections"]
+    assert limits["groq"]["waiting"] == 0
+
+
+def test_query_model_serves_repeats_from_cache(registry, monkeypatch):
+    monkeypatch.setattr(ai_client, "response_cache", ResponseCache())
+
+    async def run():
+        first = await ai_client.query_model("cached prompt", "groq")
+        second = await ai_client.query_model("cached prompt", "groq")
+        bypassed = await ai_client.query_model("cached prompt", "groq", use_cache=False)
+        return first, second, bypassed
+
+    assert asyncio.run(run()) == ("groq says hi",) * 3
+    assert registry.stats()["groq"]["requests"] == 2
+    assert ai_client.response_cache.stats()["hits"] == 1
+
+
+def test_identical_in_flight_queries_are_coalesced(registry, monkeypatch):
+    monkeypatch.setattr(ai_client, "response_cache", ResponseCache())
+
+    async def run():
+        return await asyncio.gather(*(ai_client.query_model("same", "groq", use_cache=False) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["groq says hi"] * 5
+    assert registry.stats()["groq"]["requests"] == 1
@@ -4,7 +4,7 @@ from app.main import app
 client = TestClient(app)
 
 def test_analysis():
-    response = client.post("/analysis", json={"text": "hello hello world"})
+    response = client.post("/api/analysis/text", json={"text": "hello hello world"})
     assert response.status_code == 200
     data = response.json()
     assert data["word_count"] == 3
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+import warnings
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings
+from app.main import create_app
+
+
+def test_factory_mounts_every_router_once():
+    app = create_app()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # e.g. FastAPI's "Duplicate Operation ID"
+        schema = app.openapi()
+    operations = Counter((method, path) for path, item in schema["paths"].items() for method in item)
+    assert all(count == 1 for count in operations.values())
+    for method, path in [("post", "/api/geo/score"), ("post", "/api/ai/query"), ("post", "/api/analysis/rescore"),
+                         ("get", "/api/health"), ("post", "/api/multi-llm-analysis"),
+                         ("get", "/api/analysis-progress/{analysis_id}"), ("post", "/api/analysis-progress/{analysis_id}")]:
+        assert (method, path) in operations
+
+    client = TestClient(app)
+    assert client.post("/api/geo/score", json={
+        "global_counts": {"zoho.com": 1}, "target_domain": "zoho.com", "total_models": 2,
+    }).json()["geo_score"] == 50.0
+
+
+def test_startup_defers_numpy_and_tiktoken():
+    code = "import sys, app.main; print(sorted({'numpy', 'tiktoken'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_settings_read_the_environment(monkeypatch):
+    monkeypatch.setenv("DEFAULT_MAX_TOKENS", "42")
+    assert Settings().DEFAULT_MAX_TOKENS == 42
+    assert Settings(DEFAULT_MAX_TOKENS=7).DEFAULT_MAX_TOKENS == 7
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import batch_service
+from app.services.batch_service import analyze_in_pool, analyze_response_set, get_pool, shutdown_pool
+
+SETS = [
+    {"groq": "Try hubspot.com and zoho.com, according to gartner.com [1].", "claude": "hubspot.com " * 12},
+    {"groq": "No domains here at all.", "claude": "Salesforce.com (2024) leads; see salesforce.com."},
+    {"gemini": "pipedrive.com"},
+]
+
+
+def test_metrics_endpoint_runs_real_pipeline():
+    with TestClient(app) as client:
+        data = client.post("/api/analysis/metrics", json={"responses": SETS[0]}).json()
+    expected = analyze_response_set(SETS[0])
+    assert data["metrics"] == expected["metrics"]
+    assert data["global_domains"] == {"hubspot.com": 13, "zoho.com": 1, "gartner.com": 1}
+    assert data["citations"] == {"groq": 2, "claude": 0}
+    assert data["rankings"][0][0] == "claude"
+
+
+def test_batch_streams_one_line_per_set():
+    items = [{"id": f"run-{i}", "responses": s} for i, s in enumerate(SETS)]
+    with TestClient(app) as client:
+        response = client.post("/api/analysis/batch", json={"items": items, "target_domain": "hubspot.com"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    for line in lines:
+        assert line["id"] == f"run-{line['index']}"
+        assert line["result"] == json.loads(json.dumps(analyze_response_set(SETS[line["index"]], "hubspot.com")))
+
+
+def test_pool_workers_are_not_forked():
+    try:
+        assert get_pool()._mp_context.get_start_method() in ("forkserver", "spawn")
+        assert asyncio.run(analyze_in_pool(SETS[2], "pipedrive.com"))["geo_score"] == 100.0
+    finally:
+        shutdown_pool()
+
+
+def test_small_single_sets_skip_the_pool(monkeypatch):
+    pooled = []
+
+    async def fake_analyze_in_pool(responses, target_domain=None):
+        pooled.append(responses)
+        return analyze_response_set(responses, target_domain)
+
+    monkeypatch.setattr(batch_service, "analyze_in_pool", fake_analyze_in_pool)
+    monkeypatch.setattr(batch_service, "POOL_MIN_CHARS", 1000)
+    with TestClient(app) as client:
+        assert client.post("/api/analysis/metrics", json={"responses": SETS[0]}).status_code == 200
+        assert pooled == []
+        large = {"groq": "hubspot.com is popular. " * 50}
+        data = client.post("/api/analysis/metrics", json={"responses": large}).json()
+    assert pooled == [large]
+    assert data["global_domains"] == {"hubspot.com": 50}
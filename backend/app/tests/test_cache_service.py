@@ -0,0 +1,49 @@
+from app.services import cache_service
+from app.services.cache_service import ResponseCache, cache_key
+
+
+def test_cache_key_covers_all_parameters():
+    key = cache_key("groq", "prompt", 600, 0.7)
+    assert key == cache_key("groq", "prompt", 600, 0.7)
+    assert key != cache_key("claude", "prompt", 600, 0.7)
+    assert key != cache_key("groq", "prompt", 300, 0.7)
+    assert key != cache_key("groq", "prompt", 600, 0.5)
+
+
+def test_lru_evicts_within_byte_budget():
+    cache = ResponseCache(max_bytes=10)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # a is now most recently used
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 8
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_service.time, "time", lambda: now[0])
+    cache = ResponseCache(ttl=60)
+    cache.set("k", "v")
+    now[0] += 59
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(db_path=path)
+    cache.set("k", "persisted")
+    cache.close()
+
+    reopened = ResponseCache(db_path=path)
+    assert reopened.get("k") == "persisted"
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get("k") == "persisted"  # promoted to memory
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from app.services.coalescing_service import SingleFlight, StreamFlights
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("key", upstream) for _ in range(10)))
+        return flights, results
+
+    flights, results = asyncio.run(run())
+    assert results == ["answer"] * 10
+    assert len(calls) == 1
+    assert flights.stats() == {"leaders": 1, "followers": 9, "abandoned": 0, "in_flight": 0}
+
+
+def test_cancelled_waiter_does_not_cancel_others():
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def run():
+        flights = SingleFlight()
+        first = asyncio.create_task(flights.do("key", upstream))
+        second = asyncio.create_task(flights.do("key", upstream))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "answer"
+
+
+def test_upstream_cancelled_when_last_waiter_leaves():
+    cancelled = []
+
+    async def upstream():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        flights = SingleFlight()
+        waiter = asyncio.create_task(flights.do("key", upstream))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+        return flights
+
+    flights = asyncio.run(run())
+    assert cancelled == [True]
+    assert flights.stats()["abandoned"] == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_errors_propagate_to_every_waiter():
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.do("key", upstream) for _ in range(3)), return_exceptions=True)
+
+    assert [str(r) for r in asyncio.run(run())] == ["boom"] * 3
+
+
+def test_call_after_abandoned_flight_starts_a_new_one():
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.02)  # cleanup (closing the connection) keeps the task alive a bit
+            raise
+        return "answer"
+
+    async def run():
+        flights = SingleFlight()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flights.do("key", upstream), 0.005)
+        # the abandoned task is still winding down; this must start a new flight, not join it
+        return await flights.do("key", upstream)
+
+    assert asyncio.run(run()) == "answer"
+    assert len(calls) == 2
+
+
+def test_streams_share_one_upstream_and_late_joiners_replay():
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        for chunk in ("a", "b", "c"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    async def collect(flights, delay):
+        await asyncio.sleep(delay)
+        return [chunk async for chunk in flights.stream("key", upstream)]
+
+    async def run():
+        flights = StreamFlights()
+        results = await asyncio.gather(collect(flights, 0), collect(flights, 0.015), collect(flights, 0.025))
+        return flights, results
+
+    flights, results = asyncio.run(run())
+    assert results == [["a", "b", "c"]] * 3
+    assert len(calls) == 1
+    assert flights.stats() == {"leaders": 1, "followers": 2, "abandoned": 0, "in_flight": 0}
+
+
+def test_stream_errors_reach_every_subscriber():
+    async def upstream():
+        yield "a"
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def collect(flights, seen):
+        async for chunk in flights.stream("key", upstream):
+            seen.append(chunk)
+
+    async def run():
+        flights, seen = StreamFlights(), []
+        return await asyncio.gather(*(collect(flights, seen) for _ in range(2)), return_exceptions=True), seen
+
+    errors, seen = asyncio.run(run())
+    assert [str(e) for e in errors] == ["boom"] * 2 and seen == ["a", "a"]
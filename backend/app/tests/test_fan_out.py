@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import ai_client
+
+client = TestClient(app)
+
+LATENCY = {"groq": 0.05, "claude": 0.1, "gemini": 0.15, "openrouter": 0.2}
+
+
+async def fake_query_model(prompt, provider, max_tokens=600, **kwargs):
+    if provider == "huggingface":
+        raise RuntimeError("upstream 503")
+    if provider == "stuck":
+        await asyncio.sleep(10)
+    await asyncio.sleep(LATENCY.get(provider, 0))
+    return f"{provider}: {prompt}"
+
+
+def test_fan_out_runs_providers_concurrently(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    started = time.perf_counter()
+    results = asyncio.run(ai_client.fan_out("hi", list(LATENCY)))
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == list(LATENCY)
+    assert all(r["status"] == "ok" for r in results.values())
+    # bounded by the slowest provider, not the 0.5 s sum
+    assert elapsed < 0.4
+
+
+def test_fan_out_returns_partial_results(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    results = asyncio.run(
+        ai_client.fan_out("hi", ["groq", "huggingface", "stuck"], timeout=0.3, deadline=1.0)
+    )
+    assert results["groq"]["response"] == "groq: hi"
+    assert results["huggingface"]["status"] == "error"
+    assert "503" in results["huggingface"]["error"]
+    assert results["stuck"]["status"] == "timeout"
+
+
+def test_fan_out_deadline_cancels_stragglers(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    started = time.perf_counter()
+    results = asyncio.run(ai_client.fan_out("hi", ["groq", "stuck"], timeout=5, deadline=0.2))
+    assert time.perf_counter() - started < 1
+    assert results["groq"]["status"] == "ok"
+    assert results["stuck"]["status"] == "timeout"
+    assert "deadline" in results["stuck"]["error"]
+
+
+def test_query_endpoint_reports_failed_models(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    response = client.post("/api/ai/query", json={"prompt": "hi", "models": ["groq", "huggingface"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["responses"] == {"groq": "groq: hi"}
+    assert list(data["errors"]) == ["huggingface"]
+    assert data["partial"] is True
@@ -0,0 +1,117 @@
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import ai_client
+from app.services.analyzer_service import PresenceIndex, compute_geo_score, model_comparison
+from app.services.job_service import jobs
+from app.services.store_service import analysis_store
+
+client = TestClient(app)
+
+PER_MODEL = {
+    "groq": Counter({"hubspot.com": 5, "zoho.com": 1}),
+    "claude": Counter({"www.zoho.com": 2}),
+    "gemini": Counter(),
+}
+
+
+def test_repeated_mentions_count_once_per_model():
+    index = PresenceIndex(PER_MODEL)
+    glob = Counter({"hubspot.com": 5, "zoho.com": 3})
+    # groq repeats hubspot 5 times: still 1 of 3 models
+    assert compute_geo_score(glob, "hubspot.com", 3, index) == 33.33
+    assert compute_geo_score(glob, "https://www.zoho.com/crm", 3, index) == 66.67
+    # without per-model data the aggregated fallback is at least capped
+    assert compute_geo_score(glob, "hubspot.com", 3) == 100.0
+
+
+def test_presence_index_queries():
+    index = PresenceIndex(PER_MODEL)
+    assert index.total_models == 3
+    assert index.models_mentioning("zoho.com") == ["groq", "claude"]
+    assert index.presence_count("missing.com") == 0
+    assert index.top_domains(1) == [("zoho.com", 2)]
+    assert index.mentions("zoho.com") == {"groq": 1, "claude": 2, "gemini": 0}
+    assert model_comparison(PER_MODEL, "hubspot.com", index) == {"groq": 5, "claude": 0, "gemini": 0}
+
+
+def test_registrable_target_covers_its_subdomains():
+    per_model = {
+        "groq": Counter({"blog.hubspot.com": 2}),
+        "claude": Counter({"hubspot.com": 1, "knowledge.hubspot.com": 1}),
+        "gemini": Counter({"bbc.co.uk": 1, "news.bbc.co.uk": 1, "itv.co.uk": 1}),
+    }
+    index = PresenceIndex(per_model)
+    assert index.mentions("hubspot.com") == {"groq": 2, "claude": 2, "gemini": 0}
+    assert index.models_mentioning("https://www.hubspot.com") == ["groq", "claude"]
+    # a subdomain target only matches that host
+    assert index.mentions("blog.hubspot.com") == {"groq": 2, "claude": 0, "gemini": 0}
+    # co.uk is a public suffix, so other co.uk sites are not bbc.co.uk
+    assert index.mentions("bbc.co.uk") == {"groq": 0, "claude": 0, "gemini": 2}
+    assert index.presence_count("co.uk") == 0
+    assert model_comparison(per_model, "hubspot.com") == index.mentions("hubspot.com")
+    glob = Counter({"blog.hubspot.com": 2, "hubspot.com": 1, "itv.co.uk": 1})
+    assert compute_geo_score(glob, "hubspot.com", 4) == 75.0
+
+
+def test_score_endpoint_with_per_model_counts():
+    body = {
+        "global_counts": {"hubspot.com": 5, "zoho.com": 3},
+        "target_domain": "hubspot.com",
+        "total_models": 3,
+        "per_model_counts": {m: dict(c) for m, c in PER_MODEL.items()},
+    }
+    data = client.post("/api/geo/score", json=body).json()
+    assert data["geo_score"] == 33.33
+    assert data["per_model_mentions"] == {"groq": 5, "claude": 0, "gemini": 0}
+    assert data["models_mentioning"] == ["groq"]
+
+    del body["per_model_counts"]
+    assert client.post("/api/geo/score", json=body).json() == {"geo_score": 100.0}
+
+
+def test_score_targets_ranks_and_dedupes():
+    rows = PresenceIndex(PER_MODEL).score_targets(["hubspot.com", "https://www.zoho.com", "zoho.com", "absent.io"])
+    assert [(r["domain"], r["geo_score"], r["rank"]) for r in rows] == [
+        ("zoho.com", 66.67, 1), ("hubspot.com", 33.33, 2), ("absent.io", 0.0, 3)
+    ]
+    assert rows[1]["per_model_mentions"] == {"groq": 5, "claude": 0, "gemini": 0}
+
+
+def test_bulk_endpoint_scores_against_an_analysis(monkeypatch):
+    async def fake_query_model(prompt, provider, *args, **kwargs):
+        if provider == "huggingface":
+            raise RuntimeError("upstream 503")
+        if provider == "gemini":
+            return "No links in this one."
+        return f"{provider} recommends hubspot.com" + (" and zoho.com" if provider == "groq" else "")
+
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    models = ["groq", "claude", "gemini", "huggingface"]
+    analysis = client.post("/api/multi-llm-analysis", json={"prompt": "crm", "models": models}).json()
+    data = client.post("/api/geo/score/bulk", json={
+        "analysis_id": analysis["analysis_id"], "targets": ["zoho.com", "www.hubspot.com", "pipedrive.com"],
+    }).json()
+    assert data["total_models"] == 4
+    assert [(r["domain"], r["geo_score"], r["rank"]) for r in data["results"]] == [
+        ("hubspot.com", 50.0, 1), ("zoho.com", 25.0, 2), ("pipedrive.com", 0.0, 3)
+    ]
+    # models that mentioned nothing, or failed, are listed with 0
+    assert data["results"][0]["per_model_mentions"] == {"groq": 1, "claude": 1, "gemini": 0, "huggingface": 0}
+
+    # once the in-memory job has expired, the same scores come from the store
+    analysis_store.flush()
+    del jobs._jobs[analysis["analysis_id"]]
+    stored = client.post("/api/geo/score/bulk", json={
+        "analysis_id": analysis["analysis_id"], "targets": ["zoho.com", "www.hubspot.com", "pipedrive.com"],
+    }).json()
+    assert stored["results"] == data["results"] and stored["total_models"] == 4
+
+    by_counts = client.post("/api/geo/score/bulk", json={
+        "per_model_counts": {m: dict(c) for m, c in PER_MODEL.items()}, "targets": ["zoho.com"],
+    }).json()
+    assert by_counts["results"][0]["models_mentioning"] == 2
+    assert client.post("/api/geo/score/bulk", json={"analysis_id": "analysis_missing", "targets": []}).status_code == 404
+    assert client.post("/api/geo/score/bulk", json={"targets": ["zoho.com"]}).status_code == 422
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import ai_client, job_service
+from app.services.job_service import JobManager
+
+
+async def fake_query_model(prompt, provider, max_tokens=600, temperature=0.7, use_cache=True):
+    if provider == "huggingface":
+        raise RuntimeError("upstream 503")
+    await asyncio.sleep(0.05)
+    return f"{provider} recommends hubspot.com"
+
+
+def test_background_job_lifecycle(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    with TestClient(app) as client:
+        first = client.post("/api/multi-llm-analysis", json={"prompt": "crm", "models": ["groq", "claude"], "background": True}).json()
+        second = client.post("/api/multi-llm-analysis", json={"prompt": "crm", "models": ["groq", "claude"], "background": True}).json()
+        assert first["analysis_id"] != second["analysis_id"]
+        assert first["status"] == "queued"
+
+        for _ in range(100):
+            progress = client.get(f"/api/analysis-progress/{first['analysis_id']}").json()
+            if progress["status"] not in ("queued", "running"):
+                break
+            time.sleep(0.02)
+
+    assert progress["status"] == "completed"
+    assert progress["progress"]["models"] == {"groq": "ok", "claude": "ok"}
+    assert progress["progress"]["percent"] == 100.0
+    assert progress["results"]["domains"] == {"hubspot.com": 2}
+
+
+def test_sync_analysis_is_recorded_and_partial(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    client = TestClient(app)
+    data = client.post("/api/multi-llm-analysis", json={"prompt": "crm", "models": ["groq", "huggingface"]}).json()
+    assert data["status"] == "partial"
+    assert data["failed_models"] == ["huggingface"]
+    progress = client.post(f"/api/analysis-progress/{data['analysis_id']}").json()
+    assert progress["progress"]["models"] == {"groq": "ok", "huggingface": "error"}
+    assert client.get("/api/analysis-progress/analysis_missing").status_code == 404
+
+
+def test_worker_pool_bounds_concurrency(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+
+    async def run():
+        manager = JobManager(workers=1)
+        first = await manager.submit("a", ["groq"])
+        second = await manager.submit("b", ["groq"])
+        await asyncio.sleep(0.02)
+        statuses = (first.status, second.status)
+        await asyncio.wait_for(second.done.wait(), 2)
+        await manager.stop()
+        return statuses, first.status, second.status
+
+    statuses, first, second = asyncio.run(run())
+    assert statuses == ("running", "queued")
+    assert (first, second) == ("completed", "completed")
+
+
+def test_finished_jobs_expire(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+
+    async def run():
+        manager = JobManager(ttl=60)
+        job = await manager.run(manager.create("a", ["groq"]))
+        assert manager.get(job.id) is job
+        monkeypatch.setattr(job_service.time, "time", lambda: job.finished_at + 61)
+        return manager.get(job.id)
+
+    assert asyncio.run(run()) is None
+
+
+def test_expiry_keeps_at_most_max_finished(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+
+    async def run():
+        manager = JobManager(max_finished=2)
+        finished = [await manager.run(manager.create(p, ["groq"])) for p in "abc"]
+        pending = manager.create("d", ["groq"])
+        return manager, finished, pending
+
+    manager, (a, b, c), pending = asyncio.run(run())
+    assert manager.get(a.id) is None
+    assert [manager.get(job.id) for job in (b, c, pending)] == [b, c, pending]
+    assert list(manager._finished) == [b.id, c.id]
@@ -0,0 +1,130 @@
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from app.core.utils import normalize_domain
+from app.services import parser_service
+from app.services.parser_service import (
+    CITATION_PATTERNS,
+    DOMAIN_PATTERN,
+    STOP_WORDS,
+    extract_citations,
+    parse_domains,
+    parse_responses,
+    parse_topics,
+    scan_response,
+    StreamScanner,
+)
+
+# Reference implementations: the per-pattern passes the parser used to run
+def reference_parse_domains(responses):
+    per_model = {m: Counter(normalize_domain(d) for d in re.findall(DOMAIN_PATTERN, t or "") if d) for m, t in responses.items()}
+    flat = [d for m, t in responses.items() for d in (normalize_domain(x) for x in re.findall(DOMAIN_PATTERN, t or "") if x)]
+    return Counter(flat), per_model
+
+
+def reference_parse_topics(responses, top_n=20):
+    words = [w for t in responses.values() for w in re.findall(r'\b\w{4,}\b', (t or "").lower()) if w not in STOP_WORDS]
+    return Counter(words).most_common(top_n)
+
+
+def reference_extract_citations(responses):
+    return {
+        m: sum(len(re.findall(p, t or "", flags=re.IGNORECASE)) for p in CITATION_PATTERNS)
+        for m, t in responses.items()
+    }
+
+
+FRAGMENTS = [
+    "Visit https://www.Example.com for details", "see docs.python.org/3/", "HubSpot.com", "zoho.COM,",
+    "According to", "a study by", "Research shows", "source:", "Reference: [12]", "(2024)", "cited in",
+    "report by", "published in", "research showsource:", "foo_-x.com", "abcd_x.com", "www.awww.io",
+    "the", "and", "analysis", "marketing", "software", "CRM", "tools", "http://a-b.co.uk", "[3][4]",
+    "\n", "-", ".", ",", "ok", "salesforce", "naïve café.fr", "İstanbul.com", "ﬁle.org",
+    # the pattern's www. and http(s):// prefixes are case-sensitive
+    "Visit WWW.abc.io today", "Www.Mixed.Com", "HTTPS://Shout.io", "HTTP://WWW.LOUD.COM/x",
+]
+
+
+# without non-ASCII fragments a response takes scan_response's lowercased fast path
+ASCII_FRAGMENTS = [f for f in FRAGMENTS if f.isascii()]
+
+
+def random_responses(seed, models=4, words=300, fragments=FRAGMENTS):
+    rng = random.Random(seed)
+    return {
+        f"model{i}": "".join(rng.choice(fragments) + rng.choice([" ", "", "  ", "\t"]) for _ in range(words))
+        for i in range(models)
+    }
+
+
+@pytest.mark.parametrize("fragments", [FRAGMENTS, ASCII_FRAGMENTS], ids=["unicode", "ascii"])
+def test_single_pass_matches_separate_passes(fragments):
+    for seed in range(50):
+        responses = random_responses(seed, fragments=fragments)
+        global_domains, per_model, topics, citations = parse_responses(responses)
+        ref_global, ref_per_model = reference_parse_domains(responses)
+        assert list(global_domains.items()) == list(ref_global.items())
+        assert per_model == ref_per_model
+        assert topics == reference_parse_topics(responses)
+        assert citations == reference_extract_citations(responses)
+
+
+def test_public_functions_unchanged():
+    for seed in range(20):
+        responses = random_responses(seed)
+        assert parse_domains(responses) == reference_parse_domains(responses)
+        assert parse_topics(responses, top_n=50) == reference_parse_topics(responses, top_n=50)
+        assert extract_citations(responses) == reference_extract_citations(responses)
+
+
+def test_overlapping_citations_are_each_counted():
+    assert extract_citations({"m": "Research showsource: x"}) == {"m": 2}
+    assert parser_service.scan_response("See example.com, according to a study by MIT [1].") == (
+        ["example.com"],
+        ["example", "according", "study"],
+        3,
+    )
+
+
+def test_uppercase_www_matches_parse_domains():
+    text = "Visit WWW.abc.io today"
+    assert scan_response(text)[0] == ["www.abc"]
+    assert parse_domains({"m": text})[0] == Counter({"www.abc": 1})
+
+
+def test_empty_and_missing_text():
+    assert parse_responses({"m": None, "n": ""}) == (Counter(), {"m": Counter(), "n": Counter()}, [], {"m": 0, "n": 0})
+
+
+@pytest.mark.parametrize("scan_chars", [0, 256])
+def test_stream_scanner_matches_full_scan_for_any_chunking(monkeypatch, scan_chars):
+    monkeypatch.setattr(parser_service, "STREAM_SCAN_CHARS", scan_chars)
+    rng = random.Random(7)
+    for seed in range(30):
+        text = random_responses(seed, models=1)["model0"]
+        scanner = StreamScanner()
+        pos = 0
+        while pos < len(text):
+            step = rng.randint(1, 9)
+            scanner.feed(text[pos:pos + step])
+            pos += step
+        domains, tokens, citations = scanner.finish()
+        ref_domains, ref_tokens, ref_citations = scan_response(text)
+        assert list(domains.items()) == list(Counter(ref_domains).items())
+        assert list(tokens.items()) == list(Counter(ref_tokens).items())
+        assert citations == ref_citations
+        assert scanner.chars == len(text)
+
+
+def test_stream_scanner_buffers_only_the_partial_word(monkeypatch):
+    monkeypatch.setattr(parser_service, "STREAM_SCAN_CHARS", 0)  # scan at every whitespace
+    scanner = StreamScanner()
+    assert scanner.feed("see hub") == []
+    assert scanner.feed("spot.com and acc") == ["hubspot.com"]
+    scanner.feed("ording")
+    scanner.feed(" to x")
+    assert scanner.citations == 1
+    assert len(scanner._pending) == 1 and len(scanner._tail) <= 13
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import ai_client, parser_service, pipeline_service
+
+ANSWERS = {
+    "groq": (0.01, "Groq: hubspot.com and zoho.com, according to gartner.com [1]."),
+    "claude": (0.1, "Claude: hubspot.com is cited in most reports (2024)."),
+    "gemini": (0.05, "Gemini: salesforce.com"),
+}
+
+
+async def fake_query_model(prompt, provider, max_tokens=600, temperature=0.7, use_cache=True):
+    if prompt.lstrip().startswith("You are an expert analyst"):
+        return "summary text"
+    delay, text = ANSWERS[provider]
+    await asyncio.sleep(delay)
+    return text
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_emits_models_in_arrival_order(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    client = TestClient(app)
+    response = client.post(
+        "/api/multi-llm-analysis/stream",
+        json={"prompt": "best crm", "models": ["claude", "gemini", "groq"], "target_domain": "hubspot.com"},
+    )
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+
+    assert [p["model"] for e, p in events if e == "model"] == ["groq", "gemini", "claude"]
+    updates = [p for e, p in events if e == "domains"]
+    assert updates[0]["global_domains"] == {"hubspot.com": 1, "zoho.com": 1, "gartner.com": 1}
+    assert updates[-1]["global_domains"]["hubspot.com"] == 2
+    assert [e for e, _ in events[-2:]] == ["summary", "done"]
+
+    done = events[-1][1]
+    assert done["totalCitations"] == 4
+    assert done["per_model_mentions"] == {"groq": 1, "gemini": 0, "claude": 1}
+
+
+def test_blocking_endpoint_returns_same_results(monkeypatch):
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    client = TestClient(app)
+    data = client.post("/api/multi-llm-analysis", json={"prompt": "best crm", "models": ["groq", "claude"]}).json()
+    assert data["status"] == "completed"
+    results = data["results"]
+    assert results["domains"] == {"hubspot.com": 2, "zoho.com": 1, "gartner.com": 1}
+    assert results["summary"] == "summary text"
+    assert set(results["modelResults"]) == {"groq", "claude"}
+
+
+def test_streamed_chunks_are_parsed_while_they_arrive(monkeypatch):
+    chunks = {}
+
+    async def fake_stream(prompt, provider, max_tokens=600, temperature=0.7, use_cache=True):
+        text = ANSWERS[provider][1]
+        chunks[provider] = [text[i:i + 5] for i in range(0, len(text), 5)]
+        for chunk in chunks[provider]:
+            await asyncio.sleep(0)
+            yield chunk
+
+    seen_live = []
+    add_chunk = pipeline_service.AnalysisState.add_chunk
+
+    def spy(self, model, chunk):
+        add_chunk(self, model, chunk)
+        seen_live.append(sum(self.streams[model].domains.values()))
+
+    monkeypatch.setattr(parser_service, "STREAM_SCAN_CHARS", 0)  # these answers are shorter than one batch
+    monkeypatch.setattr(ai_client, "query_model_stream", fake_stream)
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    monkeypatch.setattr(pipeline_service.AnalysisState, "add_chunk", spy)
+    state = asyncio.run(pipeline_service.run_analysis("best crm", ["groq", "claude"], "hubspot.com"))
+
+    assert len(seen_live) == len(chunks["groq"]) + len(chunks["claude"])
+    assert max(seen_live) >= 2  # counts moved before the answers were complete
+    assert state.streams == {}
+    assert state.global_domains == {"hubspot.com": 2, "zoho.com": 1, "gartner.com": 1}
+    assert state.citations == {"groq": 2, "claude": 2}
@@ -0,0 +1,83 @@
+import random
+import sys
+import threading
+import time
+import types
+
+from app.services import prompt_service
+from app.services.prompt_service import (
+    assemble_responses, count_tokens, fair_shares, split_sentences, truncate_to_tokens
+)
+
+
+def test_fair_shares_redistribute_unused_budget():
+    assert fair_shares({"a": 50, "b": 400, "c": 400}, 300) == {"a": 50, "b": 125, "c": 125}
+    assert fair_shares({"a": 10, "b": 20}, 300) == {"a": 10, "b": 20}
+    assert fair_shares({"a": 0, "b": 90}, 60) == {"a": 0, "b": 60}
+
+
+def test_sentences_and_truncation():
+    assert split_sentences("First one. Second?! Third\nFourth") == ["First one.", "Second?!", "Third", "Fourth"]
+    cut = truncate_to_tokens("alpha beta gamma delta epsilon " * 20, 12)
+    assert cut.endswith("…") and count_tokens(cut) <= 12
+    assert truncate_to_tokens("short", 12) == "short"
+
+
+def test_assembly_dedupes_and_respects_budget():
+    shared = "HubSpot is the most widely recommended CRM for small teams in 2024."
+    responses = {
+        "groq": f"{shared} Pipedrive is simpler for pure sales pipelines. " + "Zoho is cheapest. " * 3,
+        "claude": f"{shared.replace('widely', 'commonly')} Salesforce dominates the enterprise segment.",
+        "gemini": "⚠️ timeout",
+        "huggingface": " ".join(f"Vendor number {i} ships {i * 7} native integrations." for i in range(200)),
+    }
+    text, stats = assemble_responses(responses, budget=150)
+    assert stats["tokens_out"] <= 150 < stats["tokens_in"]
+    assert stats["duplicates_dropped"] >= 3  # claude's near-copy and the repeated Zoho lines
+    assert text.count("most") == 1
+    assert "Salesforce dominates the enterprise segment." in text
+    assert "gemini" not in text
+    # every block ends on a sentence boundary
+    for block in text.split("\n\n"):
+        assert block.endswith(".")
+    # the long response only gets what the short ones leave over
+    assert stats["per_model"]["huggingface"] <= 150 - stats["per_model"]["groq"] - stats["per_model"]["claude"]
+
+
+def test_assembly_reads_only_the_start_of_long_repetitive_responses():
+    # low-entropy text: distinct sentences that share most of their shingles
+    rng = random.Random(7)
+    words = "hubspot zoho crm sales team pipeline deal lead".split()
+    responses = {
+        f"model{i}": "".join(" ".join(rng.choice(words) for _ in range(10)) + ". " for _ in range(2000))
+        for i in range(5)
+    }  # ~120 KB per model
+    started = time.perf_counter()
+    text, stats = assemble_responses(responses, budget=1000)
+    assert time.perf_counter() - started < 0.5
+    assert stats["tokens_out"] <= 1000
+    assert stats["tokens_in"] > 5 * 20000  # text left unread is still estimated
+
+
+def test_tokenizer_loads_in_background_while_counts_use_the_regex(monkeypatch):
+    release = threading.Event()
+
+    class Encoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+    def get_encoding(name):
+        release.wait(5)  # a slow download of the BPE ranks
+        return Encoding()
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=get_encoding))
+    for name, value in {"_encoding": None, "TOKENIZER": None, "_loader": None}.items():
+        monkeypatch.setattr(prompt_service, name, value)
+
+    prompt_service.load_tokenizer_in_background()
+    assert count_tokens("hello, world") == 5  # regex estimate ("hell", "o", ",", "worl", "d"), no waiting
+    assert prompt_service.tokenizer_name() == "regex"
+    release.set()
+    prompt_service._loader.join(5)
+    assert count_tokens("hello, world") == 2
+    assert prompt_service.tokenizer_name() == "tiktoken/cl100k_base"
@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+
+from app.services import ai_client
+from app.services.ratelimit_service import (
+    PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, AIMDController, ProviderLimiter, TokenBucket
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_and_carries_debt():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)  # 1 unit per second
+    bucket.take(60)
+    assert bucket.wait_time(1) == 1.0
+    clock.now = 30
+    assert bucket.wait_time(30) == 0.0
+    bucket.take(30)
+    bucket.adjust(-10)  # the call used 10 more than reserved
+    assert bucket.wait_time(1) == 11.0
+    assert bucket.wait_time(1000) == 70.0  # capped at capacity
+
+
+def test_aimd_halves_on_overload_and_grows_back_additively():
+    clock = FakeClock()
+    aimd = AIMDController(maximum=8, clock=clock)
+    aimd.on_overload()
+    aimd.on_overload()  # same burst: ignored within the cooldown
+    assert aimd.allowed == 4 and aimd.decreases == 1
+    for _ in range(5):
+        aimd.on_success(0.1)
+    assert aimd.allowed == 5
+
+
+def test_queued_calls_run_by_priority_then_arrival():
+    limiter = ProviderLimiter("groq", max_concurrency=1)
+    order = []
+
+    async def call(name, priority):
+        async with limiter.acquire(priority=priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        first = asyncio.create_task(call("first", PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        await asyncio.gather(
+            first,
+            call("background", PRIORITY_BACKGROUND),
+            call("interactive-1", PRIORITY_INTERACTIVE),
+            call("interactive-2", PRIORITY_INTERACTIVE),
+        )
+
+    asyncio.run(run())
+    assert order == ["first", "interactive-1", "interactive-2", "background"]
+    assert limiter.stats()["queued"] == 3 and limiter.stats()["in_flight"] == 0
+
+
+def test_request_budget_delays_instead_of_failing():
+    limiter = ProviderLimiter("gemini", rpm=600)  # 10 per second, burst of 600
+
+    async def run():
+        limiter.requests.level = 1
+        started = asyncio.get_running_loop().time()
+        for _ in range(3):
+            async with limiter.acquire():
+                pass
+        return asyncio.get_running_loop().time() - started
+
+    assert 0.15 <= asyncio.run(run()) < 1.0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = ProviderLimiter("claude", max_concurrency=1)
+
+    async def run():
+        async with limiter.acquire():
+            waiter = asyncio.create_task(limiter.acquire().__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["waiting"] == 0 and stats["in_flight"] == 0
+
+
+def test_429_requeues_the_call_until_retry_after(monkeypatch):
+    calls = []
+
+    def provider(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"retry-after": "0.2"}, text="slow down")
+        return httpx.Response(200, json={"choices": [{"message": {"content": "groq says hi"}}]})
+
+    registry = ai_client.ProviderRegistry(transport=httpx.MockTransport(provider))
+    monkeypatch.setattr(ai_client, "registry", registry)
+    monkeypatch.setitem(ai_client.API_KEYS, "groq", "test-key")
+
+    async def run():
+        started = asyncio.get_running_loop().time()
+        text = await ai_client.query_model("hi", "groq", use_cache=False)
+        return text, asyncio.get_running_loop().time() - started
+
+    text, elapsed = asyncio.run(run())
+    assert text == "groq says hi" and len(calls) == 2 and elapsed >= 0.2
+    stats = ai_client.limits.stats()["groq"]
+    assert stats["throttled"] == 1 and stats["admitted"] == 2
+    assert stats["concurrency_limit"] < stats["max_concurrency"]
@@ -0,0 +1,40 @@
+import json
+from collections import Counter
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.core.responses import FastJSONResponse, dumps
+from app.main import app
+from app.models.response_models import GeoScoreResult
+
+client = TestClient(app)
+
+
+def test_dumps_handles_pipeline_types_and_models():
+    payload = {"domains": Counter({"zoho.com": 2}), "rankings": [("groq", 50.0)], "score": np.float64(1.5),
+               1: "int key", "tags": {"a"}}
+    assert json.loads(dumps(payload)) == {
+        "domains": {"zoho.com": 2}, "rankings": [["groq", 50.0]], "score": 1.5, "1": "int key", "tags": ["a"],
+    }
+    model = GeoScoreResult.model_construct(target_domain="zoho.com", geo_score=50.0, per_model_mentions={"groq": 1})
+    assert json.loads(FastJSONResponse(model).body) == {
+        "target_domain": "zoho.com", "geo_score": 50.0, "per_model_mentions": {"groq": 1}, "models_mentioning": [],
+    }
+
+
+def test_large_bodies_are_compressed_and_event_streams_are_not():
+    text = " ".join(f"see crm{i}.com" for i in range(200))
+    response = client.post("/api/analysis/metrics", json={"responses": {"groq": text, "claude": text}},
+                           headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["metrics"]["groq"]["unique_domains"] == 200
+
+    small = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    plain = client.post("/api/analysis/metrics", json={"responses": {"groq": text}}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    stream = client.post("/api/multi-llm-analysis/stream", json={"prompt": "crm " * 500, "models": ["groq"]},
+                         headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stream.headers and "event: done" in stream.text
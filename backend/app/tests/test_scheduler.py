@@ -0,0 +1,124 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.scheduler_service import Schedule, ScheduleError, Scheduler, Sweep
+from app.services.store_service import AnalysisStore
+
+client = TestClient(app)
+
+
+def utc(text):
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+
+
+def test_cron_and_interval_schedules():
+    assert Schedule("*/15 * * * *").next_after(utc("2026-10-18T10:07:30")) == utc("2026-10-18T10:15:00")
+    assert Schedule("30 9 * * 1-5").next_after(utc("2026-10-16T10:00:00")) == utc("2026-10-19T09:30:00")  # Fri -> Mon
+    assert Schedule("@monthly").next_after(utc("2026-12-15T00:00:00")) == utc("2027-01-01T00:00:00")
+    assert Schedule("0 0 29 2 *").next_after(utc("2026-03-01T00:00:00")) == utc("2028-02-29T00:00:00")
+    every = Schedule("@every 1h30m")
+    assert every.period == 5400 and every.next_after(utc("2026-10-18T10:00:00")) == utc("2026-10-18T10:30:00")
+    assert Schedule("0 9 * * 1").period == 7 * 86400
+
+
+@pytest.mark.parametrize("expression", ["* * *", "61 * * * *", "a * * * *", "@every 10s", "0 0 30 2 *"])
+def test_invalid_schedules_are_rejected(expression):
+    with pytest.raises(ScheduleError):
+        Schedule(expression)
+
+
+def test_sweeps_sharing_a_schedule_start_apart():
+    sweeps = [Sweep("s", ["best crm"], ["groq"], ["zoho.com"], "@every 1h", id=f"sweep_{i}") for i in range(3)]
+    offsets = [s.offset for s in sweeps]
+    assert len(set(offsets)) == 3 and all(0 <= o < 300 for o in offsets)  # 10% of 1h, capped at 300 s
+    for sweep in sweeps:
+        sweep.plan(utc("2026-10-18T10:00:00"))
+        assert (sweep.next_run - sweep.offset) % 3600 == 0
+
+
+def test_run_writes_one_point_per_domain_and_model():
+    store = AnalysisStore(":memory:")
+    scheduler = Scheduler(workers=2, store=store)
+    # without API keys every model answers "Simulated response from <model> for: <prompt>"
+    sweep = Sweep("crm", ["is hubspot.com any good", "alternatives to zoho"], ["groq", "claude"],
+                  ["https://www.HubSpot.com", "zoho.com"], "@daily")
+
+    async def run():
+        await scheduler.add(sweep)
+        await scheduler.start()
+        assert await scheduler.trigger(sweep.id)
+        assert not await scheduler.trigger(sweep.id)  # previous run still going
+        await scheduler.wait_idle()
+        await scheduler.stop()
+
+    asyncio.run(run())
+    [point] = store.sweep_series(sweep.id, "hubspot.com")
+    assert (point["answers"], point["mentioned"], point["visibility"]) == (4, 2, 50.0)
+    assert store.sweep_series(sweep.id, "hubspot.com", model="groq")[0]["mentioned"] == 1
+    assert store.sweep_series(sweep.id, "zoho.com")[0]["mentioned"] == 0
+    assert (sweep.runs, sweep.last_status, sweep.running) == (1, "completed", False)
+    assert scheduler.stats()["skipped"] == 1
+
+    restarted = Scheduler(store=store)
+    asyncio.run(restarted.start())
+    assert restarted.get(sweep.id).definition() == sweep.definition()
+
+
+def test_due_sweeps_start_on_their_own():
+    scheduler = Scheduler(workers=1, store=AnalysisStore(":memory:"))
+    sweep = Sweep("soon", ["best crm"], ["groq"], ["zoho.com"], "@daily")
+
+    async def run():
+        await scheduler.start()
+        await scheduler.add(sweep)
+        sweep.next_run = time.time() + 0.05
+        scheduler._notify()
+        for _ in range(100):
+            if sweep.runs:
+                break
+            await asyncio.sleep(0.02)
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert sweep.runs == 1 and sweep.next_run > time.time() + 3600
+
+
+def test_sweep_endpoints():
+    assert client.post("/api/geo/sweeps", json={
+        "name": "bad", "prompts": ["x"], "models": ["groq"], "target_domains": ["a.com"], "schedule": "every day",
+    }).status_code == 400
+
+    created = client.post("/api/geo/sweeps", json={
+        "name": "crm", "prompts": ["best crm"], "models": ["groq", "claude"], "target_domains": ["zoho.com"],
+        "schedule": "0 */6 * * *",
+    }).json()
+    sweep_id = created["id"]
+    assert created["next_run"] > time.time() and created["runs"] == 0
+    assert sweep_id in [s["id"] for s in client.get("/api/geo/sweeps").json()["sweeps"]]
+    trend = client.get(f"/api/geo/sweeps/{sweep_id}/trend", params={"domain": "ZOHO.com"}).json()
+    assert trend["domain"] == "zoho.com" and trend["points"] == []
+
+    assert client.delete(f"/api/geo/sweeps/{sweep_id}").json()["deleted"] is True
+    assert client.get(f"/api/geo/sweeps/{sweep_id}").status_code == 404
+
+
+def test_invalid_stored_sweep_does_not_stop_startup():
+    store = AnalysisStore(":memory:")
+    good = Sweep("good", ["best crm"], ["groq"], ["zoho.com"], "@daily")
+    store.save_sweep(good.id, good.definition(), good.created_at)
+    store.save_sweep("sweep_bad", {**good.definition(), "id": "sweep_bad", "schedule": "@every 10s"}, good.created_at)
+    store.save_sweep("sweep_old", {"id": "sweep_old", "name": "old"}, good.created_at)
+    scheduler = Scheduler(store=store)
+
+    async def run():
+        await scheduler.start()
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert [s.id for s in scheduler.list()] == [good.id]
+    assert scheduler.stats()["invalid_sweeps"] == 2
@@ -0,0 +1,42 @@
+import random
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.analyzer_service import calculate_visibility_metrics, rank_models
+from app.services.scoring_service import MetricColumns, score_columns
+
+client = TestClient(app)
+
+
+def make_run(rng, models):
+    responses, per_model = {}, {}
+    for model in models:
+        responses[model] = "x" * rng.choice([0, 1, 333, 999, 1000, 1001, rng.randint(0, 3000)])
+        per_model[model] = Counter({f"d{i}.com": rng.randint(1, 4) for i in range(rng.randint(0, 8))})
+    return responses, per_model
+
+
+def test_columnar_scores_match_scalar_heuristics():
+    rng = random.Random(3)
+    runs = [make_run(rng, [f"m{j}" for j in range(rng.randint(0, 12))]) for _ in range(300)]
+    # ties must keep insertion order, as rank_models' stable sort does
+    runs.append(({"a": "", "b": "", "c": "y" * 5000}, {}))
+
+    scored = score_columns(MetricColumns.from_responses(runs))
+    assert len(scored) == len(runs)
+    for (responses, per_model), (metrics, rankings) in zip(runs, scored):
+        expected = calculate_visibility_metrics(responses, per_model)
+        assert metrics == expected
+        assert rankings == rank_models(expected)
+    assert scored[-1][1] == [("c", 40.0), ("a", 0.0), ("b", 0.0)]
+
+
+def test_rescore_endpoint_round_trips_stored_metrics():
+    responses, per_model = make_run(random.Random(9), ["groq", "claude", "gemini"])
+    stored = calculate_visibility_metrics(responses, per_model)
+    data = client.post("/api/analysis/rescore", json={"runs": [stored, {}]}).json()
+    assert data["runs"][0]["metrics"] == stored
+    assert data["runs"][0]["rankings"] == [list(r) for r in rank_models(stored)]
+    assert data["runs"][1] == {"metrics": {}, "rankings": []}
@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+
+from app.services import ai_client, semantic_cache_service
+from app.services.cache_service import ResponseCache
+from app.services.semantic_cache_service import SemanticCache, cosine, embed, prompt_terms
+
+
+def test_paraphrases_embed_close_and_other_subjects_do_not():
+    assert prompt_terms("What are the top CRM platforms for small businesses?") == ["best", "crm", "tool", "small", "company"]
+    assert cosine(embed("best CRM tools"), embed("top CRM software")) > 0.99
+    assert cosine(embed("What are the best CRM tools for small businesses?"),
+                  embed("Which CRM software is best for small business?")) > 0.9
+    assert cosine(embed("best CRM tools for startups"), embed("best CRM tools for enterprises")) < 0.8
+    assert cosine(embed("best project management tools"), embed("best CRM tools")) < 0.6
+
+
+def test_hits_paraphrases_within_the_same_call_settings():
+    cache = SemanticCache()
+    cache.set("groq", "best CRM tools for small businesses", 600, 0.7, "HubSpot, Pipedrive", elapsed=2.5)
+
+    assert cache.get("groq", "Top CRM software for small business?", 600, 0.7) == "HubSpot, Pipedrive"
+    assert cache.get("claude", "Top CRM software for small business?", 600, 0.7) is None  # other provider
+    assert cache.get("groq", "Top CRM software for small business?", 300, 0.7) is None  # other settings
+    assert cache.get("groq", "best CRM tools for enterprises", 600, 0.7) is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    assert stats["saved_seconds"] == 2.5 and stats["avg_hit_similarity"] > 0.9
+
+
+def test_numbers_must_match_and_thresholds_are_per_provider():
+    cache = SemanticCache(thresholds={"claude": 1.01})
+    for provider in ("groq", "claude"):
+        cache.set(provider, "best CRM tools 2024", 600, 0.7, "answer for 2024")
+    assert cache.get("groq", "best CRM tools 2025", 600, 0.7) is None
+    assert cache.get("groq", "top CRM software 2024", 600, 0.7) == "answer for 2024"
+    assert cache.get("claude", "top CRM software 2024", 600, 0.7) is None
+
+
+def test_reversed_comparisons_do_not_hit():
+    cache = SemanticCache()
+    cache.set("groq", "Is hubspot better than salesforce", 600, 0.7, "HubSpot wins")
+    assert cosine(embed("Is hubspot better than salesforce"), embed("Is salesforce better than hubspot")) > 0.9
+    assert cache.get("groq", "Is salesforce better than hubspot", 600, 0.7) is None
+    assert cache.get("groq", "is HubSpot better than Salesforce?", 600, 0.7) == "HubSpot wins"
+    # generic words may move: "CRM tools, best ones" still answers "best CRM tools"
+    cache.set("groq", "best CRM tools for small teams", 600, 0.7, "HubSpot, Pipedrive")
+    assert cache.get("groq", "CRM tools for small teams, the best ones", 600, 0.7) == "HubSpot, Pipedrive"
+
+
+def test_stale_and_least_recently_used_entries_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache_service.time, "time", lambda: now[0])
+    cache = SemanticCache(max_entries=2, ttl=60)
+    cache.set("groq", "best crm", 600, 0.7, "crm")
+    cache.set("groq", "best vpn", 600, 0.7, "vpn")
+    assert cache.get("groq", "top crm", 600, 0.7) == "crm"
+    cache.set("groq", "best laptop", 600, 0.7, "laptop")  # evicts vpn, the least recently used
+    assert cache.get("groq", "top vpn", 600, 0.7) is None
+    now[0] += 61
+    assert cache.get("groq", "top crm", 600, 0.7) is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["expirations"] == 1 and cache.stats()["entries"] == 1
+
+
+def test_query_model_answers_paraphrases_from_the_semantic_cache(monkeypatch):
+    calls = []
+
+    def provider(request):
+        calls.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "HubSpot leads"}}]})
+
+    monkeypatch.setattr(ai_client, "registry", ai_client.ProviderRegistry(transport=httpx.MockTransport(provider)))
+    monkeypatch.setitem(ai_client.API_KEYS, "groq", "test-key")
+    monkeypatch.setattr(ai_client, "response_cache", ResponseCache())
+    monkeypatch.setattr(ai_client, "semantic_cache", SemanticCache())
+    monkeypatch.setattr(ai_client, "SEMANTIC_CACHE_ENABLED", True)
+
+    async def run():
+        return [await ai_client.query_model(p, "groq") for p in ("best CRM tools", "Top CRM software?", "best VPN")]
+
+    assert asyncio.run(run()) == ["HubSpot leads"] * 3
+    assert len(calls) == 2
+    assert ai_client.semantic_cache.stats()["hits"] == 1
@@ -0,0 +1,131 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import ai_client, store_service
+from app.services.job_service import jobs
+from app.services.pipeline_service import AnalysisState
+from app.services.store_service import AnalysisStore, analysis_store
+
+
+def make_state(prompt, target, answers):
+    state = AnalysisState(prompt, list(answers), target)
+    for model, text in answers.items():
+        state.add_provider_result({"provider": model, "status": "ok", "response": text, "error": None, "response_time": 120})
+    return state
+
+
+def test_batched_writes_and_paginated_queries(tmp_path):
+    store = AnalysisStore(str(tmp_path / "analyses.sqlite3"), batch_size=16, flush_interval=0.2)
+    for i in range(10):
+        answers = {"groq": "try hubspot.com and zoho.com", "claude": "zoho.com" if i % 2 else "none"}
+        store.save(f"analysis_{i:02d}", make_state(f"crm {i}", "https://www.zoho.com", answers), "completed",
+                   created_at=1000.0 + i, finished_at=1000.5 + i)
+    store.flush()
+    stats = store.stats()
+    assert stats["written"] == 10 and stats["pending"] == 0
+    assert stats["batches"] < 10  # grouped into shared transactions
+
+    first = store.list_analyses(limit=4)
+    assert [row["id"] for row in first["items"]] == ["analysis_09", "analysis_08", "analysis_07", "analysis_06"]
+    second = store.list_analyses(limit=4, cursor=first["next_cursor"])
+    assert [row["id"] for row in second["items"]] == ["analysis_05", "analysis_04", "analysis_03", "analysis_02"]
+    assert store.list_analyses(limit=4, cursor=second["next_cursor"])["next_cursor"] is None
+
+    assert len(store.list_analyses(target_domain="zoho.com", since=1005.0)["items"]) == 5
+    assert store.list_analyses(model="gemini")["items"] == []
+
+    mentions = store.domain_mentions("ZOHO.com", model="claude", limit=3)
+    assert [row["analysis_id"] for row in mentions["items"]] == ["analysis_09", "analysis_07", "analysis_05"]
+    assert len(store.domain_mentions("zoho.com", model="claude", cursor=mentions["next_cursor"])["items"]) == 2
+
+    stored = store.get_analysis("analysis_03")
+    assert stored["models"] == ["groq", "claude"]
+    assert stored["results"]["per_model_mentions"] == {"groq": 1, "claude": 1}
+    assert store.get_analysis("analysis_missing") is None
+    store.close()
+
+    reopened = AnalysisStore(str(tmp_path / "analyses.sqlite3"))
+    assert reopened.get_analysis("analysis_09")["prompt"] == "crm 9"
+    reopened.close()
+
+
+def test_results_are_encoded_on_the_writer_thread(tmp_path, monkeypatch):
+    encoded_on = []
+    dumps = json.dumps
+    monkeypatch.setattr(store_service.json, "dumps", lambda obj, **kw: encoded_on.append(threading.current_thread()) or dumps(obj, **kw))
+    store = AnalysisStore(str(tmp_path / "analyses.sqlite3"))
+    store.save("analysis_x", make_state("crm", None, {"groq": "hubspot.com"}), "completed")
+    assert encoded_on == []  # save() only queues
+    store.flush()
+    assert encoded_on and threading.current_thread() not in encoded_on
+    assert store.get_analysis("analysis_x")["results"]["domains"] == {"hubspot.com": 1}
+    store.close()
+
+
+def test_default_path_does_not_depend_on_the_working_directory(tmp_path):
+    backend = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    env = {k: v for k, v in os.environ.items() if k not in ("ANALYSIS_DB", "DATA_DIR")}
+    env["PYTHONPATH"] = backend
+    code = "from app.services import store_service; print(store_service.ANALYSIS_DB_PATH)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == os.path.join(backend, "analyses.sqlite3")
+
+
+def test_reads_do_not_wait_for_the_writer(tmp_path):
+    store = AnalysisStore(str(tmp_path / "analyses.sqlite3"))
+    store.save("analysis_1", make_state("crm", "zoho.com", {"groq": "zoho.com"}), "completed")
+    store.flush()
+    found = []
+    with store._lock:  # as if the writer thread were committing a batch
+        reader = threading.Thread(target=lambda: found.append(store.get_analysis("analysis_1")))
+        reader.start()
+        reader.join(timeout=2)
+    assert found and found[0]["prompt"] == "crm"
+    store.close()
+
+
+def test_finished_analysis_is_reopened_from_the_store(monkeypatch):
+    async def fake_query_model(prompt, provider, *args, **kwargs):
+        return f"{provider} recommends pipedrive.com"
+
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    client = TestClient(app)
+    data = client.post("/api/multi-llm-analysis", json={"prompt": "crm tools", "models": ["groq", "claude"]}).json()
+    analysis_store.flush()
+
+    stored = client.get(f"/api/analysis/history/{data['analysis_id']}").json()
+    assert stored["prompt"] == "crm tools"
+    assert stored["results"]["domains"] == {"pipedrive.com": 2}
+    assert client.get("/api/analysis/history/analysis_missing").status_code == 404
+
+    page = client.get("/api/analysis/history", params={"model": "claude", "limit": 1}).json()
+    assert page["items"][0]["id"] == data["analysis_id"]
+    mentions = client.get("/api/analysis/mentions", params={"domain": "pipedrive.com"}).json()
+    assert {row["model"] for row in mentions["items"] if row["analysis_id"] == data["analysis_id"]} == {"groq", "claude"}
+    for cursor in ("not-a-time|analysis_1", "1000.0", "1000.0|analysis_1|groq"):
+        assert client.get("/api/analysis/history", params={"cursor": cursor}).status_code == 400
+    assert client.get("/api/analysis/mentions", params={"domain": "pipedrive.com", "cursor": "1000.0|a"}).status_code == 400
+
+    # once the in-memory job has expired, progress is served from the store
+    del jobs._jobs[data["analysis_id"]]
+    progress = client.get(f"/api/analysis-progress/{data['analysis_id']}").json()
+    assert progress["status"] == "completed"
+    assert progress["progress"]["models"] == {"groq": "ok", "claude": "ok"}
+
+
+def test_streamed_analysis_is_stored(monkeypatch):
+    async def fake_query_model(prompt, provider, *args, **kwargs):
+        return f"{provider} recommends close.com"
+
+    monkeypatch.setattr(ai_client, "query_model", fake_query_model)
+    client = TestClient(app)
+    body = client.post("/api/multi-llm-analysis/stream", json={"prompt": "crm", "models": ["groq"]}).text
+    done = json.loads(body.split("event: done\ndata: ", 1)[1].split("\n\n", 1)[0])
+    analysis_store.flush()
+    assert analysis_store.get_analysis(done["analysis_id"])["results"]["domains"] == {"close.com": 1}
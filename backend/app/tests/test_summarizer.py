@@ -0,0 +1,65 @@
+import asyncio
+
+from app.services import ai_client, summarizer_service
+from app.services.ai_client import ProviderError
+
+RESPONSES = {"groq": "Groq mentions example.com", "claude": "Claude mentions research.org"}
+
+
+def make_provider(behaviour, calls):
+    async def fake_query_model(prompt, provider, max_tokens=600, temperature=0.7):
+        calls.append(provider)
+        outcome = behaviour.get(provider, "ok")
+        if outcome == "slow":
+            await asyncio.sleep(1)
+        if isinstance(outcome, ProviderError):
+            raise outcome
+        return f"summary from {provider}"
+
+    return fake_query_model
+
+
+def test_summary_prefers_claude(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_client, "query_model", make_provider({}, calls))
+    assert asyncio.run(summarizer_service.synthesize_summary(RESPONSES)) == "summary from claude"
+    assert calls == ["claude"]
+
+
+def test_summary_retries_then_falls_back_to_groq(monkeypatch):
+    calls = []
+    behaviour = {"claude": ProviderError("claude", "HTTP 529", 529)}
+    monkeypatch.setattr(ai_client, "query_model", make_provider(behaviour, calls))
+    summary = asyncio.run(summarizer_service.query_with_fallback("p", ["claude", "groq"], backoff=0))
+    assert summary == "summary from groq"
+    assert calls == ["claude", "claude", "groq"]
+
+
+def test_summary_attempt_timeout_and_client_errors(monkeypatch):
+    calls = []
+    behaviour = {"claude": "slow", "groq": ProviderError("groq", "HTTP 401", 401)}
+    monkeypatch.setattr(ai_client, "query_model", make_provider(behaviour, calls))
+    summary = asyncio.run(
+        summarizer_service.query_with_fallback("p", ["claude", "groq"], attempts=2, timeout=0.05, backoff=0)
+    )
+    assert summary.startswith("⚠️ Summary generation failed")
+    # 401 is not retried
+    assert calls == ["claude", "claude", "groq"]
+
+
+def test_summary_stops_at_its_overall_deadline(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ai_client, "query_model", make_provider({"claude": "slow", "groq": "slow"}, calls))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        summary = await summarizer_service.query_with_fallback(
+            "p", ["claude", "groq"], attempts=2, timeout=0.2, backoff=0, deadline=0.3
+        )
+        return summary, loop.time() - started
+
+    summary, elapsed = asyncio.run(run())
+    assert "summary deadline of 0.3s reached" in summary
+    assert calls == ["claude", "claude"]  # the second attempt got only what was left; groq never started
+    assert elapsed < 0.4
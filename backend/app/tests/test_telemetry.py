@@ -0,0 +1,71 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core.telemetry import Histogram, render_metrics, stage_seconds, timed_stage
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1))
+    h.observe(0.05, stage="a")
+    h.observe(0.5, stage="a")
+    h.observe(5, stage="a")
+    lines = h.render()
+    assert lines[:2] == ["# HELP demo_seconds Demo.", "# TYPE demo_seconds histogram"]
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{stage="a"} 3' in lines
+
+
+def test_timed_stage_wraps_sync_and_async_functions():
+    @timed_stage("demo_sync")
+    def add(a, b):
+        return a + b
+
+    @timed_stage("demo_async")
+    async def add_later(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    assert asyncio.run(add_later(1, 2)) == 3
+    stages = {key[0]: series["count"] for key, series in stage_seconds.snapshot().items()}
+    assert stages["demo_sync"] >= 1 and stages["demo_async"] >= 1
+
+
+def test_metrics_endpoint_reports_stages_per_route():
+    body = {"prompt": "best crm?", "models": ["groq", "claude"], "use_cache": False}
+    assert client.post("/api/multi-llm-analysis", json=body).status_code == 200
+
+    text = client.get("/metrics").text
+    assert "# TYPE geo_stage_duration_seconds histogram" in text
+    for stage in ("stream_finish", "calculate_visibility_metrics", "synthesize_summary"):
+        assert f'geo_stage_duration_seconds_count{{stage="{stage}",provider="",route="/api/multi-llm-analysis"}}' in text
+    assert 'geo_http_request_duration_seconds_count{route="/api/multi-llm-analysis",method="POST",status="200"}' in text
+    assert render_metrics().endswith("\n")
+
+
+def test_background_jobs_keep_the_request_trace_id():
+    with TestClient(app) as lifespan_client:
+        submitted = lifespan_client.post(
+            "/api/multi-llm-analysis",
+            json={"prompt": "traced", "models": ["groq"], "background": True},
+            headers={"X-Trace-Id": "job-trace-1"},
+        ).json()
+        progress = lifespan_client.get(f"/api/analysis-progress/{submitted['analysis_id']}").json()
+    assert progress["trace_id"] == "job-trace-1"
+
+
+def test_trace_id_is_echoed_or_generated():
+    given = client.get("/api/health", headers={"X-Trace-Id": "abc-123"})
+    assert given.headers["x-trace-id"] == "abc-123"
+
+    traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    assert client.get("/api/health", headers={"traceparent": traceparent}).headers["x-trace-id"] == \
+        "4bf92f3577b34da6a3ce929d0e0e4736"
+
+    generated = client.get("/api/health").headers["x-trace-id"]
+    assert len(generated) == 32
@@ -0,0 +1,38 @@
+from app.core.utils import normalize_cache_stats, normalize_domain, public_suffix, registrable_domain
+
+
+def test_normalize_domain_hosts():
+    assert normalize_domain("https://www.HubSpot.com/crm?x=1#top") == "hubspot.com"
+    assert normalize_domain("user:pw@Example.com:8080/path") == "example.com"
+    assert normalize_domain("docs.python.org/3/") == "docs.python.org"
+    assert normalize_domain("hubspot.com.") == "hubspot.com"
+    assert normalize_domain("") == ""
+    # only a leading www label is dropped
+    assert normalize_domain("awww.io") == "awww.io"
+    assert normalize_domain("www.awww.io") == "awww.io"
+    assert normalize_domain("wwwexample.com") == "wwwexample.com"
+    # ...and never when that would leave a bare public suffix
+    assert normalize_domain("www.co.uk") == "www.co.uk"
+    assert normalize_domain("www.io") == "www.io"
+
+
+def test_registrable_domain_uses_suffix_list():
+    assert public_suffix("news.bbc.co.uk") == "co.uk"
+    assert registrable_domain("https://news.bbc.co.uk/world") == "bbc.co.uk"
+    assert registrable_domain("blog.hubspot.com") == "hubspot.com"
+    assert registrable_domain("me.github.io") == "me.github.io"
+    assert registrable_domain("shop.example.unknowntld") == "example.unknowntld"
+    # wildcard and exception rules
+    assert registrable_domain("a.b.foo.ck") == "b.foo.ck"
+    assert registrable_domain("www.ck") == "www.ck"
+    assert registrable_domain("co.uk") == ""
+
+
+def test_normalize_domain_is_memoized():
+    before = normalize_cache_stats()
+    for _ in range(3):
+        normalize_domain("https://www.memo-test.com/")
+    after = normalize_cache_stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+    assert 0.0 < after["hit_rate"] <= 1.0
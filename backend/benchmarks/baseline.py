@@ -0,0 +1,71 @@
+# benchmarks/baseline.py
+"""
+Saved benchmark baselines: results are stored as JSON under benchmarks/baselines/
+and later runs are compared against them to flag regressions.
+"""
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (Linux/macOS), in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save(name: str, results: Dict[str, Dict[str, float]]) -> str:
+    """Write {case: {metric: value}} with some machine context; returns the file path."""
+    path = _path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {
+        "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare(name: str, results: Dict[str, Dict[str, float]], metrics: Dict[str, str], tolerance: float) -> List[str]:
+    """
+    Compare results against a saved baseline. `metrics` maps a metric name to
+    "lower" or "higher" (which direction is better). Returns one line per
+    metric that got worse by more than `tolerance` (a fraction, e.g. 0.15).
+    """
+    with open(_path(name)) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for case, values in results.items():
+        for metric, better in metrics.items():
+            old, new = baseline.get(case, {}).get(metric), values.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > tolerance if better == "lower" else change < -tolerance
+            if worse:
+                regressions.append(f"{case} {metric}: {old:g} -> {new:g} ({change:+.0%})")
+    return regressions
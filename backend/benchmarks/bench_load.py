@@ -0,0 +1,145 @@
+# benchmarks/bench_load.py
+"""
+Load driver for the API: latency percentiles, throughput and memory per endpoint and concurrency.
+
+Hits /api/multi-llm-analysis, /api/analysis/metrics and /api/geo/score with a fixed
+number of concurrent clients for --duration seconds per level. By default the app
+runs in-process (httpx ASGI transport, no sockets); --url drives a running server.
+In-process, providers answer with simulated text (API keys in the environment are
+ignored unless --live); set MOCK_PROVIDER_URL to go through
+tools/mock_provider_server.py for realistic provider latency and errors.
+
+Usage (from backend/):
+    python -m benchmarks.bench_load [--concurrency 1,8,32] [--duration 5] [--endpoints multi,metrics,geo]
+    python -m benchmarks.bench_load --url http://127.0.0.1:8000 --save load
+    python -m benchmarks.bench_load --compare load --tolerance 0.2
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks import baseline
+from benchmarks.bench_parser import make_response
+
+MODELS = ["groq", "claude", "gemini", "gpt4", "huggingface"]
+PROMPTS = [
+    "Which CRM is best for a 10 person startup?",
+    "Compare project management tools for remote teams.",
+    "What are the most cited sources on email marketing?",
+    "Best accounting software for freelancers in 2024?",
+]
+
+
+def make_payloads(size_kb: int) -> Dict[str, callable]:
+    responses = {m: make_response(size_kb, i) for i, m in enumerate(MODELS)}
+    global_counts = {"hubspot.com": 7, "salesforce.com": 4, "zoho.com": 3, "pipedrive.com": 1}
+    return {
+        "multi": lambda: ("/api/multi-llm-analysis", {
+            "prompt": random.choice(PROMPTS), "models": MODELS, "target_domain": "hubspot.com",
+        }),
+        "metrics": lambda: ("/api/analysis/metrics", {"responses": responses}),
+        "geo": lambda: ("/api/geo/score", {
+            "global_counts": global_counts, "target_domain": "hubspot.com", "total_models": len(MODELS),
+        }),
+    }
+
+
+async def run_level(client: httpx.AsyncClient, payload, concurrency: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            path, body = payload()
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(baseline.percentile(latencies, 50), 2),
+        "p95_ms": round(baseline.percentile(latencies, 95), 2),
+        "p99_ms": round(baseline.percentile(latencies, 99), 2),
+        "peak_rss_mb": baseline.peak_rss_mb(),
+    }
+
+
+async def drive(args) -> Dict[str, Dict[str, float]]:
+    payloads = make_payloads(args.size)
+    results = {}
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60, limits=httpx.Limits(max_connections=1000))
+        lifespan = None
+    else:
+        from app.main import app
+        from app.services import ai_client
+
+        if not args.live and not ai_client.MOCK_PROVIDER_URL:
+            # never load-test paid provider APIs by accident
+            for name in ai_client.API_KEYS:
+                ai_client.API_KEYS[name] = None
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    print(f"{'endpoint':<10}{'conc':>6}{'requests':>10}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'rss MB':>9}")
+    try:
+        for endpoint in args.endpoints.split(","):
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                stats = await run_level(client, payloads[endpoint], concurrency, args.duration)
+                results[f"{endpoint}@c{concurrency}"] = stats
+                print(f"{endpoint:<10}{concurrency:>6}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>9}"
+                      f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['peak_rss_mb']:>9}")
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="base URL of a running backend (default: in-process)")
+    parser.add_argument("--live", action="store_true", help="in-process: use real provider API keys if set")
+    parser.add_argument("--endpoints", default="multi,metrics,geo")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--size", type=int, default=10, help="KB per model response for /api/analysis/metrics")
+    parser.add_argument("--save", metavar="NAME", help="save results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95/RPS regression before failing")
+    args = parser.parse_args()
+
+    results = asyncio.run(drive(args))
+
+    if args.save:
+        print(f"baseline saved to {baseline.save(args.save, results)}")
+    if args.compare:
+        regressions = baseline.compare(args.compare, results, {"p95_ms": "lower", "rps": "higher"}, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
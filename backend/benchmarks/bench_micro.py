@@ -0,0 +1,87 @@
+# benchmarks/bench_micro.py
+"""
+Microbenchmarks of the analysis hot paths over synthetic corpora of growing size.
+
+Covers parse_domains, parse_topics, extract_citations, calculate_visibility_metrics
+and normalize_domain. Results can be saved as a baseline and later runs compared
+against it (exit code 1 on regressions beyond --tolerance).
+
+Usage (from backend/):
+    python -m benchmarks.bench_micro [--sizes 10,50,200] [--models 5] [--repeat 5]
+    python -m benchmarks.bench_micro --save micro          # write benchmarks/baselines/micro.json
+    python -m benchmarks.bench_micro --compare micro       # fail if anything got >15% slower
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+
+from app.core.utils import DOMAIN_PATTERN, normalize_domain
+from app.services.analyzer_service import calculate_visibility_metrics
+from app.services.parser_service import extract_citations, parse_domains, parse_topics
+from benchmarks import baseline
+from benchmarks.bench_parser import make_response
+
+
+def timed(fn, repeat: int) -> float:
+    """Median wall time of `repeat` runs, in ms."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def cases(responses):
+    _, per_model = parse_domains(responses)
+    raw_matches = [m for text in responses.values() for m in re.findall(DOMAIN_PATTERN, text)]
+
+    def normalize_cold():
+        normalize_domain.cache_clear()
+        for raw in raw_matches:
+            normalize_domain(raw)
+
+    return {
+        "parse_domains": lambda: parse_domains(responses),
+        "parse_topics": lambda: parse_topics(responses),
+        "extract_citations": lambda: extract_citations(responses),
+        "calculate_visibility_metrics": lambda: calculate_visibility_metrics(responses, per_model),
+        "normalize_domain": normalize_cold,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,50,200", help="response sizes in KB per model")
+    parser.add_argument("--models", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", metavar="NAME", help="save results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'function':<30}{'size/model':>11}{'median ms':>11}{'MB/s':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        responses = {f"model{i}": make_response(size, i) for i in range(args.models)}
+        megabytes = sum(len(t) for t in responses.values()) / 1e6
+        for name, fn in cases(responses).items():
+            ms = timed(fn, args.repeat)
+            results[f"{name}@{size}KB"] = {"median_ms": round(ms, 3), "mb_per_s": round(megabytes / (ms / 1000), 2)}
+            print(f"{name:<30}{size:>9}KB{ms:>11.2f}{megabytes / (ms / 1000):>9.1f}")
+
+    if args.save:
+        print(f"baseline saved to {baseline.save(args.save, results)}")
+    if args.compare:
+        regressions = baseline.compare(args.compare, results, {"median_ms": "lower"}, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
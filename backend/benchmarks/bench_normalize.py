@@ -0,0 +1,83 @@
+# benchmarks/bench_normalize.py
+"""
+Legacy normalize_domain (urlparse + replace("www.", "")) vs the memoized fast path,
+over a corpus of raw domain matches with a realistic (Zipf-like) repeat rate.
+
+Usage (from backend/):
+    python -m benchmarks.bench_normalize [--matches 1000000] [--distinct 5000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from urllib.parse import urlparse
+
+from app.core.utils import normalize_cache_stats, normalize_domain
+
+PREFIXES = ["", "", "", "www.", "https://", "https://www.", "http://", "HTTPS://WWW."]
+SUFFIXES = ["com", "org", "io", "net", "co.uk", "ai", "dev"]
+
+
+def legacy_normalize(raw: str) -> str:
+    """The pre-memoization implementation, kept here as the baseline."""
+    if not raw:
+        return ""
+    raw = raw.strip().lower()
+    if raw.startswith("http://") or raw.startswith("https://"):
+        try:
+            parsed = urlparse(raw)
+            host = parsed.netloc or parsed.path
+        except Exception:
+            host = raw
+    else:
+        host = raw
+    host = host.replace("www.", "")
+    host = host.strip().strip("/")
+    return host
+
+
+def make_corpus(matches: int, distinct: int, seed: int = 7):
+    rng = random.Random(seed)
+    names = [f"site{i}.{rng.choice(SUFFIXES)}" for i in range(distinct)]
+    # a few popular domains dominate, as in real responses
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    picks = rng.choices(names, weights=weights, k=matches)
+    return [rng.choice(PREFIXES) + name for name in picks]
+
+
+def best_of(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for raw in corpus:
+            fn(raw)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.matches, args.distinct)
+    for raw in corpus[:10000]:
+        assert normalize_domain(raw) == legacy_normalize(raw), f"normalizers disagree on {raw!r}"
+
+    normalize_domain.cache_clear()
+    cold_started = time.perf_counter()
+    for raw in corpus:
+        normalize_domain(raw)
+    cold_s = time.perf_counter() - cold_started
+    legacy_s = best_of(legacy_normalize, corpus, args.repeat)
+    warm_s = best_of(normalize_domain, corpus, args.repeat)
+    stats = normalize_cache_stats()
+
+    print(f"{'matches':>10}{'distinct':>10}{'legacy ms':>12}{'cold ms':>10}{'warm ms':>10}{'speedup':>9}{'hit rate':>10}")
+    print(f"{args.matches:>10}{len(set(corpus)):>10}{legacy_s * 1000:>12.1f}{cold_s * 1000:>10.1f}"
+          f"{warm_s * 1000:>10.1f}{legacy_s / warm_s:>8.2f}x{stats['hit_rate']:>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_parser.py
+"""
+Per-pattern parsing (parse_domains + parse_topics + extract_citations, ten
+re.findall calls for citations) vs the single-pass parse_responses scanner,
+on long synthetic responses.
+
+Usage (from backend/):
+    python -m benchmarks.bench_parser [--sizes 50,100,200] [--models 5] [--repeat 5]
+"""
+import argparse
+import random
+import re
+import time
+from collections import Counter
+
+from app.core.utils import normalize_domain
+from app.services.parser_service import CITATION_PATTERNS, DOMAIN_PATTERN, STOP_WORDS, parse_responses
+
+WORDS = (
+    "customer relationship management software helps teams track leads pipelines and revenue "
+    "the analysis shows that marketing automation integrates with sales workflows for growth"
+).split()
+DOMAINS = ["hubspot.com", "www.salesforce.com", "https://zoho.com", "pipedrive.com", "research.org", "gartner.com"]
+CITATIONS = ["according to", "a study by", "[3]", "(2024)", "Source:", "research shows", "published in"]
+
+
+def make_response(size_kb: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size_kb * 1024:
+        roll = rng.random()
+        if roll < 0.04:
+            part = rng.choice(DOMAINS)
+        elif roll < 0.06:
+            part = rng.choice(CITATIONS)
+        else:
+            part = rng.choice(WORDS)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)
+
+
+def legacy_parse(responses, top_n=20):
+    """The pre-scanner code path: one findall per pattern per response."""
+    global_domains, per_model = [], {}
+    for model, text in responses.items():
+        cleaned = [normalize_domain(d) for d in re.findall(DOMAIN_PATTERN, text) if d]
+        per_model[model] = Counter(cleaned)
+        global_domains.extend(cleaned)
+    words = []
+    for text in responses.values():
+        words.extend(t for t in re.findall(r'\b\w{4,}\b', text.lower()) if t not in STOP_WORDS)
+    citations = {
+        model: sum(len(re.findall(p, text, flags=re.IGNORECASE)) for p in CITATION_PATTERNS)
+        for model, text in responses.items()
+    }
+    return Counter(global_domains), per_model, Counter(words).most_common(top_n), citations
+
+
+def best_of(fn, responses, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(responses)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="50,100,200", help="response sizes in KB")
+    parser.add_argument("--models", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size/model':>10}{'models':>8}{'legacy ms':>12}{'scanner ms':>12}{'speedup':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        responses = {f"model{i}": make_response(size, i) for i in range(args.models)}
+        legacy_s, legacy = best_of(legacy_parse, responses, args.repeat)
+        scan_s, scanned = best_of(parse_responses, responses, args.repeat)
+        assert scanned == legacy, "scanner output diverged from the per-pattern passes"
+        print(f"{size:>8}KB{args.models:>8}{legacy_s * 1000:>12.1f}{scan_s * 1000:>12.1f}{legacy_s / scan_s:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_prompt.py
+"""
+Tokens per synthesis prompt: fixed snippet[:800] per model vs the token-budget assembler.
+
+Models answer the same question, so responses overlap heavily (shared claims,
+lightly reworded). Reports prompt tokens, distinct 3-word shingles that made
+it into the prompt, and assembly time.
+
+Usage (from backend/):
+    python -m benchmarks.bench_prompt [--models 3,5,10] [--sentences 40] [--budget 1000]
+"""
+import argparse
+import random
+import re
+import time
+
+from app.services.prompt_service import assemble_responses, count_tokens, tokenizer_name
+
+CLAIMS = [
+    "HubSpot is the most widely recommended CRM for small teams",
+    "Salesforce dominates the enterprise segment with deep customization",
+    "Pipedrive focuses on visual sales pipelines and is easy to adopt",
+    "Zoho CRM offers the lowest price per seat among the major vendors",
+    "According to Gartner, CRM spending grew by double digits last year",
+    "Integrations with email and calendar are the most requested feature",
+    "Most reviewers cite onboarding time as the main hidden cost",
+    "Freshsales bundles phone and chat support into every plan",
+]
+SYNONYMS = {"most": "very", "widely": "commonly", "main": "primary", "major": "leading", "easy": "simple"}
+
+
+def make_responses(models: int, sentences: int, seed: int = 5):
+    rng = random.Random(seed)
+    responses = {}
+    for m in range(models):
+        parts = []
+        for i in range(sentences):
+            if rng.random() < 0.6:  # a shared claim, sometimes reworded
+                words = rng.choice(CLAIMS).split()
+                words = [SYNONYMS.get(w, w) if rng.random() < 0.2 else w for w in words]
+                parts.append(" ".join(words) + ".")
+            else:  # something only this model says
+                parts.append(f"Model {m} notes detail {i} about vendor {rng.randint(1, 500)} and its {rng.choice(['pricing', 'support', 'api', 'roadmap'])}.")
+        responses[f"model{m}"] = " ".join(parts)
+    return responses
+
+
+def legacy_block(responses):
+    return "\n\n".join(f"**{m}:** {t.strip()[:800]}" for m, t in responses.items())
+
+
+def distinct_shingles(text: str) -> int:
+    words = re.findall(r"\w+", text.lower())
+    return len({" ".join(words[i:i + 3]) for i in range(len(words) - 2)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--models", default="3,5,10")
+    parser.add_argument("--sentences", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"tokenizer: {tokenizer_name()}, budget: {args.budget} tokens")
+    print(f"{'models':>7}{'legacy tok':>12}{'budget tok':>12}{'saved':>8}{'legacy uniq':>13}{'budget uniq':>13}"
+          f"{'uniq/100tok':>13}{'dupes':>7}{'ms':>7}")
+    for models in (int(m) for m in args.models.split(",")):
+        responses = make_responses(models, args.sentences)
+        legacy = legacy_block(responses)
+        started = time.perf_counter()
+        block, stats = assemble_responses(responses, args.budget)
+        elapsed = (time.perf_counter() - started) * 1000
+        legacy_tokens, budget_tokens = count_tokens(legacy), count_tokens(block)
+        legacy_uniq, budget_uniq = distinct_shingles(legacy), distinct_shingles(block)
+        density = f"{100 * legacy_uniq / legacy_tokens:.0f} -> {100 * budget_uniq / budget_tokens:.0f}"
+        print(f"{models:>7}{legacy_tokens:>12}{budget_tokens:>12}{1 - budget_tokens / legacy_tokens:>8.0%}"
+              f"{legacy_uniq:>13}{budget_uniq:>13}{density:>13}{stats['duplicates_dropped']:>7}{elapsed:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_response.py
+"""
+Response encoding before/after: FastAPI's default path vs FastJSONResponse, plus compression.
+
+  dict  - the /api/multi-llm-analysis payload (full response texts). Before:
+          jsonable_encoder + json.dumps (JSONResponse). After: orjson in one pass.
+  model - an AnalysisMetricsResult. Before: validated, dumped to a dict, then
+          json.dumps. After: model_construct + model_dump_json (pydantic-core).
+  gzip/br - compressing the encoded payload at the configured levels.
+
+Usage (from backend/):
+    python -m benchmarks.bench_response [--sizes 10,50,200] [--models 5] [--repeat 5]
+"""
+import argparse
+import gzip
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import responses
+from app.core.responses import BROTLI_QUALITY, GZIP_LEVEL, FastJSONResponse
+from app.models.response_models import AnalysisMetricsResult, MetricsPerModel
+from app.services.batch_service import analyze_response_set
+from app.services.pipeline_service import AnalysisState
+from benchmarks.bench_parser import make_response
+
+
+def timed(fn, repeat: int) -> float:
+    """Median wall time of `repeat` runs, in ms."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def analysis_payload(size_kb: int, models: int) -> dict:
+    state = AnalysisState("best crm", [f"model{i}" for i in range(models)], "zoho.com")
+    for i, model in enumerate(state.models):
+        state.add_provider_result({"provider": model, "status": "ok", "response": make_response(size_kb, i),
+                                   "error": None, "response_time": 1200})
+    return {"analysis_id": "analysis_bench", "status": "completed", "failed_models": [], "error": None,
+            "results": state.results()}
+
+
+def metrics_fields(size_kb: int, models: int) -> dict:
+    result = analyze_response_set({f"model{i}": make_response(size_kb, i) for i in range(models)})
+    return {"metrics": result["metrics"], "rankings": result["rankings"], "global_domains": result["global_domains"],
+            "citations": result["citations"], "summary": "insights"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,50,200", help="response sizes in KB per model")
+    parser.add_argument("--models", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<8}{'size/model':>11}{'payload KB':>12}{'before ms':>11}{'after ms':>10}{'speedup':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        payload = analysis_payload(size, args.models)
+        encoded = FastJSONResponse(payload).body
+        before = timed(lambda: JSONResponse(jsonable_encoder(payload)), args.repeat)
+        after = timed(lambda: FastJSONResponse(payload), args.repeat)
+        print(f"{'dict':<8}{size:>9}KB{len(encoded) / 1024:>12.1f}{before:>11.2f}{after:>10.2f}{before / after:>8.1f}x")
+
+        fields = metrics_fields(size, args.models)
+        model_kb = len(FastJSONResponse(AnalysisMetricsResult(**fields)).body) / 1024
+        before = timed(lambda: JSONResponse(jsonable_encoder(AnalysisMetricsResult(**fields).model_dump())), args.repeat)
+        after = timed(lambda: FastJSONResponse(AnalysisMetricsResult.model_construct(
+            **{**fields, "metrics": {m: MetricsPerModel.model_construct(**v) for m, v in fields["metrics"].items()}}
+        )), args.repeat)
+        print(f"{'model':<8}{size:>9}KB{model_kb:>12.1f}{before:>11.2f}{after:>10.2f}{before / after:>8.1f}x")
+
+        compressors = {f"gzip-{GZIP_LEVEL}": lambda: gzip.compress(encoded, GZIP_LEVEL)}
+        if responses.brotli is not None:
+            compressors[f"br-{BROTLI_QUALITY}"] = lambda: responses.brotli.compress(encoded, quality=BROTLI_QUALITY)
+        for name, compress in compressors.items():
+            ms = timed(compress, args.repeat)
+            print(f"{name:<8}{size:>9}KB{len(compress()) / 1024:>12.1f}{'':>11}{ms:>10.2f}"
+                  f"{len(encoded) / len(compress()):>8.1f}:1")
+
+
+if __name__ == "__main__":
+    main()
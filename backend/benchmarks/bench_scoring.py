@@ -0,0 +1,90 @@
+# benchmarks/bench_scoring.py
+"""
+Re-scoring stored runs: calculate_visibility_metrics + rank_models per run vs
+one vectorized score_columns call over all runs ("columnar" includes building the
+columns from the stored dicts; "vector" is the NumPy scoring + ranking alone).
+
+Usage (from backend/):
+    python -m benchmarks.bench_scoring [--runs 1000,5000,20000] [--models 12] [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+from app.services.analyzer_service import rank_models
+import numpy as np
+
+from app.services.scoring_service import MetricColumns, round_like_python, score_columns, visibility_scores
+
+
+def make_runs(count: int, models: int, seed: int = 11):
+    rng = random.Random(seed)
+    return [
+        {
+            f"model{j}": {
+                "response_length": rng.randint(0, 3000),
+                "domain_count": rng.randint(0, 20),
+                "unique_domains": rng.randint(0, 8),
+            }
+            for j in range(models)
+        }
+        for _ in range(count)
+    ]
+
+
+def scalar_rescore(runs):
+    """What re-scoring costs today: the per-model dict heuristics, then a tuple sort per run."""
+    results = []
+    for stored in runs:
+        metrics = {}
+        for model, m in stored.items():
+            length_score = min(m["response_length"] / 1000, 1.0) * 40
+            domain_score = min(m["domain_count"] / 10, 1.0) * 30
+            diversity_score = min(m["unique_domains"] / 5, 1.0) * 30
+            metrics[model] = {
+                "response_length": m["response_length"],
+                "domain_count": m["domain_count"],
+                "unique_domains": m["unique_domains"],
+                "visibility_score": round(float(length_score + domain_score + diversity_score), 2),
+            }
+        results.append((metrics, rank_models(metrics)))
+    return results
+
+
+def columnar_rescore(runs):
+    return score_columns(MetricColumns.from_metrics(runs))
+
+
+def vector_only(columns):
+    return np.lexsort((-round_like_python(visibility_scores(columns)), columns.run))
+
+
+def best_of(fn, runs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(runs)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", default="1000,5000,20000")
+    parser.add_argument("--models", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'runs':>8}{'models':>8}{'scalar ms':>12}{'columnar ms':>13}{'speedup':>9}{'vector ms':>11}")
+    for count in (int(r) for r in args.runs.split(",")):
+        runs = make_runs(count, args.models)
+        scalar_s, scalar = best_of(scalar_rescore, runs, args.repeat)
+        columnar_s, columnar = best_of(columnar_rescore, runs, args.repeat)
+        assert columnar == scalar, "columnar scores diverged from the scalar heuristics"
+        vector_s, _ = best_of(vector_only, MetricColumns.from_metrics(runs), args.repeat)
+        print(f"{count:>8}{args.models:>8}{scalar_s * 1000:>12.1f}{columnar_s * 1000:>13.1f}"
+              f"{scalar_s / columnar_s:>8.2f}x{vector_s * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of a worker: a fresh interpreter importing app.main (which builds the app).
+
+  startup - wall time of `python -c "import app.main"` in a new process, median of --repeat runs.
+  eager   - the same with the lazily loaded modules (numpy for /rescore, tiktoken for token
+            counting) imported up front, i.e. what startup cost before they were deferred.
+  top     - the slowest packages and app modules of one cold start, from `python -X importtime`
+            (cumulative, so a package includes everything it pulls in).
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [--repeat 5] [--top 12]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_IMPORTS = "import app.services.scoring_service; import app.services.prompt_service as p; p.count_tokens('x'); "
+
+
+def cold_start_ms(code: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=BACKEND, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def slowest_imports(top: int):
+    """(cumulative ms, module) for the `top` slowest packages and app modules loaded by app.main."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                            cwd=BACKEND, check=True, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name.startswith("app.") or "." not in name:
+            rows.append((int(cumulative) / 1000, name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    baseline = cold_start_ms("pass", args.repeat)
+    startup = cold_start_ms("import app.main", args.repeat)
+    eager = cold_start_ms(LAZY_IMPORTS + "import app.main", args.repeat)
+    print(f"{'interpreter':<14}{baseline:>9.1f} ms")
+    print(f"{'startup':<14}{startup:>9.1f} ms  ({startup - baseline:.1f} ms over a bare interpreter)")
+    print(f"{'eager':<14}{eager:>9.1f} ms  ({eager - startup:.1f} ms deferred to first use)")
+    print()
+    print(f"{'cumulative ms':>14}  module")
+    for ms, name in slowest_imports(args.top):
+        print(f"{ms:>14.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_stream.py
+"""
+Parse latency after the last token: incremental StreamScanner vs scanning the full text.
+
+Each response is fed to a StreamScanner in token-sized chunks (as a streamed
+provider answer would arrive), then finish() is timed: that is all the parsing
+left once the last token is in. The baseline is scan_response on the complete
+text, which today only starts after the last token. The per-chunk cost paid
+while tokens arrive is reported separately.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stream [--sizes 10,50,200] [--chunk 4] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+
+from app.services.parser_service import StreamScanner, scan_response
+from benchmarks.bench_parser import make_response
+
+
+def run(text: str, chunk: int):
+    scanner = StreamScanner()
+    started = time.perf_counter()
+    for i in range(0, len(text), chunk):
+        scanner.feed(text[i:i + chunk])
+    fed = time.perf_counter()
+    scanner.finish()
+    done = time.perf_counter()
+    return (fed - started) / -(-len(text) // chunk), done - fed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,50,200", help="response sizes in KB")
+    parser.add_argument("--chunk", type=int, default=4, help="characters per streamed chunk (~1 token)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':>6}{'full rescan ms':>16}{'stream tail ms':>16}{'per chunk us':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        text = make_response(size, size)
+        full, tail, per_chunk = [], [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            scan_response(text)
+            full.append(time.perf_counter() - started)
+            chunk_cost, finish = run(text, args.chunk)
+            per_chunk.append(chunk_cost)
+            tail.append(finish)
+        print(f"{size:>4}KB{statistics.median(full) * 1000:>16.2f}{statistics.median(tail) * 1000:>16.3f}"
+              f"{statistics.median(per_chunk) * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_summarizer.py
+"""
+Summaries/second: async synthesize_summary vs the old asyncio.to_thread offload.
+
+Both paths talk to the same simulated provider (fixed latency per call). The
+thread version blocks a worker for the whole call, so throughput is capped by
+the default executor size; the async version only holds a coroutine.
+
+Usage (from backend/):
+    python -m benchmarks.bench_summarizer [--summaries 400] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import time
+
+from app.services import ai_client, summarizer_service
+
+RESPONSES = {
+    "groq": "Groq recommends example.com and research.org for CRM tooling. " * 10,
+    "claude": "According to a study by academic.edu, hubspot.com leads the market. " * 10,
+    "gemini": "Salesforce.com and zoho.com are cited in most reports (2024). " * 10,
+}
+
+
+def run_thread_offload(n: int, latency: float) -> float:
+    """The pre-fix shape: a blocking provider call pushed through asyncio.to_thread."""
+
+    def blocking_query(prompt, provider, max_tokens, temperature):
+        time.sleep(latency)
+        return f"summary from {provider}"
+
+    async def one():
+        return await asyncio.to_thread(blocking_query, "prompt", "claude", 300, 0.5)
+
+    async def main():
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n)))
+        return time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def run_async(n: int, latency: float) -> float:
+    async def fake_query_model(prompt, provider, max_tokens=600, temperature=0.7):
+        await asyncio.sleep(latency)
+        return f"summary from {provider}"
+
+    ai_client.query_model = fake_query_model
+
+    async def main():
+        started = time.perf_counter()
+        await asyncio.gather(*(summarizer_service.synthesize_summary(RESPONSES) for _ in range(n)))
+        return time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--summaries", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated provider latency (s)")
+    args = parser.parse_args()
+
+    thread_s = run_thread_offload(args.summaries, args.latency)
+    async_s = run_async(args.summaries, args.latency)
+
+    print(f"{args.summaries} summaries, {args.latency * 1000:.0f} ms simulated provider latency")
+    print(f"{'path':<16}{'seconds':>10}{'summaries/s':>14}")
+    print(f"{'to_thread':<16}{thread_s:>10.3f}{args.summaries / thread_s:>14.1f}")
+    print(f"{'async':<16}{async_s:>10.3f}{args.summaries / async_s:>14.1f}")
+    print(f"speedup: {thread_s / async_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# tools/mock_provider_server.py
+"""
+Offline stand-in for the LLM provider APIs, for load-testing the full pipeline on one box.
+
+Speaks the HTTP shapes ai_client uses, one path prefix per provider:
+  POST /groq/chat/completions, /openrouter/chat/completions   (OpenAI chat completions)
+  POST /claude/messages                                       (Anthropic messages)
+  POST /gemini/models/{model}:generateContent                 (Gemini)
+  POST /gemini/models/{model}:streamGenerateContent
+  POST /huggingface/models/{model}                            (HF inference)
+"stream": true (or :streamGenerateContent) streams tokens as server-sent events in
+each provider's format. Latency, error rate and 429 rate are configurable, globally
+or per provider; GET /_stats reports what was served.
+
+Point the backend at it with MOCK_PROVIDER_URL (every provider then goes over HTTP
+to <url>/<provider>, with a placeholder key when none is set):
+
+    python -m tools.mock_provider_server --port 9100 --latency lognormal:0.4,0.5 --error-rate 0.02 --rate-429 0.05
+    MOCK_PROVIDER_URL=http://127.0.0.1:9100 uvicorn app.main:app
+
+The backend's per-provider rate limiters still apply; set <PROVIDER>_RPM=0 and
+<PROVIDER>_TPM=0 (e.g. GROQ_RPM=0) to load-test without them.
+
+Latency specs: fixed:S | uniform:LO,HI | normal:MU,SIGMA | lognormal:MEDIAN,SIGMA | exponential:MEAN (seconds).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+PROVIDERS = ("groq", "claude", "gemini", "openrouter", "huggingface")
+
+DOMAINS = [
+    "hubspot.com", "salesforce.com", "zoho.com", "pipedrive.com", "freshworks.com", "monday.com",
+    "gartner.com", "forrester.com", "g2.com", "capterra.com", "wikipedia.org", "techcrunch.com",
+]
+SENTENCES = [
+    "Based on current reviews, {d} is a strong option for growing teams.",
+    "According to a study by {d}, adoption grew steadily in 2024.",
+    "Many analysts also point to {d} for its integrations and pricing.",
+    "Research shows that onboarding time matters more than feature count.",
+    "Published in several industry reports, {d} ranks near the top.",
+    "Source: {d} comparison pages, which list plans side by side.",
+    "Teams on a budget often start with {d} and migrate later.",
+]
+
+
+class LatencyModel:
+    """Samples a delay in seconds from a "kind:params" spec."""
+
+    def __init__(self, spec: str = "fixed:0"):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        samplers = {
+            "fixed": lambda p: p[0],
+            "uniform": lambda p: random.uniform(p[0], p[1]),
+            "normal": lambda p: random.gauss(p[0], p[1]),
+            "lognormal": lambda p: random.lognormvariate(math.log(p[0]), p[1]),
+            "exponential": lambda p: random.expovariate(1 / p[0]),
+        }
+        if kind not in samplers:
+            raise ValueError(f"unknown latency distribution {kind!r}; expected one of {sorted(samplers)}")
+        self._sample = samplers[kind]
+        self._sample(self.params)  # validate the parameter count
+
+    def sample(self) -> float:
+        return max(0.0, self._sample(self.params))
+
+
+class MockConfig:
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, rate_429: float = 0.0,
+                 token_interval: float = 0.0, words: int = 120, retry_after: int = 1,
+                 per_provider: Optional[Dict[str, str]] = None, seed: Optional[int] = None):
+        self.latency = LatencyModel(latency)
+        self.per_provider = {p: LatencyModel(spec) for p, spec in (per_provider or {}).items()}
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.token_interval = token_interval
+        self.words = words
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+    def latency_for(self, provider: str) -> float:
+        return (self.per_provider.get(provider) or self.latency).sample()
+
+
+def make_text(provider: str, prompt: str, words: int) -> str:
+    """Deterministic per (provider, prompt) answer that mentions domains and citation phrases."""
+    seed = int.from_bytes(hashlib.sha256(f"{provider}|{prompt}".encode()).digest()[:8], "big")
+    rng = random.Random(seed)
+    out: List[str] = []
+    while sum(len(s.split()) for s in out) < words:
+        out.append(rng.choice(SENTENCES).format(d=rng.choice(DOMAINS)))
+    return " ".join(out)
+
+
+def _tokens(text: str) -> List[str]:
+    words = text.split(" ")
+    return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+
+def _sse(data) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+
+def _error_body(provider: str, status: int, message: str) -> Dict:
+    if provider == "claude":
+        kind = "rate_limit_error" if status == 429 else "api_error"
+        return {"type": "error", "error": {"type": kind, "message": message}}
+    if provider == "gemini":
+        return {"error": {"code": status, "message": message, "status": "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"}}
+    if provider == "huggingface":
+        return {"error": message}
+    return {"error": {"message": message, "type": "rate_limit_exceeded" if status == 429 else "server_error"}}
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    config = config or MockConfig()
+    app = FastAPI(title="mock LLM providers")
+    stats: Dict[str, Counter] = defaultdict(Counter)
+    app.state.config = config
+    app.state.stats = stats
+
+    async def prelude(provider: str) -> Optional[JSONResponse]:
+        """Latency, then maybe a 429 or 5xx instead of an answer."""
+        stats[provider]["requests"] += 1
+        await asyncio.sleep(config.latency_for(provider))
+        roll = config.rng.random()
+        if roll < config.rate_429:
+            stats[provider]["429"] += 1
+            return JSONResponse(_error_body(provider, 429, "rate limit exceeded"), status_code=429,
+                                headers={"retry-after": str(config.retry_after)})
+        if roll < config.rate_429 + config.error_rate:
+            status = config.rng.choice((500, 502, 503))
+            stats[provider][str(status)] += 1
+            return JSONResponse(_error_body(provider, status, "upstream overloaded"), status_code=status)
+        stats[provider]["200"] += 1
+        return None
+
+    async def token_stream(provider: str, text: str, frame, first=None, last=None):
+        if first is not None:
+            yield first
+        for token in _tokens(text):
+            if config.token_interval:
+                await asyncio.sleep(config.token_interval)
+            stats[provider]["tokens_streamed"] += 1
+            yield frame(token)
+        if last is not None:
+            yield last
+
+    def streaming(body) -> StreamingResponse:
+        return StreamingResponse(body, media_type="text/event-stream", headers={"cache-control": "no-cache"})
+
+    def openai_route(provider: str):
+        async def chat_completions(request: Request):
+            body = await request.json()
+            failure = await prelude(provider)
+            if failure:
+                return failure
+            prompt = body["messages"][-1]["content"]
+            text = make_text(provider, prompt, min(config.words, body.get("max_tokens") or config.words))
+            model = body.get("model", "mock")
+            if body.get("stream"):
+                frame = lambda token: _sse({"model": model, "choices": [{"index": 0, "delta": {"content": token}}]})
+                return streaming(token_stream(provider, text, frame, last="data: [DONE]\n\n"))
+            return {
+                "id": f"chatcmpl-{int(time.time() * 1000)}",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(text.split())},
+            }
+        return chat_completions
+
+    for name in ("groq", "openrouter"):
+        app.post(f"/{name}/chat/completions")(openai_route(name))
+
+    @app.post("/claude/messages")
+    async def claude_messages(request: Request):
+        body = await request.json()
+        failure = await prelude("claude")
+        if failure:
+            return failure
+        prompt = body["messages"][-1]["content"]
+        text = make_text("claude", prompt, min(config.words, body.get("max_tokens") or config.words))
+        if body.get("stream"):
+            first = "event: message_start\n" + _sse({"type": "message_start", "message": {"role": "assistant", "content": []}})
+            frame = lambda token: "event: content_block_delta\n" + _sse(
+                {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}}
+            )
+            last = "event: message_stop\n" + _sse({"type": "message_stop"})
+            return streaming(token_stream("claude", text, frame, first, last))
+        return {
+            "id": f"msg_{int(time.time() * 1000)}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "mock"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+        }
+
+    @app.post("/gemini/models/{target}")
+    async def gemini_generate(target: str, request: Request):
+        body = await request.json()
+        failure = await prelude("gemini")
+        if failure:
+            return failure
+        prompt = "".join(p.get("text", "") for c in body["contents"] for p in c["parts"])
+        limit = body.get("generationConfig", {}).get("maxOutputTokens") or config.words
+        text = make_text("gemini", prompt, min(config.words, limit))
+        candidate = lambda t: {"candidates": [{"content": {"role": "model", "parts": [{"text": t}]}, "index": 0}]}
+        if target.endswith(":streamGenerateContent"):
+            return streaming(token_stream("gemini", text, lambda token: _sse(candidate(token))))
+        return candidate(text)
+
+    @app.post("/huggingface/models/{model:path}")
+    async def huggingface_generate(model: str, request: Request):
+        body = await request.json()
+        failure = await prelude("huggingface")
+        if failure:
+            return failure
+        limit = body.get("parameters", {}).get("max_new_tokens") or config.words
+        return [{"generated_text": make_text("huggingface", body["inputs"], min(config.words, limit))}]
+
+    @app.get("/_stats")
+    async def served():
+        return {provider: dict(counts) for provider, counts in stats.items()}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default="lognormal:0.3,0.5", help="default latency distribution")
+    parser.add_argument("--provider-latency", action="append", default=[], metavar="PROVIDER=SPEC",
+                        help="per-provider latency, e.g. claude=lognormal:0.8,0.4 (repeatable)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 5xx")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="seconds between streamed tokens")
+    parser.add_argument("--words", type=int, default=120, help="words per answer (capped by max_tokens)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    per_provider = dict(item.split("=", 1) for item in args.provider_latency)
+    unknown = set(per_provider) - set(PROVIDERS)
+    if unknown:
+        parser.error(f"unknown provider(s): {', '.join(sorted(unknown))}")
+    config = MockConfig(args.latency, args.error_rate, args.rate_429, args.token_interval, args.words,
+                        args.retry_after, per_provider, args.seed)
+
+    import uvicorn  # only needed to serve, not to import create_app in tests
+
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
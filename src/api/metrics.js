@@ -10,6 +10,31 @@ const api = axios.create({
   },
 })
 
+// Map the server's analysis "results" payload (/api/multi-llm-analysis, the stream's
+// 'done' event, stored analyses) onto the shape ResultsDisplay renders
+export const toDisplayResults = (analysisId, results, targetDomain = null) => ({
+  analysis_id: analysisId,
+  responses: Object.fromEntries(
+    Object.entries(results.modelResults || {}).map(([model, r]) => [model, r.response])
+  ),
+  domains: {
+    global_domains: results.domains || {},
+    citations: results.citations || {},
+    geo_analysis: targetDomain && results.geo_score !== undefined
+      ? { target_domain: targetDomain, geo_score: results.geo_score, per_model_mentions: results.per_model_mentions }
+      : null
+  },
+  metrics: results.modelMetrics || {},
+  model_comparison: {
+    rankings: results.rankings || [],
+    summary: results.summary,
+    top_performer: results.topPerformer || 'N/A',
+    unique_domains: results.uniqueDomains || 0,
+    total_citations: results.totalCitations || 0,
+    avg_response_time: results.avgResponse || 0
+  }
+})
+
 export const metricsAPI = {
   // Health check endpoint
   async checkHealth() {
@@ -110,6 +135,47 @@ export const metricsAPI = {
     }
   },
 
+  // Streaming Multi-LLM Analysis (server-sent events)
+  // onEvent(event, data) fires for each 'model', 'domains' and 'summary' event as it
+  // arrives; resolves with the final results payload from the 'done' event.
+  async streamMultiLLMAnalysis(prompt, models, targetDomain = null, onEvent = () => {}, options = {}) {
+    const response = await fetch(`${API_BASE_URL}/api/multi-llm-analysis/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ prompt, models, target_domain: targetDomain, ...options }),
+    })
+    if (!response.ok || !response.body) {
+      throw new Error(`Streaming analysis failed: HTTP ${response.status}`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let results = null
+
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+
+      let boundary
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const block = buffer.slice(0, boundary)
+        buffer = buffer.slice(boundary + 2)
+        let event = 'message'
+        let data = ''
+        for (const line of block.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7)
+          else if (line.startsWith('data: ')) data += line.slice(6)
+        }
+        const payload = data ? JSON.parse(data) : null
+        if (event === 'done') results = payload
+        else onEvent(event, payload)
+      }
+    }
+    return results
+  },
+
   // Get analysis progress
   async getAnalysisProgress(analysisId) {
     try {
@@ -121,6 +187,43 @@ export const metricsAPI = {
     }
   },
 
+  // Stored analyses, newest first; pass next_cursor back as params.cursor for the next page
+  async getAnalysisHistory(params = {}) {
+    try {
+      const response = await api.get('/api/analysis/history', { params })
+      return response.data
+    } catch (error) {
+      console.error('Failed to fetch analysis history:', error)
+      throw error
+    }
+  },
+
+  // Re-open a past analysis from the server store (no LLM calls)
+  async getStoredAnalysis(analysisId) {
+    try {
+      const response = await api.get(`/api/analysis/history/${analysisId}`)
+      return response.data
+    } catch (error) {
+      console.error('Failed to fetch stored analysis:', error)
+      throw error
+    }
+  },
+
+  // Score many competitor domains against one analysis in a single request
+  async scoreDomains(analysisId, targets, options = {}) {
+    try {
+      const response = await api.post('/api/geo/score/bulk', {
+        analysis_id: analysisId,
+        targets,
+        ...options
+      })
+      return response.data
+    } catch (error) {
+      console.error('Bulk GEO scoring failed:', error)
+      throw error
+    }
+  },
+
   // AI endpoints
   async getAIResponse(prompt, options = {}) {
     try {
@@ -1,8 +1,8 @@
 import { motion } from 'framer-motion'
-import { History, Trash2, Play, Clock } from 'lucide-react'
+import { History, Trash2, Play, Clock, FolderOpen } from 'lucide-react'
 import { useQueryHistory } from '../contexts/QueryHistoryContext'
 
-const QueryHistory = ({ isOpen, onClose, onReRunQuery }) => {
+const QueryHistory = ({ isOpen, onClose, onReRunQuery, onOpenQuery }) => {
   const { history, removeFromHistory, clearHistory } = useQueryHistory()
 
   if (!isOpen) return null
@@ -76,13 +76,25 @@ const QueryHistory = ({ isOpen, onClose, onReRunQuery }) => {
                   </button>
                 </div>
                 
-                <button
-                  onClick={() => onReRunQuery(query)}
-                  className="w-full mt-3 px-3 py-2 bg-cyan-600/20 hover:bg-cyan-600/30 text-cyan-400 rounded-lg transition-colors flex items-center justify-center space-x-2 text-sm"
-                >
-                  <Play className="w-3 h-3" />
-                  <span>Re-run Query</span>
-                </button>
+                <div className="flex space-x-2 mt-3">
+                  {(query.result || query.analysisId) && (
+                    <button
+                      onClick={() => onOpenQuery(query)}
+                      className="flex-1 px-3 py-2 bg-cyan-600/20 hover:bg-cyan-600/30 text-cyan-400 rounded-lg transition-colors flex items-center justify-center space-x-2 text-sm"
+                      title="Show the saved results without querying the models again"
+                    >
+                      <FolderOpen className="w-3 h-3" />
+                      <span>Open</span>
+                    </button>
+                  )}
+                  <button
+                    onClick={() => onReRunQuery(query)}
+                    className="flex-1 px-3 py-2 bg-cyan-600/20 hover:bg-cyan-600/30 text-cyan-400 rounded-lg transition-colors flex items-center justify-center space-x-2 text-sm"
+                  >
+                    <Play className="w-3 h-3" />
+                    <span>Re-run Query</span>
+                  </button>
+                </div>
               </motion.div>
             ))}
           </div>
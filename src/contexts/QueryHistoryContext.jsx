@@ -1,4 +1,5 @@
-import { createContext, useContext, useState, useEffect } from 'react'
+import { createContext, useContext, useState, useEffect, useRef } from 'react'
+import { metricsAPI } from '../api/metrics'
 
 const QueryHistoryContext = createContext()
 
@@ -16,13 +17,51 @@ export const QueryHistoryProvider = ({ children }) => {
     return saved ? JSON.parse(saved) : []
   })
 
+  // Stored analyses the user removed or cleared, so the server merge doesn't bring them back
+  const [dismissed, setDismissed] = useState(() => {
+    const saved = localStorage.getItem('queryHistoryDismissed')
+    return saved ? JSON.parse(saved) : { ids: [], clearedAt: 0 }
+  })
+  const dismissedRef = useRef(dismissed)
+
   useEffect(() => {
     localStorage.setItem('queryHistory', JSON.stringify(history))
   }, [history])
 
+  useEffect(() => {
+    dismissedRef.current = dismissed
+    localStorage.setItem('queryHistoryDismissed', JSON.stringify(dismissed))
+  }, [dismissed])
+
+  // Merge in analyses persisted by the backend (e.g. from another browser)
+  useEffect(() => {
+    metricsAPI.getAnalysisHistory({ limit: 50 })
+      .then(({ items }) => {
+        setHistory(prev => {
+          const { ids, clearedAt } = dismissedRef.current
+          const known = new Set([...prev.map(item => item.analysisId).filter(Boolean), ...ids])
+          const stored = items
+            .filter(item => !known.has(item.id) && item.created_at * 1000 > clearedAt)
+            .map(item => ({
+              id: item.id,
+              analysisId: item.id,
+              prompt: item.prompt,
+              domain: item.target_domain,
+              timestamp: new Date(item.created_at * 1000).toISOString(),
+              result: null
+            }))
+          return [...prev, ...stored]
+            .sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp))
+            .slice(0, 50)
+        })
+      })
+      .catch(() => {}) // offline: local history only
+  }, [])
+
   const addToHistory = (query) => {
     const newQuery = {
       id: Date.now(),
+      analysisId: query.result?.analysis_id,
       prompt: query.prompt,
       domain: query.domain,
       timestamp: new Date().toISOString(),
@@ -33,10 +72,16 @@ export const QueryHistoryProvider = ({ children }) => {
   }
 
   const removeFromHistory = (id) => {
+    const removed = history.find(item => item.id === id)
+    if (removed?.analysisId) {
+      // bounded: entries older than the server's last 50 are never merged anyway
+      setDismissed(prev => ({ ...prev, ids: [removed.analysisId, ...prev.ids].slice(0, 200) }))
+    }
     setHistory(prev => prev.filter(item => item.id !== id))
   }
 
   const clearHistory = () => {
+    setDismissed({ ids: [], clearedAt: Date.now() })
     setHistory([])
   }
 
@@ -15,10 +15,46 @@ import ProgressBar from '../components/ProgressBar'
 import ResultsDisplay from '../components/ResultsDisplay'
 import QueryHistory from '../components/QueryHistory'
 import SettingsModal from '../components/SettingsModal'
-import { metricsAPI } from '../api/metrics'
+import { metricsAPI, toDisplayResults } from '../api/metrics'
 import { useQueryHistory } from '../contexts/QueryHistoryContext'
 import toast from 'react-hot-toast'
 
+const emptyResults = () => ({
+  analysis_id: null,
+  responses: {},
+  domains: { global_domains: {}, citations: {}, geo_analysis: null },
+  metrics: {},
+  model_comparison: { rankings: [], summary: null }
+})
+
+// Fold one streamed event ('model', 'domains' or 'summary') into the results shown so far
+const applyStreamEvent = (prev, event, data) => {
+  const next = prev || emptyResults()
+  if (event === 'model') {
+    return { ...next, responses: { ...next.responses, [data.model]: data.response } }
+  }
+  if (event === 'domains') {
+    return {
+      ...next,
+      domains: {
+        ...next.domains,
+        global_domains: data.global_domains,
+        citations: { ...next.domains.citations, [data.model]: data.citations }
+      },
+      metrics: { ...next.metrics, [data.model]: data.metrics },
+      model_comparison: {
+        ...next.model_comparison,
+        unique_domains: Object.keys(data.global_domains).length,
+        total_citations: data.total_citations
+      }
+    }
+  }
+  if (event === 'summary') {
+    return { ...next, model_comparison: { ...next.model_comparison, summary: data.summary } }
+  }
+  return next
+}
+
 const DashboardPage = () => {
   const [prompt, setPrompt] = useState('')
   const [targetDomain, setTargetDomain] = useState('')
@@ -71,34 +107,35 @@ const DashboardPage = () => {
     setStatus('Initializing analysis...')
 
     try {
-      // Simulate progress updates
-      const progressInterval = setInterval(() => {
-        setProgress(prev => {
-          if (prev >= 100) {
-            clearInterval(progressInterval)
-            return 100
-          }
-          return prev + Math.random() * 20
-        })
-      }, 300)
-
       setStatus('Fetching responses from AI models...')
-      
-      const response = await metricsAPI.runMultiLLMAnalysis(
-        prompt, 
-        selectedModels, 
+
+      // Render each model's answer as it arrives instead of waiting for all of them
+      let answered = 0
+      const final = await metricsAPI.streamMultiLLMAnalysis(
+        prompt,
+        selectedModels,
         targetDomain || null,
-        {
-          dataSource: settings.dataSource,
-          timeout: settings.timeout
+        (event, data) => {
+          if (event === 'model') {
+            answered += 1
+            setProgress(Math.round((answered / selectedModels.length) * 90))
+            setStatus(`${answered} of ${selectedModels.length} models answered...`)
+          } else if (event === 'summary') {
+            setStatus('Summary ready, finishing up...')
+          }
+          setResults(prev => applyStreamEvent(prev, event, data))
         }
       )
-      
-      clearInterval(progressInterval)
+      if (!final) {
+        throw new Error('The analysis stream ended before the results were complete')
+      }
+
+      const response = toDisplayResults(final.analysis_id, final, targetDomain || null)
       setProgress(100)
       setStatus('Analysis completed!')
       setResults(response)
-      
+      setAnalysisId(final.analysis_id)
+
       // Add to history
       if (settings.autoSave) {
         addToHistory({
@@ -107,7 +144,7 @@ const DashboardPage = () => {
           result: response
         })
       }
-      
+
       toast.success('Multi-LLM analysis completed successfully!')
       setIsLoading(false)
 
@@ -147,6 +184,30 @@ const DashboardPage = () => {
     setShowHistory(false)
   }
 
+  // Re-open a past analysis: the saved result, else the server's stored copy (no LLM calls)
+  const handleOpenQuery = async (query) => {
+    setPrompt(query.prompt)
+    setTargetDomain(query.domain || '')
+    setError(null)
+    setProgress(0)
+    setStatus('')
+    setShowHistory(false)
+    if (query.result) {
+      setResults(query.result)
+      setAnalysisId(query.analysisId || null)
+      return
+    }
+    try {
+      const stored = await metricsAPI.getStoredAnalysis(query.analysisId)
+      setResults(toDisplayResults(stored.id, stored.results, stored.target_domain))
+      setAnalysisId(stored.id)
+    } catch (err) {
+      const errorMessage = err.response?.data?.detail || err.message || 'Failed to open analysis'
+      setError({ message: errorMessage })
+      toast.error(errorMessage)
+    }
+  }
+
   const handleSettingsSave = (newSettings) => {
     setSettings(newSettings)
     toast.success('Settings saved successfully!')
@@ -387,6 +448,7 @@ const DashboardPage = () => {
           isOpen={showHistory}
           onClose={() => setShowHistory(false)}
           onReRunQuery={handleReRunQuery}
+          onOpenQuery={handleOpenQuery}
         />
         
         <SettingsModal